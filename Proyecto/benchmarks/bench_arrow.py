@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+
+from harness import benchmark, calls, init_display
+from physics import Physics
+from arrow import Arrow
+from volley import Volley
+
+
+DT = 1 / 60
+
+
+@benchmark('arrow.shoot')
+def arrow_shoot():
+    arrow = Arrow(50, 20, Physics(gravity=9.8))
+    return calls(lambda: arrow.shoot(50.0, 45.0, DT))
+
+
+@benchmark('arrow.flight_50ms_45deg', unit='flight')
+def arrow_flight():
+    """Vuelo completo (unos 430 pasos) llamando a Arrow.update, sin contar shoot"""
+    physics = Physics(gravity=9.8)
+
+    def time_func(loops):
+        total = 0.0
+        for _ in range(loops):
+            arrow = Arrow(50, 20, physics)
+            arrow.shoot(50.0, 45.0, DT)
+            start = time.perf_counter()
+            while arrow.is_flying:
+                arrow.update(DT)
+            total += time.perf_counter() - start
+        return total
+    return time_func
+
+
+def _long_flight(steps):
+    """Flecha a mitad de un vuelo lunar largo, con el buffer de trayectoria lleno"""
+    arrow = Arrow(50, 20, Physics(gravity=1.62))
+    arrow.shoot(60.0, 30.0, DT)
+    for _ in range(steps):
+        arrow.update(DT)
+    return arrow
+
+
+@benchmark('arrow.draw_long_trajectory')
+def arrow_draw_long():
+    screen = init_display()
+    arrow = _long_flight(2500)
+    return calls(lambda: arrow.draw(screen, 50, 0, 0.2, 500, 0.5))
+
+
+@benchmark('arrow.draw_long_trajectory_zoomed_in')
+def arrow_draw_long_zoomed_in():
+    """Con zoom ×50 sobre el comienzo del vuelo casi toda la trayectoria queda fuera de la pantalla"""
+    screen = init_display()
+    arrow = _long_flight(2500)
+    return calls(lambda: arrow.draw(screen, -2000, 0, 50.0, 2500, 0.5))
+
+
+@benchmark('arrow.update_and_draw_long_trajectory', unit='frame')
+def arrow_update_draw_long():
+    """Cuadro típico: un paso más y el dibujo con un punto nuevo en la trayectoria"""
+    screen = init_display()
+
+    def time_func(loops):
+        arrow = _long_flight(2500)
+        start = time.perf_counter()
+        for _ in range(loops):
+            arrow.update(DT)
+            arrow.draw(screen, 50, 0, 0.2, 500, 0.5)
+        return time.perf_counter() - start
+    return time_func
+
+
+def _volley(n):
+    volley = Volley(Physics(gravity=9.8))
+    volley.launch_spread(n, 50.0, 45.0, rng=np.random.default_rng(0))
+    for _ in range(60):
+        volley.step(DT)
+    return volley
+
+
+@benchmark('volley.step_2000')
+def volley_step():
+    def time_func(loops):
+        # Pasos cortos para que todas las flechas sigan en vuelo durante la medición
+        volley = _volley(2000)
+        start = time.perf_counter()
+        for _ in range(loops):
+            volley.step(DT / 100)
+        return time.perf_counter() - start
+    return time_func
+
+
+@benchmark('volley.draw_2000')
+def volley_draw():
+    screen = init_display()
+    volley = _volley(2000)
+    return calls(lambda: volley.draw(screen, 50, 1.0, 500, 0.5, DT))
@@ -0,0 +1,77 @@
+import numpy as np
+
+from harness import benchmark, calls
+from physics import Physics
+from forces import QuadraticDrag
+
+
+SCALAR_METHODS = [
+    ('horizontal_position', (50.0, 45.0, 3.0)),
+    ('vertical_position', (50.0, 45.0, 3.0)),
+    ('max_horizontal_distance', (50.0, 45.0)),
+    ('max_height', (50.0, 45.0)),
+    ('flight_time', (50.0, 45.0)),
+    ('ground_contact_time', (50.0, 45.0)),
+    ('current_velocity_x', (50.0, 45.0)),
+    ('current_velocity_y', (50.0, 45.0, 3.0)),
+]
+
+
+def _scalar(method, args):
+    def setup():
+        return calls(lambda: getattr(Physics(gravity=9.8), method)(*args))
+    return setup
+
+
+for _method, _args in SCALAR_METHODS:
+    # Se crea un Physics por llamada para medir la fórmula y no la memoria de resultados
+    benchmark(f'physics.{_method}')(_scalar(_method, _args))
+
+
+@benchmark('physics.summary_hit')
+def summary_hit():
+    physics = Physics(gravity=9.8)
+    physics.summary(50.0, 45.0)
+    return calls(lambda: physics.summary(50.0, 45.0))
+
+
+@benchmark('physics.summary_miss')
+def summary_miss():
+    physics = Physics(gravity=9.8)
+
+    def run():
+        physics.results.clear()
+        physics.summary(50.0, 45.0)
+    return calls(run)
+
+
+@benchmark('physics.batch_10k_shots')
+def batch_shots():
+    physics = Physics(gravity=9.8)
+    rng = np.random.default_rng(0)
+    velocities = rng.uniform(10, 100, 10000)
+    angles = rng.uniform(5, 85, 10000)
+    return calls(lambda: physics.batch(velocities, angles))
+
+
+@benchmark('physics.batch_trajectory_100x600')
+def batch_trajectory():
+    physics = Physics(gravity=9.8)
+    velocities = np.linspace(10, 100, 100)[:, None]
+    times = np.arange(600)[None, :] / 60
+    return calls(lambda: physics.batch(velocities, 45.0, times))
+
+
+@benchmark('physics.simulate_drag')
+def simulate_drag():
+    physics = Physics(gravity=9.8, drag=QuadraticDrag())
+    return calls(lambda: physics.simulate(50.0, 45.0))
+
+
+@benchmark('physics.simulate_batch_drag_1k')
+def simulate_batch_drag():
+    physics = Physics(gravity=9.8, drag=QuadraticDrag())
+    rng = np.random.default_rng(0)
+    velocities = rng.uniform(10, 100, 1000)
+    angles = rng.uniform(5, 85, 1000)
+    return calls(lambda: physics.simulate_batch(velocities, angles))
@@ -0,0 +1,102 @@
+from harness import benchmark, calls, init_display
+from physics import Physics
+from profiler import FrameProfiler
+from renderer import Renderer
+
+
+INFO_ARGS = (45.0, 50.0, 9.8, True, 120.5, 255.1, 250.0, 260.2)
+
+
+def _renderer():
+    init_display()
+    return Renderer()
+
+
+@benchmark('renderer.draw_background')
+def draw_background():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_background(1.0, 50, 500, 50))
+
+
+@benchmark('renderer.draw_background_rebuild')
+def draw_background_rebuild():
+    renderer = _renderer()
+
+    def run():
+        renderer.background.invalidate()
+        renderer.draw_background(1.0, 50, 500, 50)
+    return calls(run)
+
+
+@benchmark('renderer.draw_background_rebuild_zoomed_out')
+def draw_background_rebuild_zoomed_out():
+    """Reconstrucción con la vista muy alejada: con el recorte cuesta lo mismo que con la escala 1"""
+    renderer = _renderer()
+
+    def run():
+        renderer.background.invalidate()
+        renderer.draw_background(0.01, 50, 500, 50)
+    return calls(run)
+
+
+@benchmark('renderer.draw_grid')
+def draw_grid():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_grid(1.0, 50, 500))
+
+
+@benchmark('renderer.draw_ground')
+def draw_ground():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_ground(500, 1.0))
+
+
+@benchmark('renderer.draw_distance_ruler')
+def draw_distance_ruler():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_distance_ruler(530, 1.0, 50))
+
+
+@benchmark('renderer.draw_height_ruler')
+def draw_height_ruler():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_height_ruler(50, 1.0, 500))
+
+
+@benchmark('renderer.draw_info_panel')
+def draw_info_panel():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_info_panel(*INFO_ARGS))
+
+
+@benchmark('renderer.draw_formulas_panel')
+def draw_formulas_panel():
+    renderer = _renderer()
+    summary = Physics(gravity=9.8).summary(50.0, 45.0)
+    return calls(lambda: renderer.draw_formulas_panel(45.0, 50.0, 9.8, True, 120.5, summary))
+
+
+@benchmark('renderer.render_formulas_panel')
+def render_formulas_panel():
+    """Regeneración del panel de fórmulas (cuando cambian el ángulo o la velocidad)"""
+    renderer = _renderer()
+    summary = Physics(gravity=9.8).summary(50.0, 45.0)
+    return calls(lambda: renderer.render_formulas_panel(45.0, 50.0, 9.8, summary))
+
+
+@benchmark('renderer.draw_target')
+def draw_target():
+    renderer = _renderer()
+    return calls(lambda: renderer.draw_target(255.1, 1.0, 50, 500))
+
+
+@benchmark('renderer.draw_profile_overlay')
+def draw_profile_overlay():
+    renderer = _renderer()
+    profiler = FrameProfiler(enabled=True)
+    for _ in range(300):
+        profiler.begin_frame()
+        for stage in ('clock.tick', 'handle_events', 'update', 'draw_background', 'display.flip'):
+            profiler.lap(stage)
+    profiler.finish()
+    return calls(lambda: renderer.draw_profile_overlay(profiler))
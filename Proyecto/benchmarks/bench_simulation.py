@@ -0,0 +1,65 @@
+import time
+
+import pygame
+
+from harness import benchmark, init_display
+from renderer import Renderer
+from simulation import Simulation
+
+
+FRAMES = 300  # Cuadros por medición (se puede cambiar con --frames)
+
+
+def _key(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0)
+
+
+def run_frames(keys=(), dirty_rects=False):
+    """time_func que ejecuta Simulation.run durante 'loops' cuadros sin límite de FPS
+
+    Las teclas de 'keys' se envían en el primer cuadro (por ejemplo, disparar)
+    y el cronómetro arranca en el segundo, después de procesarlas.
+    """
+    def time_func(loops):
+        init_display()
+        renderer = Renderer(dirty_rects=dirty_rects)
+        simulation = Simulation(fps=0)
+        handle_events = simulation.handle_events
+        state = {'frame': 0, 'start': 0.0, 'end': 0.0}
+
+        def counted_handle_events():
+            state['frame'] += 1
+            if state['frame'] == 1:
+                for key in keys:
+                    pygame.event.post(_key(key))
+            elif state['frame'] == 2:
+                state['start'] = time.perf_counter()
+            elif state['frame'] == loops + 2:
+                state['end'] = time.perf_counter()
+                simulation.running = False
+            handle_events()
+
+        simulation.handle_events = counted_handle_events
+        # run() termina con pygame.quit() y sys.exit(); cerrar pygame aquí
+        # dejaría inválidas las fuentes y superficies compartidas que usan
+        # las mediciones siguientes
+        quit_pygame = pygame.quit
+        pygame.quit = lambda: None
+        try:
+            simulation.run(renderer)
+        except SystemExit:
+            pass
+        finally:
+            pygame.quit = quit_pygame
+        return state['end'] - state['start']
+    return time_func
+
+
+def _frames_benchmark(name, **kwargs):
+    benchmark(name, loops=FRAMES, repeat=3, threshold=0.4, unit='frame')(lambda: run_frames(**kwargs))
+
+
+_frames_benchmark('simulation.run_idle')
+_frames_benchmark('simulation.run_shot', keys=(pygame.K_SPACE,))
+_frames_benchmark('simulation.run_volley_2000', keys=(pygame.K_SPACE, pygame.K_v))
+_frames_benchmark('simulation.run_shot_dirty_rects', keys=(pygame.K_SPACE,), dirty_rects=True)
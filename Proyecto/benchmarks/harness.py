@@ -0,0 +1,153 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+# Sin GPU ni ventana: SDL dibuja en memoria. Debe fijarse antes de importar pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+# La puntería no debe leer ni escribir tablas en la carpeta del usuario
+os.environ.setdefault('ARCO_AIM_CACHE', '')
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+import pygame
+
+
+DEFAULT_THRESHOLD = 0.25  # Regresión si el mejor tiempo empeora más de un 25 %
+# Las operaciones de menos de 100 µs sufren más el ruido del sistema (caché,
+# planificador, frecuencia de la CPU): su umbral por defecto es más amplio
+FAST_THRESHOLD = 0.5
+FAST_LIMIT_US = 100
+
+
+class Benchmark:
+    """Un benchmark registrado: setup() prepara el estado y devuelve time_func
+
+    time_func(loops) ejecuta la operación 'loops' veces y devuelve los
+    segundos empleados, de modo que el propio benchmark decide qué parte se
+    cronometra. Con loops=None el número de repeticiones se calibra hasta
+    superar min_time; si no, es fijo (los benchmarks de cuadros completos).
+    Sin 'threshold' el umbral de regresión depende de la duración medida
+    (ver default_threshold).
+    """
+
+    def __init__(self, name, setup, loops=None, repeat=None, threshold=None, unit='op'):
+        self.name = name
+        self.setup = setup
+        self.loops = loops
+        self.repeat = repeat
+        self.threshold = threshold
+        self.unit = unit
+
+
+REGISTRY = []
+
+
+def benchmark(name, **options):
+    """Decorador que registra una función setup como benchmark"""
+    def register(setup):
+        REGISTRY.append(Benchmark(name, setup, **options))
+        return setup
+    return register
+
+
+def calls(func):
+    """time_func que llama a func() sin argumentos 'loops' veces"""
+    def time_func(loops):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        return time.perf_counter() - start
+    return time_func
+
+
+def init_display(size=(1200, 600)):
+    """Inicializa pygame y abre la pantalla (virtual) del tamaño de la simulación"""
+    pygame.init()
+    return pygame.display.set_mode(size)
+
+
+def calibrate(time_func, min_time):
+    """Menor potencia de 2 de repeticiones que tarda al menos min_time"""
+    loops = 1
+    while True:
+        if time_func(loops) >= min_time or loops >= 1 << 24:
+            return loops
+        loops *= 2
+
+
+def default_threshold(best_us):
+    """Umbral de regresión para un benchmark cuyo mejor tiempo es best_us"""
+    return FAST_THRESHOLD if best_us < FAST_LIMIT_US else DEFAULT_THRESHOLD
+
+
+def measure(bench, repeat=10, min_time=0.2):
+    """Ejecuta un benchmark y devuelve sus tiempos por operación (µs)
+
+    La comparación usa el mínimo de las mediciones: el ruido solo puede
+    sumar tiempo, así que el mínimo es mucho más estable que la mediana.
+    """
+    time_func = bench.setup()
+    loops = bench.loops if bench.loops is not None else calibrate(time_func, min_time)
+    samples = [time_func(loops) / loops * 1e6 for _ in range(bench.repeat or repeat)]
+    return {
+        'unit': bench.unit,
+        'loops': loops,
+        'repeat': len(samples),
+        'median_us': statistics.median(samples),
+        'min_us': min(samples),
+        'max_us': max(samples),
+        'threshold': bench.threshold if bench.threshold is not None else default_threshold(min(samples)),
+    }
+
+
+def environment():
+    """Descripción de la máquina y las versiones, guardada junto a los resultados"""
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'video_driver': os.environ.get('SDL_VIDEODRIVER'),
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def save(path, results):
+    """Escribe los resultados (y el entorno) como JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path):
+    """Lee los resultados guardados por save()"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=None):
+    """Compara los mejores tiempos (mínimo de las mediciones) con la línea base
+
+    Devuelve una lista de (nombre, actual, base, cociente, regresión). El
+    umbral de cada benchmark es el guardado en la línea base (se puede
+    editar a mano) salvo que se indique 'threshold'. Los benchmarks sin
+    línea base se omiten.
+    """
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = threshold if threshold is not None else base.get('threshold', default_threshold(base['min_us']))
+        ratio = result['min_us'] / base['min_us'] if base['min_us'] else float('inf')
+        rows.append((name, result['min_us'], base['min_us'], ratio, ratio > 1 + limit))
+    return rows
@@ -0,0 +1,116 @@
+"""Suite de benchmarks sin pantalla de la simulación (física, flecha, renderizado y cuadros completos)
+
+Uso:
+    python benchmarks/run_benchmarks.py                      # ejecutar todo
+    python benchmarks/run_benchmarks.py -k renderer          # solo los que contienen 'renderer'
+    python benchmarks/run_benchmarks.py --compare            # comparar con baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline      # actualizar baseline.json
+"""
+import argparse
+import fnmatch
+import os
+import sys
+
+import harness
+import bench_physics  # noqa: F401 (registran sus benchmarks al importarse)
+import bench_arrow  # noqa: F401
+import bench_renderer  # noqa: F401
+import bench_simulation
+
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+
+def parse_args(argv=None):
+    """Interpreta los argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmarks de la simulación de tiro con arco")
+    parser.add_argument('-k', '--filter', action='append', default=[], metavar='PATRÓN',
+                        help="ejecutar solo los benchmarks cuyo nombre contiene PATRÓN "
+                             "(admite comodines; se puede repetir)")
+    parser.add_argument('--list', action='store_true', help="listar los benchmarks y salir")
+    parser.add_argument('--output', '-o', metavar='ARCHIVO', default=None,
+                        help="guardar los resultados en ARCHIVO (JSON)")
+    parser.add_argument('--compare', metavar='ARCHIVO', nargs='?', const=BASELINE, default=None,
+                        help="comparar con una línea base (por defecto benchmarks/baseline.json); "
+                             "termina con código 1 si hay regresiones")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="regresión permitida (0.25 = 25 %%); por defecto la guardada en la línea base")
+    parser.add_argument('--save-baseline', metavar='ARCHIVO', nargs='?', const=BASELINE, default=None,
+                        help="guardar los resultados como línea base (por defecto benchmarks/baseline.json)")
+    parser.add_argument('--repeat', type=int, default=10,
+                        help="mediciones por benchmark (se compara la mínima)")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="duración mínima de cada medición al calibrar las repeticiones (s)")
+    parser.add_argument('--frames', type=int, default=bench_simulation.FRAMES,
+                        help="cuadros por medición en los benchmarks de Simulation.run")
+    return parser.parse_args(argv)
+
+
+def selected(benchmarks, patterns):
+    """Benchmarks cuyo nombre coincide con alguno de los patrones (todos si no hay)"""
+    if not patterns:
+        return benchmarks
+    return [bench for bench in benchmarks
+            if any(fnmatch.fnmatch(bench.name, pattern if any(c in pattern for c in '*?[') else f'*{pattern}*')
+                   for pattern in patterns)]
+
+
+def format_time(microseconds):
+    """Tiempo legible con la unidad adecuada"""
+    if microseconds >= 1000:
+        return f"{microseconds / 1000:9.3f} ms"
+    return f"{microseconds:9.3f} µs"
+
+
+def main(argv=None):
+    """Ejecuta los benchmarks elegidos, guarda los resultados y compara con la línea base"""
+    args = parse_args(argv)
+    benchmarks = selected(harness.REGISTRY, args.filter)
+    if args.list:
+        for bench in benchmarks:
+            print(bench.name)
+        return 0
+    if not benchmarks:
+        print("ningún benchmark coincide con el filtro", file=sys.stderr)
+        return 2
+
+    width = max(len(bench.name) for bench in benchmarks)
+    results = {}
+    for bench in benchmarks:
+        if bench.unit == 'frame' and bench.loops is not None:
+            bench.loops = args.frames
+        result = harness.measure(bench, args.repeat, args.min_time)
+        results[bench.name] = result
+        print(f"{bench.name:<{width}}  {format_time(result['min_us'])}/{result['unit']}"
+              f"  (mediana {format_time(result['median_us']).strip()}, {result['loops']}×{result['repeat']})",
+              flush=True)
+
+    if args.output:
+        harness.save(args.output, results)
+    if args.save_baseline:
+        harness.save(args.save_baseline, results)
+
+    if args.compare:
+        try:
+            baseline = harness.load(args.compare)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"no se pudo leer la línea base {args.compare}: {e}", file=sys.stderr)
+            return 2
+        rows = harness.compare(results, baseline, args.threshold)
+        regressions = [row for row in rows if row[4]]
+        print()
+        for name, current, base, ratio, regression in rows:
+            mark = "REGRESIÓN" if regression else ""
+            print(f"{name:<{width}}  {format_time(base)} → {format_time(current)}  ×{ratio:5.2f}  {mark}")
+        missing = sorted(set(results) - set(baseline))
+        if missing:
+            print(f"\nsin línea base: {', '.join(missing)}")
+        print(f"\n{len(regressions)} regresiones de {len(rows)} benchmarks comparados")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+
+import numpy as np
+
+from physics import Physics
+from forces import QuadraticDrag
+
+
+def default_cache_dir():
+    """Carpeta de las tablas de puntería (se puede cambiar con ARCO_AIM_CACHE)
+
+    Si la variable de entorno existe pero está vacía, las tablas no se
+    guardan en disco.
+    """
+    path = os.environ.get('ARCO_AIM_CACHE')
+    if path is not None:
+        return path or None
+    return os.path.join(os.path.expanduser('~'), '.cache', 'simulacion_arco', 'aim')
+
+
+def table_key(physics):
+    """Nombre de la tabla para la gravedad y el rozamiento de 'physics'"""
+    key = f"g{physics.gravity:g}"
+    drag = physics.drag
+    if drag is not None:
+        key += (f"_m{drag.mass:g}_d{drag.diameter:g}_cd{drag.drag_coefficient:g}"
+                f"_rho{drag.air_density:g}_w{drag.wind:g}")
+    return key
+
+
+def _grid(spec):
+    """Valores de una especificación (inicio, fin, paso) con el fin incluido"""
+    start, stop, step = spec
+    return start + np.arange(int(round((stop - start) / step)) + 1) * step
+
+
+class AimTable:
+    """Tabla precalculada de alcances R(v, θ) para una gravedad y un rozamiento
+
+    ranges[i, j] es el alcance con la velocidad velocities[i] y el ángulo
+    angles[j]. Las consultas interpolan linealmente entre filas de
+    velocidad y luego invierten cada rama (tiro bajo y tiro alto) de la fila
+    resultante; solo recorren unos cientos de valores, así que tardan
+    microsegundos. La tabla se guarda como .npy y se abre mapeada en memoria.
+    """
+
+    def __init__(self, key, velocity_spec, angle_spec, ranges):
+        self.key = key
+        self.velocity_spec = tuple(velocity_spec)
+        self.angle_spec = tuple(angle_spec)
+        self.velocities = _grid(velocity_spec)
+        self.angles = _grid(angle_spec)
+        self.ranges = ranges
+        # Alcance máximo de cada fila y el ángulo con que se logra, ajustando
+        # una parábola con los vecinos del mejor ángulo de la cuadrícula
+        rows = np.arange(len(self.velocities))
+        best = np.clip(np.argmax(ranges, axis=1), 1, len(self.angles) - 2)
+        before, center, after = ranges[rows, best - 1], ranges[rows, best], ranges[rows, best + 1]
+        curvature = before - 2 * center + after
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = np.where(curvature < 0, 0.5 * (before - after) / curvature, 0.0)
+        offset = np.clip(offset, -0.5, 0.5)
+        self.best_angles = self.angles[best] + offset * self.angle_spec[2]
+        self.max_ranges = np.maximum(center - 0.25 * (before - after) * offset, ranges.max(axis=1))
+
+    @classmethod
+    def build(cls, physics, velocity_spec=(0.0, 200.0, 1.0), angle_spec=(0.0, 90.0, 0.5)):
+        """Calcula la tabla integrando todos los disparos de la cuadrícula por lotes"""
+        velocities, angles = np.meshgrid(_grid(velocity_spec), _grid(angle_spec), indexing='ij')
+        if physics.drag is None:
+            ranges = physics.batch(velocities, angles).max_distance
+        else:
+            ranges = physics.simulate_batch(velocities, angles).distance.reshape(velocities.shape)
+        return cls(table_key(physics), velocity_spec, angle_spec, np.maximum(ranges, 0.0))
+
+    def save(self, directory):
+        """Guarda la tabla (.npy) y su cuadrícula (.json) en 'directory'"""
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.key)
+        np.save(base + '.npy', np.ascontiguousarray(self.ranges, dtype='<f8'))
+        with open(base + '.json', 'w', encoding='utf-8') as f:
+            json.dump({'velocities': self.velocity_spec, 'angles': self.angle_spec}, f)
+
+    @classmethod
+    def load(cls, directory, key, velocity_spec=None, angle_spec=None):
+        """Abre una tabla guardada mapeada en memoria; devuelve None si no existe o no coincide"""
+        base = os.path.join(directory, key)
+        try:
+            with open(base + '.json', encoding='utf-8') as f:
+                grid = json.load(f)
+            ranges = np.load(base + '.npy', mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if velocity_spec is not None and tuple(grid['velocities']) != tuple(velocity_spec):
+            return None
+        if angle_spec is not None and tuple(grid['angles']) != tuple(angle_spec):
+            return None
+        table = cls(key, grid['velocities'], grid['angles'], ranges)
+        if table.ranges.shape != (len(table.velocities), len(table.angles)):
+            return None
+        return table
+
+    def row(self, velocity):
+        """Alcances para todos los ángulos con una velocidad dada (interpolados)"""
+        position = (velocity - self.velocities[0]) / self.velocity_spec[2]
+        if position < 0 or position > len(self.velocities) - 1:
+            raise ValueError(f"velocidad fuera de la tabla: {velocity}")
+        lower = min(int(position), len(self.velocities) - 2)
+        weight = position - lower
+        return (1 - weight) * self.ranges[lower] + weight * self.ranges[lower + 1]
+
+    def angles_for(self, target, velocity):
+        """Ángulos (bajo, alto) que alcanzan 'target' con 'velocity', o None si no llega"""
+        ranges = self.row(velocity)
+        best = int(np.argmax(ranges))
+        if target > ranges[best]:
+            return None
+        low = float(np.interp(target, ranges[:best + 1], self.angles[:best + 1]))
+        high = float(np.interp(target, ranges[best:][::-1], self.angles[best:][::-1]))
+        return low, high
+
+    def minimum_velocity(self, target):
+        """Velocidad mínima que alcanza 'target' y su ángulo, o None si excede la tabla"""
+        if target > self.max_ranges[-1]:
+            return None
+        velocity = float(np.interp(target, self.max_ranges, self.velocities))
+        angle = float(np.interp(velocity, self.velocities, self.best_angles))
+        return velocity, angle
+
+
+class AimSolver:
+    """Resuelve la puntería inversa: qué ángulo o velocidad alcanza una distancia
+
+    Sin rozamiento las soluciones son cerradas y exactas: sin(2θ) = g·R/v² y
+    v_min = √(g·R) a 45°. Con rozamiento se parte de la tabla precalculada
+    para la gravedad y el rozamiento actuales (construida una vez y guardada
+    en disco) y, con refine, se corrige con el método de la secante sobre el
+    alcance integrado. prepare() carga o calcula esa tabla en un hilo aparte,
+    para que una interfaz no quede bloqueada mientras tanto.
+    """
+
+    def __init__(self, physics, cache_dir=None, velocity_spec=(0.0, 200.0, 1.0), angle_spec=(0.0, 90.0, 0.5)):
+        self.physics = physics
+        self.cache_dir = cache_dir if cache_dir is not None else default_cache_dir()
+        self.velocity_spec = velocity_spec
+        self.angle_spec = angle_spec
+        self.tables = {}
+        self.builders = {}  # Hilos que cargan o calculan tablas en segundo plano
+
+    def prepare(self):
+        """Carga o calcula en segundo plano la tabla para la física actual
+
+        Devuelve True si ya se puede consultar sin esperar (sin rozamiento no
+        hace falta tabla).
+        """
+        if self.physics.drag is None:
+            return True
+        key = table_key(self.physics)
+        if key in self.tables:
+            return True
+        if key not in self.builders:
+            # Copia de la física: quien la usa puede cambiarla mientras tanto
+            physics = Physics(gravity=self.physics.gravity, drag=self.physics.drag)
+            builder = threading.Thread(target=self._load_or_build, args=(physics,), daemon=True)
+            self.builders[key] = builder
+            builder.start()
+        return False
+
+    def table(self):
+        """Tabla para la física actual: de memoria, de disco o calculada en el momento
+
+        Si prepare() la está preparando, espera a que termine.
+        """
+        key = table_key(self.physics)
+        table = self.tables.get(key)
+        if table is None:
+            builder = self.builders.pop(key, None)
+            if builder is not None:
+                builder.join()
+                table = self.tables.get(key)
+            if table is None:
+                table = self._load_or_build(self.physics)
+        return table
+
+    def _load_or_build(self, physics):
+        """Abre la tabla de 'physics' desde disco o la calcula (y la guarda)"""
+        key = table_key(physics)
+        table = None
+        if self.cache_dir:
+            table = AimTable.load(self.cache_dir, key, self.velocity_spec, self.angle_spec)
+        if table is None:
+            table = AimTable.build(physics, self.velocity_spec, self.angle_spec)
+            if self.cache_dir:
+                try:
+                    table.save(self.cache_dir)
+                except OSError:
+                    pass  # Sin caché en disco se recalcula la próxima vez
+        self.tables[key] = table
+        return table
+
+    def angles(self, target, velocity, refine=True):
+        """Ángulos (bajo, alto) en grados para alcanzar 'target' con 'velocity'
+
+        Devuelve None si la distancia es inalcanzable con esa velocidad.
+        """
+        if target < 0:
+            raise ValueError("la distancia objetivo debe ser positiva")
+        if self.physics.drag is None:
+            ratio = self.physics.gravity * target / (velocity * velocity) if velocity else math.inf
+            if ratio > 1:
+                return None
+            low = math.degrees(math.asin(ratio)) / 2
+            return low, 90 - low
+
+        solution = self.table().angles_for(target, velocity)
+        if solution is None or not refine:
+            return solution
+        return tuple(self._secant(lambda angle: self.physics.landing_distance(velocity, angle) - target,
+                                  guess, 0.01, 0, 90) for guess in solution)
+
+    def minimum_velocity(self, target, refine=True):
+        """Velocidad mínima para alcanzar 'target' y el ángulo con que se logra
+
+        Devuelve None si con rozamiento la distancia excede la tabla.
+        """
+        if target < 0:
+            raise ValueError("la distancia objetivo debe ser positiva")
+        if self.physics.drag is None:
+            return math.sqrt(self.physics.gravity * target), 45.0
+
+        table = self.table()
+        solution = table.minimum_velocity(target)
+        if solution is None or not refine:
+            return solution
+        velocity, _ = solution
+
+        # El alcance es casi plano cerca del ángulo óptimo, así que basta el
+        # ángulo de la tabla para cada velocidad
+        def best_angle(v):
+            return float(np.interp(v, table.velocities, table.best_angles))
+
+        velocity = self._secant(lambda v: self.physics.landing_distance(v, best_angle(v)) - target,
+                                velocity, 0.01, table.velocities[0], table.velocities[-1])
+        return velocity, best_angle(velocity)
+
+    @staticmethod
+    def _secant(f, guess, delta, low, high, tolerance=1e-9, max_iterations=20):
+        """Método de la secante desde 'guess', acotado a [low, high]"""
+        x0 = guess
+        x1 = min(max(guess + delta, low), high)
+        if x1 == x0:
+            x1 = guess - delta
+        f0 = f(x0)
+        f1 = f(x1)
+        for _ in range(max_iterations):
+            if f1 == f0 or abs(f1) <= tolerance:
+                break
+            x0, x1 = x1, min(max(x1 - f1 * (x1 - x0) / (f1 - f0), low), high)
+            f0, f1 = f1, f(x1)
+        return x1 if abs(f1) <= abs(f0) else x0
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos de la puntería inversa"""
+    parser = argparse.ArgumentParser(description="Puntería inversa: ángulo o velocidad para alcanzar una distancia")
+    parser.add_argument('target', type=float, help="distancia objetivo (m)")
+    parser.add_argument('--velocity', type=float, default=None,
+                        help="velocidad inicial (m/s); sin ella se calcula la velocidad mínima")
+    parser.add_argument('--gravity', type=float, default=9.8, help="gravedad (m/s²)")
+    parser.add_argument('--drag', action='store_true', help="con rozamiento del aire (flecha de 25 g)")
+    parser.add_argument('--wind', type=float, default=None, metavar='M/S',
+                        help="viento horizontal constante (positivo a favor); implica --drag")
+    parser.add_argument('--no-refine', dest='refine', action='store_false',
+                        help="con rozamiento, usar solo la interpolación de la tabla")
+    args = parser.parse_args(argv)
+
+    drag = QuadraticDrag(wind=args.wind or 0.0) if args.drag or args.wind is not None else None
+    solver = AimSolver(Physics(gravity=args.gravity, drag=drag))
+    if args.velocity is None:
+        solution = solver.minimum_velocity(args.target, args.refine)
+        if solution is None:
+            print(f"{args.target:g} m está fuera del alcance de la tabla", file=sys.stderr)
+            return 1
+        print(f"velocidad mínima: {solution[0]:.4f} m/s con {solution[1]:.4f}°")
+    else:
+        solution = solver.angles(args.target, args.velocity, args.refine)
+        if solution is None:
+            print(f"{args.target:g} m es inalcanzable a {args.velocity:g} m/s", file=sys.stderr)
+            return 1
+        print(f"tiro bajo: {solution[0]:.4f}°  tiro alto: {solution[1]:.4f}°")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
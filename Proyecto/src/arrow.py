@@ -1,11 +1,21 @@
-import math
-import pygame
+import numpy as np
+from trajectory_buffer import TrajectoryBuffer
+from camera import visible_runs
+
+# Columnas de la línea de tiempo precalculada de cada disparo
+TL_X, TL_Y, TL_VX, TL_VY, TL_HEADING = range(5)
 
 class Arrow:
     """Clase que representa la flecha y su comportamiento"""
 
-    def __init__(self, x, y, physics):
-        """Inicializa la flecha en una posición con acceso a las fórmulas físicas"""
+    def __init__(self, x, y, physics, max_points=2000, resolve_contact=True, lod_tolerance=0.5):
+        """Inicializa la flecha en una posición con acceso a las fórmulas físicas
+
+        Con resolve_contact el último paso se ajusta al instante exacto en que
+        la flecha toca el suelo, en lugar de quedar por debajo de él.
+        lod_tolerance es el error máximo (en píxeles) al simplificar la
+        trayectoria dibujada; con 0 se dibujan todos los puntos.
+        """
         self.x = x
         self.y = y
         self.physics = physics
@@ -13,26 +23,142 @@ class Arrow:
         self.angle = 0
         self.time = 0
         self.is_flying = False
-        self.trajectory_points = []
-        self.max_points = 200  # Aumentado para mostrar más puntos de la trayectoria
+        self.rotation = 0
+        # Trayectoria acotada: se conservan solo los últimos max_points puntos
+        self.max_points = max_points
+        self.trajectory = TrajectoryBuffer(max_points)
+        self.apex_step = 0  # Paso en el que se alcanza la altura máxima
+        self.lod_tolerance = lod_tolerance
 
         # Posición inicial para la trayectoria (arco)
         self.initial_x = x
         self.initial_y = y
 
-        # Cargar imagen de la flecha
-        self.image = pygame.Surface((30, 5))
-        self.image.fill((139, 69, 19))  # Color marrón para la flecha
-        self.rect = self.image.get_rect()
+        # Línea de tiempo del disparo (una fila por paso de dt)
+        self.timeline = None
+        self.timeline_dt = 0
+        self.resolve_contact = resolve_contact
+        self.landing_time = 0  # Instante de la última fila de la línea de tiempo
+
+        # Estado del paso anterior, para interpolar el dibujo entre pasos
+        self.prev_x = x
+        self.prev_y = y
+        self.prev_rotation = 0
+
+        # Trayectoria dibujada en el cuadro anterior (para las zonas modificadas)
+        self.drawn_rect = None
+        self.drawn_total = 0
+        self.drawn_first = 0
+        self.drawn_anchor = None  # Último vértice fijo del trazo simplificado dibujado
 
-    def shoot(self, initial_velocity, angle):
-        """Dispara la flecha con una velocidad inicial y ángulo dados"""
+    def shoot(self, initial_velocity, angle, dt=1 / 60):
+        """Dispara la flecha con una velocidad inicial y ángulo dados
+
+        Como el movimiento tiene solución cerrada, se precalcula aquí toda la
+        trayectoria muestreada cada dt; update y draw solo la consultan.
+        """
         self.initial_velocity = initial_velocity
         self.angle = angle
         self.time = 0
         self.is_flying = True
-        # Iniciar trayectoria desde la posición del arco
-        self.trajectory_points = [(self.initial_x, self.initial_y)]
+        self.timeline, self.landing_time = self.build_timeline(dt)
+        self.timeline_dt = dt
+        # Estado inicial (y anterior) en el punto de lanzamiento: así el primer
+        # cuadro interpolado no parte de la posición del constructor
+        launch = self.timeline[0]
+        self.x = self.prev_x = float(launch[TL_X])
+        self.y = self.prev_y = float(launch[TL_Y])
+        self.rotation = self.prev_rotation = float(launch[TL_HEADING])
+        self.trajectory.clear()
+        self.drawn_first = -1  # La trayectoria anterior se borra completa al dibujar
+
+        if self.physics.drag is None:
+            # Paso más cercano al tiempo de la altura máxima: t = v0·sin(θ)/g
+            apex_time = self.timeline[0, TL_VY] / self.physics.gravity
+            self.apex_step = round(apex_time / dt)
+        else:
+            # Con rozamiento el vértice se adelanta: paso de mayor altura
+            self.apex_step = int(np.argmax(self.timeline[:, TL_Y]))
+
+    def build_timeline(self, dt):
+        """Calcula la trayectoria completa muestreada en t = k·dt
+
+        Devuelve un arreglo (n, 5) con x, y, vx, vy y rumbo (grados), junto con
+        el instante de la última fila. La
+        primera fila es el lanzamiento y la última es el primer paso en el que
+        la flecha toca el suelo (y <= 0); si resolve_contact está activo, esa
+        fila se reemplaza por el estado en el instante exacto del contacto.
+        """
+        if self.physics.drag is None:
+            flight_time = self.physics.flight_time(self.initial_velocity, self.angle)
+            trajectory = None
+        else:
+            # Con rozamiento no hay solución cerrada: se integra una vez con
+            # paso adaptativo y se muestrea en t = k·dt
+            trajectory = self.physics.simulate(self.initial_velocity, self.angle)
+            flight_time = trajectory.contact_time
+        # Un paso extra de margen por si el redondeo deja y > 0 en el último
+        steps = max(int(flight_time / dt), 0) + 2
+        times = np.arange(steps + 1) * dt
+
+        states = self.states_at(times, trajectory)
+        grounded = np.flatnonzero(states[TL_Y, 1:] <= 0)
+        last = grounded[0] + 1 if len(grounded) else steps
+
+        timeline = np.empty((last + 1, 5))
+        timeline[:, :TL_HEADING] = states[:, :last + 1].T
+        landing_time = last * dt
+
+        if self.resolve_contact:
+            # El contacto ocurre entre el paso anterior (y > 0) y este (y <= 0)
+            contact = max(flight_time, 0.0)
+            landing_time = min(max(contact, (last - 1) * dt), last * dt)
+            timeline[last, :TL_HEADING] = self.states_at(np.array([landing_time]), trajectory)[:, 0]
+            timeline[last, TL_Y] = 0.0
+
+        timeline[:, TL_HEADING] = np.degrees(np.arctan2(timeline[:, TL_VY], timeline[:, TL_VX]))
+        return timeline, landing_time
+
+    def states_at(self, times, trajectory=None):
+        """Estados (x, y, vx, vy) en los instantes dados, como arreglo (4, n)
+
+        Sin trayectoria integrada se usan las fórmulas cerradas de Physics.
+        """
+        return self.physics.states_at(self.initial_velocity, self.angle, times, trajectory)
+
+    def sample(self, time):
+        """Devuelve la fila de la línea de tiempo para un instante dado
+
+        Si el instante cae sobre un paso se usa la fila directamente; si no,
+        se interpola entre los dos pasos vecinos.
+        """
+        last = len(self.timeline) - 1
+        position = time / self.timeline_dt
+        index = round(position)
+        on_step = abs(position - index) < 1e-6
+        if time >= self.landing_time or (on_step and index >= last):
+            return self.timeline[last]
+        if on_step:
+            return self.timeline[index]
+        lower = min(int(position), last - 1)
+        # El último tramo puede ser más corto que dt (contacto con el suelo)
+        span = min(self.landing_time - lower * self.timeline_dt, self.timeline_dt)
+        frac = (time - lower * self.timeline_dt) / span
+        start = self.timeline[lower]
+        end = self.timeline[lower + 1]
+        row = start + (end - start) * frac
+
+        # Posición con interpolación de Hermite (usa las velocidades de ambos
+        # extremos); es exacta cuando la aceleración es constante
+        s2 = frac * frac
+        s3 = s2 * frac
+        h00 = 2 * s3 - 3 * s2 + 1
+        h10 = s3 - 2 * s2 + frac
+        h01 = 3 * s2 - 2 * s3
+        h11 = s3 - s2
+        row[TL_X] = h00 * start[TL_X] + h10 * span * start[TL_VX] + h01 * end[TL_X] + h11 * span * end[TL_VX]
+        row[TL_Y] = h00 * start[TL_Y] + h10 * span * start[TL_VY] + h01 * end[TL_Y] + h11 * span * end[TL_VY]
+        return row
 
     def update(self, dt):
         """Actualiza la posición de la flecha según las ecuaciones de movimiento"""
@@ -40,93 +166,131 @@ class Arrow:
             return
 
         self.time += dt
+        self.prev_x, self.prev_y = self.x, self.y
+        self.prev_rotation = self.rotation
 
-        # Calcular la posición usando las fórmulas físicas
-        self.x = self.physics.horizontal_position(self.initial_velocity, self.angle, self.time)
+        # Leer el estado precalculado (sin trigonometría por cuadro)
+        row = self.sample(self.time)
+        self.x = float(row[TL_X])
         # Ya no necesitamos restar 50m porque ahora la cuadrícula está ajustada
-        self.y = self.physics.vertical_position(self.initial_velocity, self.angle, self.time)
+        self.y = float(row[TL_Y])
+        self.rotation = float(row[TL_HEADING])
 
         # Actualizar la trayectoria
-        self.trajectory_points.append((self.x, self.y))
-
-        # Calcular la rotación de la flecha basado en su velocidad actual
-        vx = self.physics.current_velocity_x(self.initial_velocity, self.angle)
-        vy = self.physics.current_velocity_y(self.initial_velocity, self.angle, self.time)
-
-        # Calcular el ángulo de la flecha en radianes y convertir a grados
-        self.rotation = math.degrees(math.atan2(vy, vx))
+        self.trajectory.append(self.x, self.y)
 
         # Verificar si la flecha ha tocado el suelo
         if self.y <= 0:
             self.is_flying = False
+            # El vuelo termina en el instante del contacto, no al final del paso
+            self.time = min(self.time, self.landing_time)
 
+    def draw(self, screen, camera_offset_x, camera_offset_y, scale, ground_y, alpha=1.0):
+        """Dibuja la flecha y su trayectoria
+
+        alpha (0-1) indica cuánto del siguiente paso de física ha transcurrido;
+        la flecha en vuelo se dibuja interpolada entre el paso anterior y el actual.
+        Devuelve la lista de zonas de la pantalla que cambiaron respecto al
+        cuadro anterior (la flecha y el tramo nuevo de la trayectoria).
+        """
+        # pygame se importa al dibujar: el modo por lotes y el barrido solo
+        # usan la línea de tiempo y no deben cargarlo
+        import pygame
+        from arrow_atlas import get_atlas
+
+        dirty = []
+        x, y, rotation = self.x, self.y, self.rotation
+        if self.is_flying and alpha < 1.0:
+            x = self.prev_x + (x - self.prev_x) * alpha
+            y = self.prev_y + (y - self.prev_y) * alpha
+            rotation = self.prev_rotation + (rotation - self.prev_rotation) * alpha
 
-    def draw(self, screen, camera_offset_x, camera_offset_y, scale, ground_y):
-        """Dibuja la flecha y su trayectoria"""
         # Convertir las posiciones físicas a coordenadas de pantalla
-        screen_x = self.x * scale + camera_offset_x
-        screen_y = ground_y - self.y * scale  # Invertir coordenada Y
+        screen_x = x * scale + camera_offset_x
+        screen_y = ground_y - y * scale  # Invertir coordenada Y
 
-        # Solo dibujar si está dentro de la pantalla
-        if 0 <= screen_x < screen.get_width() and 0 <= screen_y < screen.get_height():
+        # Solo dibujar la flecha si está dentro de la pantalla
+        width, height = screen.get_size()
+        if 0 <= screen_x < width and 0 <= screen_y < height:
             # Dibujar la flecha según su estado
             if self.is_flying:
-                # Calcular velocidades actuales
-                vx = self.physics.current_velocity_x(self.initial_velocity, self.angle)
-                vy = self.physics.current_velocity_y(self.initial_velocity, self.angle, self.time)
-
-                # Calcular el ángulo de la flecha basado en su velocidad
-                angle = math.degrees(math.atan2(-vy, vx))  # Negativo porque pygame Y aumenta hacia abajo
-
-                # Dibujar flecha rotada
-                arrow_length = 20  # longitud de la flecha en píxeles
-
-                # Calcular puntas de flecha
-                arrow_head_x = screen_x + arrow_length * math.cos(math.radians(angle))
-                arrow_head_y = screen_y + arrow_length * math.sin(math.radians(angle))
-
-                # Dibujar línea principal
-                pygame.draw.line(screen, (0, 0, 0), (screen_x, screen_y), (arrow_head_x, arrow_head_y), 3)
-
-                # Dibujar puntas triangulares (corregido)
-                pygame.draw.polygon(screen, (0, 0, 0), [
-                    (arrow_head_x, arrow_head_y),
-                    (arrow_head_x - 10 * math.cos(math.radians(angle - 20)),
-                     arrow_head_y - 10 * math.sin(math.radians(angle - 20))),
-                    (arrow_head_x - 5 * math.cos(math.radians(angle)),
-                     arrow_head_y - 5 * math.sin(math.radians(angle))),
-                    (arrow_head_x - 10 * math.cos(math.radians(angle + 20)),
-                     arrow_head_y - 10 * math.sin(math.radians(angle + 20)))
-                ])
+                # Sprite pre-rotado del atlas (Y de pygame aumenta hacia abajo)
+                dirty.append(get_atlas().blit(screen, screen_x, screen_y, -rotation))
             else:
                 # Dibujar flecha en reposo
-                pygame.draw.circle(screen, (100, 100, 100), (int(screen_x), int(screen_y)), 5)
-
-            # Dibujar trayectoria - modificado para eliminar la línea inicial
-            if len(self.trajectory_points) > 2:  # Aseguramos que haya suficientes puntos
-                # Omitir el primer punto (posición del arco) para evitar la línea diagonal
-                puntos_trayectoria = self.trajectory_points[1:]
-
-                # Dividir la trayectoria en ascendente y descendente
-                max_height_idx = 0
-                max_height = puntos_trayectoria[0][1]
-
-                for i in range(len(puntos_trayectoria)):
-                    if puntos_trayectoria[i][1] > max_height:
-                        max_height = puntos_trayectoria[i][1]
-                        max_height_idx = i
-
-                # Convertir puntos de trayectoria a coordenadas de pantalla
-                screen_points = []
-                for point in puntos_trayectoria:
-                    px = point[0] * scale + camera_offset_x
-                    py = ground_y - point[1] * scale  # Invertir coordenada Y
-                    screen_points.append((px, py))
-
-                # Dibujar parte ascendente (rojo)
-                if max_height_idx > 0:
-                    pygame.draw.lines(screen, (255, 0, 0), False, screen_points[:max_height_idx + 1], 2)
-
-                # Dibujar parte descendente (azul)
-                if max_height_idx < len(screen_points) - 1:
-                    pygame.draw.lines(screen, (0, 0, 255), False, screen_points[max_height_idx:], 2)
\ No newline at end of file
+                dirty.append(pygame.draw.circle(screen, (100, 100, 100), (int(screen_x), int(screen_y)), 5))
+
+        # Dibujar trayectoria (aunque la flecha no se vea, solo sus tramos visibles)
+        points = self.trajectory.points()
+        if len(points) >= 2:
+            # Número de la altura máxima dentro del buffer (el punto número
+            # n corresponde al paso n + 1)
+            apex_number = self.apex_step - 1
+
+            # Coordenadas de pantalla cacheadas (solo se convierten los puntos nuevos)
+            screen_points = self.trajectory.screen_points(scale, camera_offset_x, ground_y)
+            line_points = screen_points
+            anchor = None
+            apex_idx = apex_number - self.trajectory.first_index
+            if self.lod_tolerance > 0:
+                # Nivel de detalle: sin puntos repetidos en un mismo píxel ni
+                # vértices alineados (la altura máxima siempre es vértice)
+                vertices = self.trajectory.decimated_points(scale, self.lod_tolerance, (apex_number,))
+                if len(vertices) >= 2:
+                    line_points = vertices[:, 1:] + (round(camera_offset_x), round(ground_y))
+                    apex_idx = int(np.searchsorted(vertices[:, 0], apex_number))
+                    anchor = self.trajectory.decimated_anchor
+            apex_idx = max(0, min(apex_idx, len(line_points) - 1))
+
+            drawn = []
+            for start, end in visible_runs(line_points, width, height, margin=2):
+                # Parte ascendente (rojo) del tramo
+                if start < apex_idx:
+                    drawn.append(pygame.draw.lines(screen, (255, 0, 0), False,
+                                                   line_points[start:min(end, apex_idx) + 1], 2))
+
+                # Parte descendente (azul) del tramo
+                if end > apex_idx:
+                    drawn.append(pygame.draw.lines(screen, (0, 0, 255), False,
+                                                   line_points[max(start, apex_idx):end + 1], 2))
+            if drawn:
+                dirty.append(self.trajectory_dirty_rect(screen_points, drawn[0].unionall(drawn[1:]), anchor))
+                return dirty
+
+        # La trayectoria ya no se dibuja: su zona anterior debe borrarse
+        if self.drawn_rect is not None:
+            dirty.append(self.drawn_rect)
+            self.drawn_rect = None
+        return dirty
+
+    def trajectory_dirty_rect(self, screen_points, drawn_rect, anchor=None):
+        """Zona de la trayectoria que cambió desde el cuadro anterior
+
+        Normalmente solo el tramo que termina en los puntos nuevos; si la
+        trayectoria reapareció o el buffer descartó puntos viejos, toda ella.
+        Con la trayectoria simplificada, 'anchor' es el número de su último
+        vértice fijo: los vértices posteriores pueden moverse de un cuadro a
+        otro, así que la zona cubre todo el tramo desde el último vértice
+        fijo del cuadro anterior hasta la punta.
+        """
+        import pygame
+
+        new = self.trajectory.total - self.drawn_total
+        first = self.trajectory.total - new - 1  # Número del primer punto que pudo cambiar
+        if anchor is not None and self.drawn_anchor is not None:
+            first = min(first, self.drawn_anchor)
+        whole = (self.drawn_rect is None or self.trajectory.first_index != self.drawn_first
+                 or new < 0 or first < self.trajectory.first_index
+                 or (anchor is None) != (self.drawn_anchor is None))
+        self.drawn_total = self.trajectory.total
+        self.drawn_first = self.trajectory.first_index
+        self.drawn_anchor = anchor
+        previous, self.drawn_rect = self.drawn_rect, drawn_rect
+        if whole:
+            return drawn_rect if previous is None else drawn_rect.union(previous)
+
+        tip = screen_points[first - self.trajectory.first_index:]
+        left, top = tip.min(axis=0)
+        right, bottom = tip.max(axis=0)
+        # Margen por el grosor de la línea (y el ajuste al píxel de los vértices)
+        return pygame.Rect(int(left) - 3, int(top) - 3, int(right - left) + 7, int(bottom - top) + 7)
@@ -0,0 +1,105 @@
+import math
+
+import numpy as np
+import pygame
+
+
+class ArrowAtlas:
+    """Atlas de sprites de la flecha pre-rotada a rumbos cuantizados
+
+    Todas las orientaciones se dibujan una sola vez en una única Surface
+    (una celda por rumbo). Dibujar una flecha es un blit de su celda y muchas
+    flechas se dibujan con una sola llamada a Surface.blits.
+    """
+
+    def __init__(self, step=1.0, length=20, color=(0, 0, 0)):
+        """Genera el atlas con una celda cada 'step' grados"""
+        self.step = step
+        self.length = length
+        self.color = color
+        self.count = int(round(360 / step))
+
+        # Cada celda es cuadrada y tiene la cola de la flecha en su centro
+        self.half = length + 4
+        self.cell = 2 * self.half
+        self.columns = int(math.ceil(math.sqrt(self.count)))
+        rows = int(math.ceil(self.count / self.columns))
+
+        self.surface = pygame.Surface((self.columns * self.cell, rows * self.cell), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert_alpha()
+
+        # Tras dibujar, cada celda se recorta a los píxeles visibles para no
+        # copiar transparencia en cada blit; offset_x/offset_y guardan la
+        # posición de la cola de la flecha dentro del recorte
+        self.areas = []
+        self.offset_x = np.empty(self.count, dtype=np.intp)
+        self.offset_y = np.empty(self.count, dtype=np.intp)
+        for i in range(self.count):
+            cell = pygame.Rect((i % self.columns) * self.cell, (i // self.columns) * self.cell,
+                               self.cell, self.cell)
+            self._draw_arrow(cell, i * step)
+            area = self.surface.subsurface(cell).get_bounding_rect().move(cell.topleft)
+            self.areas.append(area)
+            self.offset_x[i] = cell.x + self.half - area.x
+            self.offset_y[i] = cell.y + self.half - area.y
+
+    def _draw_arrow(self, area, angle):
+        """Dibuja la flecha en una celda con el rumbo de pantalla 'angle' (grados)"""
+        tail_x = area.x + self.half
+        tail_y = area.y + self.half
+        # Dibujar flecha rotada
+        head_x = tail_x + self.length * math.cos(math.radians(angle))
+        head_y = tail_y + self.length * math.sin(math.radians(angle))
+
+        # Dibujar línea principal
+        pygame.draw.line(self.surface, self.color, (tail_x, tail_y), (head_x, head_y), 3)
+
+        # Dibujar puntas triangulares
+        pygame.draw.polygon(self.surface, self.color, [
+            (head_x, head_y),
+            (head_x - 10 * math.cos(math.radians(angle - 20)),
+             head_y - 10 * math.sin(math.radians(angle - 20))),
+            (head_x - 5 * math.cos(math.radians(angle)),
+             head_y - 5 * math.sin(math.radians(angle))),
+            (head_x - 10 * math.cos(math.radians(angle + 20)),
+             head_y - 10 * math.sin(math.radians(angle + 20)))
+        ])
+
+    def index(self, angle):
+        """Celda más cercana a un rumbo de pantalla en grados"""
+        return int(round(angle / self.step)) % self.count
+
+    def blit(self, surface, x, y, angle):
+        """Dibuja una flecha con la cola en (x, y) y rumbo de pantalla 'angle'"""
+        i = self.index(angle)
+        return surface.blit(self.surface, (int(round(x)) - self.offset_x[i], int(round(y)) - self.offset_y[i]),
+                            self.areas[i])
+
+    def blit_many(self, surface, xs, ys, angles):
+        """Dibuja muchas flechas con una sola llamada a Surface.blits
+
+        xs, ys y angles son arreglos de NumPy con la posición de la cola y el
+        rumbo de pantalla (grados) de cada flecha.
+        """
+        if len(xs) == 0:
+            return
+        index = np.rint(np.asarray(angles) / self.step).astype(np.intp) % self.count
+        dest_x = np.rint(xs).astype(np.intp) - self.offset_x[index]
+        dest_y = np.rint(ys).astype(np.intp) - self.offset_y[index]
+        areas = self.areas
+        atlas = self.surface
+        surface.blits([(atlas, (dx, dy), areas[i])
+                       for dx, dy, i in zip(dest_x.tolist(), dest_y.tolist(), index.tolist())],
+                      doreturn=False)
+
+
+_shared_atlas = None
+
+
+def get_atlas():
+    """Devuelve el atlas compartido, generándolo la primera vez que se usa"""
+    global _shared_atlas
+    if _shared_atlas is None:
+        _shared_atlas = ArrowAtlas()
+    return _shared_atlas
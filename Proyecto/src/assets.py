@@ -0,0 +1,38 @@
+import os
+
+import pygame
+
+
+# Carpeta de recursos junto a los módulos, independiente del directorio actual
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+
+def asset_path(name):
+    """Devuelve la ruta absoluta de un recurso de la carpeta assets"""
+    return os.path.join(ASSETS_DIR, name)
+
+
+def load_image(name, size=None):
+    """Carga una imagen de assets, opcionalmente escalada a 'size' (ancho, alto)
+
+    Si ya hay una ventana abierta la imagen se convierte al formato de la
+    pantalla. Lanza FileNotFoundError o pygame.error si no se puede cargar.
+    """
+    path = asset_path(name)
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+    image = pygame.image.load(path)
+    if size is not None:
+        image = pygame.transform.scale(image, size)
+    return to_display_format(image)
+
+
+def to_display_format(surface):
+    """Convierte una Surface al formato de la pantalla (con alfa) si existe una ventana
+
+    Los blits entre superficies del mismo formato evitan la conversión de
+    píxeles en cada cuadro.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha()
@@ -0,0 +1,50 @@
+import pygame
+
+
+class BackgroundLayer:
+    """Capa de fondo estático (cielo, cuadrícula, reglas y suelo) pre-renderizada
+
+    El contenido solo depende de la escala, el desplazamiento de la cámara,
+    la línea del suelo y el tamaño de pantalla, así que se dibuja una vez en
+    una Surface y en cada cuadro basta con un blit. Se reconstruye solo
+    cuando cambia alguno de esos valores.
+    """
+
+    def __init__(self, renderer):
+        """Crea la capa asociada a un renderizador (sin dibujar todavía)"""
+        self.renderer = renderer
+        self.surface = None
+        self.key = None
+        self.rebuilds = 0  # Veces que se ha reconstruido la capa
+
+    def get(self, scale, camera_offset_x, ground_y, height_ruler_x, show_grid=True):
+        """Devuelve la Surface del fondo, reconstruyéndola si cambió la clave"""
+        size = self.renderer.screen.get_size()
+        key = (scale, camera_offset_x, ground_y, size, height_ruler_x, show_grid)
+        if key != self.key:
+            self.rebuild(key)
+        return self.surface
+
+    def invalidate(self):
+        """Fuerza la reconstrucción en el próximo cuadro"""
+        self.key = None
+
+    def rebuild(self, key):
+        """Dibuja todo el contenido estático en la Surface de la capa"""
+        scale, camera_offset_x, ground_y, size, height_ruler_x, show_grid = key
+        if self.surface is None or self.surface.get_size() != size:
+            self.surface = pygame.Surface(size)
+            if pygame.display.get_surface() is not None:
+                self.surface = self.surface.convert()
+
+        renderer = self.renderer
+        renderer.clear_screen(surface=self.surface)
+        if show_grid:
+            renderer.draw_grid(scale, camera_offset_x, ground_y, surface=self.surface)
+        renderer.draw_height_ruler(height_ruler_x, scale, ground_y, surface=self.surface)
+        # Mismo orden que el bucle original: la regla de distancia va antes del suelo
+        renderer.draw_distance_ruler(ground_y + 30, scale, camera_offset_x, surface=self.surface)
+        renderer.draw_ground(ground_y, scale, camera_offset_x, surface=self.surface)
+
+        self.key = key
+        self.rebuilds += 1
@@ -1,12 +1,19 @@
 import pygame
 import math
+import sys
+from assets import load_image, to_display_format
+from cache import LRUCache
 
 
 class Bow:
     """Clase que representa el arco con gráficos mejorados"""
 
-    def __init__(self, x, y):
-        """Inicializa el arco en una posición específica"""
+    def __init__(self, x, y, angle_step=0.5):
+        """Inicializa el arco en una posición específica
+
+        angle_step es la resolución (grados) de las imágenes rotadas que se
+        guardan en caché; normalmente coincide con el paso de ajuste del ángulo.
+        """
         self.x = x
         self.y = y
         self.angle = 45  # Ángulo inicial (grados)
@@ -14,14 +21,18 @@ class Bow:
 
         # Cargar y escalar la imagen del arco
         try:
-            self.original_image = pygame.image.load('assets/bow.png')
-            self.image = pygame.transform.scale(self.original_image, (60, 120))
-        except:
+            self.image = load_image('bow.png', (60, 120))
+        except (FileNotFoundError, pygame.error) as exc:
             # Crear una imagen del arco si no se puede cargar
+            print(f"No se pudo cargar la imagen del arco ({exc}); se dibuja una", file=sys.stderr)
             self.create_bow_image()
 
         self.rect = self.image.get_rect()
 
+        # Imágenes rotadas por ángulo cuantizado (0-90° caben completas)
+        self.angle_step = angle_step
+        self.rotations = LRUCache(maxsize=256)
+
     def create_bow_image(self):
         """Crea una imagen suavizada del arco usando curvas"""
         self.original_image = pygame.Surface((60, 120), pygame.SRCALPHA)
@@ -64,17 +75,37 @@ class Bow:
         """Establece una fuerza específica"""
         self.draw_strength = max(10, min(100, strength))
 
-    def draw(self, screen, ground_y):
-        """Dibuja el arco rotado según el ángulo"""
+    def convert(self):
+        """Convierte la imagen al formato de la pantalla (una vez abierta la ventana)"""
+        self.image = to_display_format(self.image)
+        self.rotations.clear()
+
+    def rotated_image(self):
+        """Devuelve la imagen rotada al ángulo actual, redondeado a angle_step"""
+        key = round(self.angle / self.angle_step)
+        return self.rotations.get_or_create(
+            key, lambda: pygame.transform.rotate(self.image, key * self.angle_step))
+
+    def draw(self, screen, ground_y, x=None):
+        """Dibuja el arco rotado según el ángulo y devuelve la zona dibujada
+
+        x es la columna de pantalla del arco (por defecto self.x); con la
+        cámara desplazada, el arco se mueve con la escena. Devuelve None si
+        queda fuera de la pantalla.
+        """
+        x = self.x if x is None else x
         # CORRECCIÓN: Cambiar el signo para que coincida con la dirección adecuada
-        rotated_bow = pygame.transform.rotate(self.image, self.angle)
+        rotated_bow = self.rotated_image()
         bow_rect = rotated_bow.get_rect()
-        bow_rect.center = (self.x, ground_y - self.y)
-        screen.blit(rotated_bow, bow_rect)
+        bow_rect.center = (x, ground_y - self.y)
+        if not bow_rect.colliderect(screen.get_rect()):
+            return None
+        drawn = screen.blit(rotated_bow, bow_rect)
 
         # Dibujar la cuerda tensada
         string_length = 40
-        string_end_x = self.x + string_length * math.cos(math.radians(self.angle))
+        string_end_x = x + string_length * math.cos(math.radians(self.angle))
         string_end_y = ground_y - self.y - string_length * math.sin(math.radians(self.angle))
-        pygame.draw.line(screen, (220, 220, 220), (self.x, ground_y - self.y),
-                         (string_end_x, string_end_y), 2)
\ No newline at end of file
+        string_rect = pygame.draw.line(screen, (220, 220, 220), (x, ground_y - self.y),
+                                       (string_end_x, string_end_y), 2)
+        return drawn.union(string_rect)
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Caché con desalojo LRU (el menos usado recientemente) y contadores de aciertos"""
+
+    def __init__(self, maxsize=256):
+        """Crea una caché vacía que guarda como máximo 'maxsize' entradas"""
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Devuelve el valor guardado para 'key' y lo marca como usado"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """Guarda un valor, desalojando el más antiguo si se supera el tamaño"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """Devuelve el valor de 'key' o lo crea con factory() si no existe"""
+        value = self.get(key, self)
+        if value is self:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Vacía la caché (los contadores se conservan)"""
+        self._entries.clear()
+
+    def stats(self):
+        """Devuelve un diccionario con aciertos, fallos, tamaño y tasa de acierto"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
+class TextCache(LRUCache):
+    """Caché de superficies de texto ya renderizadas, por (fuente, texto, color)
+
+    Evita repetir font.render para fragmentos que se usan una y otra vez,
+    como "·", " = " o " m/s".
+    """
+
+    def render(self, font, text, color, antialias=True):
+        """Equivalente a font.render(text, antialias, color) pero cacheado"""
+        key = (font, text, color, antialias)
+        return self.get_or_create(key, lambda: font.render(text, antialias, color))
@@ -0,0 +1,143 @@
+import math
+
+import numpy as np
+
+
+def nice_step(minimum):
+    """Menor valor de la serie 1, 2, 5, 10, 20, 50... que es mayor o igual a 'minimum'
+
+    Sirve para elegir el espaciado de la cuadrícula y de las reglas según el
+    zoom: con un mínimo en píxeles dividido por la escala, las marcas nunca
+    quedan más juntas que ese mínimo.
+    """
+    base = 10.0 ** math.floor(math.log10(minimum))
+    for factor in (1, 2, 5):
+        if factor * base >= minimum * (1 - 1e-9):
+            return factor * base
+    return 10 * base
+
+
+def tick_range(low, high, step):
+    """Índices k de las marcas k·step que caen dentro de [low, high]"""
+    return range(math.ceil(low / step - 1e-9), math.floor(high / step + 1e-9) + 1)
+
+
+def visible_runs(points, width, height, margin=0):
+    """Tramos de la polilínea 'points' (n, 2, en pantalla) que tocan la pantalla
+
+    Un segmento se dibuja si su rectángulo envolvente corta la pantalla
+    (ampliada en 'margin' píxeles). Devuelve una lista de (inicio, fin) con
+    los índices de vértices de cada tramo consecutivo de segmentos visibles
+    (fin incluido).
+    """
+    if len(points) < 2:
+        return []
+    x, y = points[:-1, 0], points[:-1, 1]
+    next_x, next_y = points[1:, 0], points[1:, 1]
+    visible = ((np.minimum(x, next_x) < width + margin) & (np.maximum(x, next_x) >= -margin)
+               & (np.minimum(y, next_y) < height + margin) & (np.maximum(y, next_y) >= -margin))
+    if visible.all():
+        return [(0, len(points) - 1)]
+    # Bordes de los tramos de segmentos visibles: el vértice final de un tramo
+    # es el siguiente al último segmento visible
+    edges = np.diff(np.concatenate(([0], visible.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+class Camera:
+    """Vista de la escena: escala (píxeles por metro) y posición en pantalla del origen
+
+    El punto (x, y) del mundo se ve en (x·scale + offset_x, ground_y - y·scale):
+    offset_x es la columna de x = 0 y ground_y la fila del suelo (y = 0).
+    Ambos se mantienen en píxeles enteros, así el fondo y la trayectoria
+    simplificada quedan alineados al píxel y mover la cámara no obliga a
+    simplificar de nuevo la trayectoria.
+
+    Con 'follow' activo, track() desplaza la cámara lo justo para que la
+    flecha en vuelo no salga del recuadro central de la pantalla.
+    """
+
+    def __init__(self, width=1200, height=600, scale=1.0, offset_x=50, ground_y=500,
+                 min_scale=0.01, max_scale=50.0):
+        """Crea la cámara con la vista inicial, a la que vuelve reset()"""
+        self.width = width
+        self.height = height
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.home = (scale, offset_x, ground_y)
+        self.follow = True
+        self.follow_margin = 0.2  # Fracción de la pantalla libre a cada lado del recuadro
+        self.reset()
+
+    def reset(self):
+        """Vuelve a la vista inicial"""
+        self.scale, self.offset_x, self.ground_y = self.home
+
+    def resize(self, width, height):
+        """Ajusta la cámara al tamaño de la pantalla"""
+        self.width = width
+        self.height = height
+
+    @property
+    def key(self):
+        """Valores que definen la vista; si cambian, cambia todo el cuadro"""
+        return self.scale, self.offset_x, self.ground_y
+
+    def to_screen(self, x, y):
+        """Posición en pantalla del punto (x, y) del mundo"""
+        return x * self.scale + self.offset_x, self.ground_y - y * self.scale
+
+    def to_world(self, screen_x, screen_y):
+        """Punto del mundo que se ve en la posición de pantalla dada"""
+        return (screen_x - self.offset_x) / self.scale, (self.ground_y - screen_y) / self.scale
+
+    def visible_world(self):
+        """Rectángulo visible del mundo: (x_min, x_max, y_min, y_max) en metros"""
+        x_min, y_min = self.to_world(0, self.height)
+        x_max, y_max = self.to_world(self.width, 0)
+        return x_min, x_max, y_min, y_max
+
+    def pan(self, dx, dy):
+        """Desplaza la vista dx, dy píxeles (la escena se mueve con el ratón)"""
+        self.offset_x += round(dx)
+        self.ground_y += round(dy)
+
+    def zoom(self, factor, anchor=None):
+        """Multiplica la escala por 'factor' manteniendo fijo el punto de pantalla 'anchor'
+
+        Sin 'anchor' se usa el centro de la pantalla. La escala se limita a
+        [min_scale, max_scale].
+        """
+        if anchor is None:
+            anchor = (self.width / 2, self.height / 2)
+        world_x, world_y = self.to_world(*anchor)
+        self.scale = max(self.min_scale, min(self.max_scale, self.scale * factor))
+        self.offset_x = round(anchor[0] - world_x * self.scale)
+        self.ground_y = round(anchor[1] + world_y * self.scale)
+
+    def track(self, x, y):
+        """Sigue el punto (x, y) del mundo si 'follow' está activo
+
+        La cámara solo se mueve cuando el punto sale del recuadro central.
+        Por la izquierda y por abajo el recuadro llega hasta la vista inicial
+        (el origen y la línea del suelo), de modo que al disparar la cámara
+        no se mueve hasta que la flecha se aleja y, al caer, vuelve a
+        mostrar el suelo donde estaba.
+        """
+        if not self.follow:
+            return
+        screen_x, screen_y = self.to_screen(x, y)
+        left = min(self.width * self.follow_margin, self.home[1])
+        right = self.width * (1 - self.follow_margin)
+        top = self.height * self.follow_margin
+        bottom = max(top, self.home[2])
+        if screen_x > right:
+            self.offset_x -= math.ceil(screen_x - right)
+        elif screen_x < left:
+            self.offset_x += math.ceil(left - screen_x)
+        if screen_y < top:
+            self.ground_y += math.ceil(top - screen_y)
+        elif screen_y > bottom:
+            self.ground_y -= math.ceil(screen_y - bottom)
@@ -0,0 +1,157 @@
+import numpy as np
+
+
+def douglas_peucker(points, tolerance):
+    """Índices de los vértices que conserva Douglas–Peucker en 'points' (n, 2)
+
+    Siempre incluye el primero y el último; cada tramo entre dos vértices
+    consecutivos pasa a menos de 'tolerance' de todos los puntos que
+    reemplaza.
+    """
+    n = len(points)
+    if n <= 2:
+        return np.arange(n)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    limit = tolerance * tolerance
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start = points[first]
+        segment = points[last] - start
+        inner = points[first + 1:last] - start
+        # Distancia al tramo (no a la recta), así los tramos de largo cero también sirven
+        length2 = segment @ segment
+        if length2 > 0:
+            t = np.clip(inner @ segment / length2, 0.0, 1.0)
+            inner = inner - t[:, None] * segment
+        distance2 = np.einsum('ij,ij->i', inner, inner)
+        worst = int(np.argmax(distance2))
+        if distance2[worst] > limit:
+            split = first + 1 + worst
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+
+class ScreenDecimator:
+    """Simplificación incremental, en píxeles, de una polilínea que crece por el final
+
+    Primero los puntos se ajustan al píxel y se descartan los que caen en el
+    mismo píxel que el anterior; después se aplica Douglas–Peucker con
+    'tolerance' píxeles al tramo pendiente, desde el último vértice fijo
+    hasta la punta. Los vértices que DP conserva antes del último quedan
+    fijos, así que cada cuadro solo vuelve a procesar el tramo reciente (a
+    lo sumo max_pending puntos), no toda la trayectoria.
+
+    Los puntos se identifican por su número desde el inicio de la polilínea,
+    de modo que quien la guarda puede descartar los más antiguos; discard()
+    olvida los vértices fijos correspondientes, así la memoria queda acotada
+    por los puntos que se conservan y no por la duración del vuelo.
+    """
+
+    def __init__(self, tolerance=0.5, max_pending=256):
+        self.tolerance = tolerance
+        self.max_pending = max_pending
+        self._fixed = np.empty((64, 3))  # Vértices fijos: (número, x, y)
+        self.reset()
+
+    def reset(self):
+        """Olvida la polilínea (sin liberar memoria)"""
+        self._fixed_start = 0  # Los vértices fijos anteriores ya se descartaron
+        self._fixed_count = 0
+        self._pending = np.empty((0, 3))  # Desde el último vértice fijo (incluido)
+        self._tail = np.empty((0, 3))  # Vértices actuales del tramo pendiente, sin el primero
+        self.total = 0  # Puntos recibidos
+
+    def extend(self, points, breaks=()):
+        """Agrega los puntos de pantalla 'points' (n, 2) al final de la polilínea
+
+        'breaks' son números de puntos que deben quedar como vértices (por
+        ejemplo donde cambia el color del trazo).
+        """
+        if not len(points):
+            return
+        rows = np.empty((len(points), 3))
+        rows[:, 0] = self.total + np.arange(len(points))
+        rows[:, 1:] = np.rint(points)
+        self.total += len(points)
+
+        # Descartar los puntos que caen en el mismo píxel que el anterior
+        previous = np.empty_like(rows[:, 1:])
+        previous[1:] = rows[:-1, 1:]
+        previous[0] = self._pending[-1, 1:] if len(self._pending) else np.nan
+        keep = (rows[:, 1:] != previous).any(axis=1)
+        for number in breaks:
+            keep |= rows[:, 0] == number
+        rows = rows[keep]
+        if not len(rows):
+            return
+        if not len(self._pending):
+            self._fix(rows[:1])
+            self._pending = rows[:1]
+            rows = rows[1:]
+        pending = np.concatenate((self._pending, rows))
+
+        # Los cortes obligatorios cierran el tramo pendiente en ese vértice
+        for number in sorted(breaks):
+            split = int(np.searchsorted(pending[:, 0], number))
+            if 0 < split < len(pending) and pending[split, 0] == number:
+                vertices = douglas_peucker(pending[:split + 1, 1:], self.tolerance)
+                self._fix(pending[vertices[1:]])
+                pending = pending[split:]
+
+        vertices = douglas_peucker(pending[:, 1:], self.tolerance)
+        if len(pending) > self.max_pending:
+            # Tramo casi recto muy largo: fijarlo entero para acotar el trabajo por cuadro
+            self._fix(pending[vertices[1:]])
+            pending = pending[-1:]
+            vertices = vertices[:1]
+        elif len(vertices) > 2:
+            self._fix(pending[vertices[1:-1]])
+            pending = pending[vertices[-2]:]
+            vertices = vertices[-2:] - vertices[-2]
+        self._pending = pending
+        self._tail = pending[vertices[1:]]
+
+    @property
+    def anchor(self):
+        """Número del último vértice fijo: desde ahí el tramo dibujado puede cambiar"""
+        return int(self._pending[0, 0]) if len(self._pending) else self.total
+
+    def _fix(self, rows):
+        """Agrega vértices a los fijos, ampliando el arreglo si hace falta
+
+        Antes de ampliarlo se mueven los vértices vigentes al principio, para
+        reutilizar el espacio de los descartados.
+        """
+        needed = self._fixed_count + len(rows)
+        if needed > len(self._fixed) and self._fixed_start:
+            live = self._fixed_count - self._fixed_start
+            self._fixed[:live] = self._fixed[self._fixed_start:self._fixed_count]
+            self._fixed_start = 0
+            self._fixed_count = live
+            needed = live + len(rows)
+        if needed > len(self._fixed):
+            grown = np.empty((max(needed, 2 * len(self._fixed)), 3))
+            grown[:self._fixed_count] = self._fixed[:self._fixed_count]
+            self._fixed = grown
+        self._fixed[self._fixed_count:needed] = rows
+        self._fixed_count = needed
+
+    def discard(self, first_number):
+        """Olvida los vértices fijos anteriores al punto first_number"""
+        fixed = self._fixed[self._fixed_start:self._fixed_count]
+        self._fixed_start += int(np.searchsorted(fixed[:, 0], first_number))
+
+    def vertices(self, first_number=0):
+        """Vértices (m, 3) de la polilínea simplificada desde el punto first_number
+
+        Cada fila es (número, x, y) con x e y ajustados al píxel.
+        """
+        fixed = self._fixed[self._fixed_start:self._fixed_count]
+        start = int(np.searchsorted(fixed[:, 0], first_number))
+        return np.concatenate((fixed[start:], self._tail))
@@ -0,0 +1,79 @@
+import pygame
+
+
+class DirtyRegions:
+    """Registro de las zonas de la pantalla que cambiaron en el cuadro actual
+
+    La escena se sigue dibujando completa en la Surface de la pantalla (desde
+    capas cacheadas), pero solo las zonas marcadas se envían a la ventana con
+    pygame.display.update(rects). Lo que se marcó en el cuadro anterior se
+    vuelve a enviar, para borrar lo que ya no está (la flecha en su posición
+    anterior). Si los cambios cubren gran parte de la pantalla, o se pidió un
+    cuadro completo, se recurre a pygame.display.flip().
+    """
+
+    def __init__(self, screen, enabled=True, max_rects=64, max_coverage=0.5):
+        """Crea el registro para la Surface 'screen'
+
+        Con más de max_rects zonas se envía su unión; si el área a enviar
+        supera max_coverage de la pantalla se hace un flip completo.
+        """
+        self.screen = screen
+        self.enabled = enabled
+        self.max_rects = max_rects
+        self.max_coverage = max_coverage
+        self.current = []
+        self.previous = []
+        self.full = True  # El primer cuadro siempre es completo
+        self._keys = {}
+
+        # Contadores de presentación
+        self.flips = 0
+        self.updates = 0
+
+    def mark(self, rect):
+        """Marca una zona (Rect, lista de Rect o None) como modificada"""
+        if not self.enabled or rect is None:
+            return
+        if isinstance(rect, list):
+            self.current.extend(rect)
+        else:
+            self.current.append(rect)
+
+    def mark_changed(self, name, key, rect):
+        """Marca 'rect' solo si el contenido identificado por 'key' cambió desde el último cuadro"""
+        if self._keys.get(name) != key:
+            self._keys[name] = key
+            self.mark(rect)
+
+    def invalidate(self):
+        """Pide que el próximo cuadro se envíe completo"""
+        self.full = True
+
+    def present(self):
+        """Envía el cuadro a la ventana (por zonas o completo) y prepara el siguiente"""
+        rects = self.previous + self.current
+        self.previous = self.current
+        self.current = []
+
+        if not self.enabled or self.full:
+            self.full = False
+            pygame.display.flip()
+            self.flips += 1
+            return
+
+        bounds = self.screen.get_rect()
+        rects = [rect.clip(bounds) for rect in rects]
+        rects = [rect for rect in rects if rect.width and rect.height]
+        if not rects:
+            return
+        if len(rects) > self.max_rects:
+            rects = [rects[0].unionall(rects[1:])]
+
+        area = sum(rect.width * rect.height for rect in rects)
+        if area > self.max_coverage * bounds.width * bounds.height:
+            pygame.display.flip()
+            self.flips += 1
+        else:
+            pygame.display.update(rects)
+            self.updates += 1
@@ -0,0 +1,234 @@
+import argparse
+import gzip
+import io
+import json
+import os
+import sys
+
+import numpy as np
+
+from physics import Physics
+from forces import QuadraticDrag
+
+
+# Columnas de cada muestra exportada
+COLUMNS = ['t', 'x', 'y', 'vx', 'vy']
+
+DEFAULT_CHUNK_SIZE = 65536  # Muestras por bloque: acota la memoria usada
+
+MANIFEST = 'manifest.json'
+
+
+def trajectory_samples(physics, initial_velocity, angle, dt, resolve_contact=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Genera las muestras (t, x, y, vx, vy) de un disparo en bloques de hasta chunk_size filas
+
+    Son las mismas muestras que la línea de tiempo de Arrow: t = k·dt desde
+    el lanzamiento hasta el primer paso en el suelo, que con resolve_contact
+    se reemplaza por el instante exacto del contacto. A diferencia de Arrow,
+    nunca se calcula la trayectoria completa de una vez, así que la memoria
+    no depende de la duración del vuelo ni de dt.
+    """
+    if chunk_size < 2:
+        raise ValueError("chunk_size debe ser al menos 2")
+    trajectory = None
+    if physics.drag is None:
+        flight_time = physics.flight_time(initial_velocity, angle)
+    else:
+        # La integración adaptativa guarda unas decenas de pasos, sea cual sea dt
+        trajectory = physics.simulate(initial_velocity, angle)
+        flight_time = trajectory.contact_time
+
+    start = 0
+    while True:
+        steps = start + np.arange(chunk_size)
+        times = steps * dt
+        states = physics.states_at(initial_velocity, angle, times, trajectory)
+        grounded = np.flatnonzero((states[1] <= 0) & (steps > 0))
+        last = grounded[0] if len(grounded) else None
+
+        count = chunk_size if last is None else last + 1
+        chunk = np.empty((count, 5))
+        chunk[:, 0] = times[:count]
+        chunk[:, 1:] = states[:, :count].T
+        if last is not None:
+            if resolve_contact:
+                # El contacto ocurre entre el paso anterior (y > 0) y este (y <= 0)
+                step = steps[last]
+                landing_time = min(max(max(flight_time, 0.0), (step - 1) * dt), step * dt)
+                chunk[last, 0] = landing_time
+                chunk[last, 1:] = physics.states_at(initial_velocity, angle, np.array([landing_time]),
+                                                    trajectory)[:, 0]
+                chunk[last, 2] = 0.0
+            yield chunk
+            return
+        yield chunk
+        start += chunk_size
+
+
+def arrow_samples(arrow, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Genera en bloques las muestras de la línea de tiempo de una flecha ya disparada"""
+    timeline = arrow.timeline
+    for start in range(0, len(timeline), chunk_size):
+        block = timeline[start:start + chunk_size]
+        chunk = np.empty((len(block), 5))
+        chunk[:, 0] = (start + np.arange(len(block))) * arrow.timeline_dt
+        chunk[:, 1:] = block[:, :4]
+        if start + len(block) == len(timeline):
+            chunk[-1, 0] = arrow.landing_time
+        yield chunk
+
+
+def downsample(chunks, every):
+    """Conserva una de cada 'every' muestras (y siempre la última, el aterrizaje)"""
+    if every < 1:
+        raise ValueError("every debe ser al menos 1")
+    if every == 1:
+        yield from chunks
+        return
+    offset = 0
+    pending = None  # Última fila descartada, por si era la última de todas
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        first = (-offset) % every
+        kept = chunk[first::every]
+        offset += len(chunk)
+        pending = None if (len(chunk) - 1 - first) % every == 0 else chunk[-1:]
+        if len(kept):
+            yield kept
+    if pending is not None:
+        yield pending
+
+
+def open_output(path, text=True, compress=None, level=6):
+    """Abre 'path' para escribir, con gzip si compress o si termina en .gz
+
+    '-' es la salida estándar (sin comprimir salvo que se pida).
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    if path == '-':
+        raw = sys.stdout.buffer
+        if compress:
+            raw = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=level)
+        return io.TextIOWrapper(raw, encoding='utf-8', write_through=True) if text else raw
+    if compress:
+        return gzip.open(path, 'wt' if text else 'wb', compresslevel=level, encoding='utf-8' if text else None)
+    return open(path, 'w', encoding='utf-8') if text else open(path, 'wb')
+
+
+def write_csv(chunks, stream):
+    """Escribe las muestras como CSV con cabecera; devuelve el número de filas"""
+    stream.write(','.join(COLUMNS) + '\n')
+    rows = 0
+    for chunk in chunks:
+        np.savetxt(stream, chunk, fmt='%.17g', delimiter=',')
+        rows += len(chunk)
+    return rows
+
+
+def write_ndjson(chunks, stream):
+    """Escribe un objeto JSON por muestra y línea; devuelve el número de filas"""
+    line = '{' + ', '.join(f'"{name}": %.17g' for name in COLUMNS) + '}'
+    rows = 0
+    for chunk in chunks:
+        np.savetxt(stream, chunk, fmt=line)
+        rows += len(chunk)
+    return rows
+
+
+def write_columns(chunks, directory, compress=False, metadata=None, level=6):
+    """Escribe un archivo binario float64 (little-endian) por columna en 'directory'
+
+    manifest.json guarda las columnas, el número de filas, si están
+    comprimidas con gzip y los metadatos del disparo. Sin comprimir, cada
+    columna se lee con numpy.fromfile o mapeada en memoria. Devuelve el
+    número de filas.
+    """
+    os.makedirs(directory, exist_ok=True)
+    suffix = '.f64.gz' if compress else '.f64'
+    files = [gzip.open(os.path.join(directory, name + suffix), 'wb', compresslevel=level) if compress
+             else open(os.path.join(directory, name + suffix), 'wb') for name in COLUMNS]
+    rows = 0
+    try:
+        for chunk in chunks:
+            for column, f in enumerate(files):
+                f.write(np.ascontiguousarray(chunk[:, column], dtype='<f8').tobytes())
+            rows += len(chunk)
+    finally:
+        for f in files:
+            f.close()
+    manifest = {'columns': COLUMNS, 'rows': rows, 'dtype': '<f8', 'compressed': bool(compress),
+                'metadata': metadata or {}}
+    with open(os.path.join(directory, MANIFEST), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+    return rows
+
+
+def export_shot(physics, initial_velocity, angle, dt, output, output_format='csv', every=1,
+                compress=None, resolve_contact=True, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Exporta las muestras de un disparo a 'output' y devuelve el número de filas escritas
+
+    output_format es 'csv', 'ndjson' (output es un archivo, o '-' para la
+    salida estándar) o 'columns' (output es un directorio).
+    """
+    chunks = downsample(trajectory_samples(physics, initial_velocity, angle, dt, resolve_contact, chunk_size),
+                        every)
+    if output_format == 'columns':
+        metadata = {'velocity': initial_velocity, 'angle': angle, 'gravity': physics.gravity, 'dt': dt,
+                    'every': every, 'drag': physics.drag is not None}
+        return write_columns(chunks, output, bool(compress), metadata)
+    writers = {'csv': write_csv, 'ndjson': write_ndjson}
+    if output_format not in writers:
+        raise ValueError(f"formato de exportación desconocido: {output_format}")
+    stream = open_output(output, compress=compress)
+    try:
+        return writers[output_format](chunks, stream)
+    finally:
+        if output == '-':
+            # No cerrar la salida estándar: vaciar y, si hay gzip, terminarlo
+            stream.flush()
+            raw = stream.detach()
+            if raw is not sys.stdout.buffer:
+                raw.close()
+        else:
+            stream.close()
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos de la exportación de trayectorias"""
+    parser = argparse.ArgumentParser(description="Exporta la trayectoria muestreada de un disparo")
+    parser.add_argument('--angle', type=float, required=True, help="ángulo de lanzamiento (grados)")
+    parser.add_argument('--velocity', type=float, required=True, help="velocidad inicial (m/s)")
+    parser.add_argument('--gravity', type=float, default=9.8, help="gravedad (m/s²)")
+    parser.add_argument('--dt', type=float, default=1 / 60, help="intervalo entre muestras (s)")
+    parser.add_argument('--drag', action='store_true', help="con rozamiento del aire (flecha de 25 g)")
+    parser.add_argument('--wind', type=float, default=None, metavar='M/S',
+                        help="viento horizontal constante (positivo a favor); implica --drag")
+    parser.add_argument('--format', choices=('csv', 'ndjson', 'columns'), default='csv',
+                        help="csv, ndjson (un objeto por línea) o columns (un .f64 por columna en un directorio)")
+    parser.add_argument('--every', type=int, default=1,
+                        help="conservar una de cada N muestras (la última siempre se conserva)")
+    parser.add_argument('--gzip', action='store_true', default=None,
+                        help="comprimir con gzip (automático si la salida termina en .gz)")
+    parser.add_argument('--no-contact-resolution', dest='resolve_contact', action='store_false',
+                        help="terminar en el primer paso bajo el suelo en lugar del instante del contacto")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="muestras por bloque (limita la memoria usada)")
+    parser.add_argument('-o', '--output', default='-',
+                        help="archivo de salida ('-' = salida estándar) o directorio con --format columns")
+    args = parser.parse_args(argv)
+
+    if args.dt <= 0 or args.gravity <= 0:
+        parser.error("la gravedad y dt deben ser positivos")
+    if args.format == 'columns' and args.output == '-':
+        parser.error("--format columns necesita un directorio de salida (-o)")
+    drag = QuadraticDrag(wind=args.wind or 0.0) if args.drag or args.wind is not None else None
+    rows = export_shot(Physics(gravity=args.gravity, drag=drag), args.velocity, args.angle, args.dt,
+                       args.output, args.format, args.every, args.gzip, args.resolve_contact, args.chunk_size)
+    print(f"{rows} muestras exportadas", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
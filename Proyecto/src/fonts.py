@@ -0,0 +1,125 @@
+import json
+import os
+
+import pygame
+
+
+def default_cache_path():
+    """Ruta del archivo de caché de fuentes (se puede cambiar con ARCO_FONT_CACHE)
+
+    Si la variable de entorno existe pero está vacía, no se usa caché en disco.
+    """
+    path = os.environ.get('ARCO_FONT_CACHE')
+    if path is not None:
+        return path or None
+    return os.path.join(os.path.expanduser('~'), '.cache', 'simulacion_arco', 'fonts.json')
+
+
+class FontRegistry:
+    """Registro central de fuentes: resuelve cada (familia, tamaño, estilo) una sola vez
+
+    pygame.font.SysFont recorre las fuentes del sistema (fc-list en Linux), lo
+    que es lento. Aquí la búsqueda se hace una vez por familia y estilo, y la
+    ruta resultante se guarda opcionalmente en disco para que los siguientes
+    arranques creen las fuentes directamente con pygame.font.Font.
+    """
+
+    def __init__(self, cache_path=None):
+        """Crea el registro; cache_path=None desactiva la caché en disco"""
+        self.cache_path = cache_path
+        self._fonts = {}      # (familia, tamaño, negrita, cursiva) -> Font
+        self._resolved = {}   # (familia, negrita, cursiva) -> (ruta, negrita_falsa, cursiva_falsa)
+        self.lookups = 0      # Búsquedas reales en las fuentes del sistema
+        self._load_cache()
+
+    def get(self, family, size, bold=False, italic=False):
+        """Devuelve la fuente pedida, creándola la primera vez"""
+        family = family.lower()
+        key = (family, size, bold, italic)
+        font = self._fonts.get(key)
+        if font is None:
+            path, fake_bold, fake_italic = self._resolve(family, bold, italic)
+            font = pygame.font.Font(path, size)
+            if fake_bold:
+                font.set_bold(True)
+            if fake_italic:
+                font.set_italic(True)
+            self._fonts[key] = font
+        return font
+
+    def _resolve(self, family, bold, italic):
+        """Busca la ruta del archivo de fuente para una familia y estilo"""
+        key = (family, bold, italic)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            # SysFont hace la búsqueda; el constructor solo captura el resultado
+            resolved = pygame.font.SysFont(family, 1, bold, italic,
+                                           constructor=lambda path, size, b, i: (path, b, i))
+            self._resolved[key] = resolved
+            self.lookups += 1
+            self._save_cache()
+        return resolved
+
+    def _load_cache(self):
+        """Carga las rutas resueltas en ejecuciones anteriores, si existen"""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return
+        for entry in entries:
+            try:
+                family, bold, italic, path, fake_bold, fake_italic = entry
+            except (TypeError, ValueError):
+                continue
+            # Descartar fuentes que ya no existen en el sistema
+            if path is not None and not os.path.exists(path):
+                continue
+            self._resolved[(family, bold, italic)] = (path, fake_bold, fake_italic)
+
+    def _save_cache(self):
+        """Guarda las rutas resueltas; un fallo al escribir no es grave"""
+        if not self.cache_path:
+            return
+        entries = [[family, bold, italic, path, fake_bold, fake_italic]
+                   for (family, bold, italic), (path, fake_bold, fake_italic) in self._resolved.items()]
+        try:
+            os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+        except OSError:
+            pass
+
+
+# Registro compartido por toda la aplicación
+registry = FontRegistry(default_cache_path())
+
+
+def get_font(family, size, bold=False, italic=False):
+    """Atajo para obtener una fuente del registro compartido"""
+    return registry.get(family, size, bold, italic)
+
+
+class LazyFont:
+    """Atributo de clase con una fuente del registro, creada la primera vez que se usa
+
+    Tras el primer acceso la fuente queda guardada en la instancia, que tiene
+    prioridad sobre este descriptor, así que los accesos siguientes no
+    tienen ningún costo extra.
+    """
+
+    def __init__(self, family, size, bold=False, italic=False):
+        self.args = (family, size, bold, italic)
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        font = get_font(*self.args)
+        instance.__dict__[self.name] = font
+        return font
@@ -0,0 +1,354 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from physics import find_ground_contact
+
+
+# El estado de un disparo es el vector (x, y, vx, vy). Todas las funciones
+# aceptan también estados por lotes de forma (4, n), una columna por disparo.
+X, Y, VX, VY = range(4)
+
+
+class ForceModel:
+    """Interfaz de un modelo de fuerza: devuelve la aceleración que produce
+
+    acceleration recibe posiciones y velocidades (escalares o arreglos de
+    NumPy de la misma forma) y devuelve (ax, ay). Los modelos se combinan con
+    CombinedForces.
+    """
+
+    def acceleration(self, x, y, vx, vy):
+        raise NotImplementedError
+
+
+class Gravity(ForceModel):
+    """Gravedad uniforme hacia abajo"""
+
+    def __init__(self, gravity):
+        self.gravity = gravity
+
+    def acceleration(self, x, y, vx, vy):
+        return 0.0, -self.gravity
+
+
+class QuadraticDrag(ForceModel):
+    """Rozamiento del aire proporcional al cuadrado de la velocidad relativa
+
+    F = ½·ρ·Cd·A·|v - w|·(v - w), con A el área frontal del astil de
+    diámetro 'diameter' y w el viento horizontal constante (positivo a favor
+    del disparo). Los valores por defecto corresponden a una flecha de 25 g.
+    """
+
+    def __init__(self, mass=0.025, diameter=0.0075, drag_coefficient=2.0, air_density=1.225, wind=0.0):
+        self.mass = mass
+        self.diameter = diameter
+        self.drag_coefficient = drag_coefficient
+        self.air_density = air_density
+        self.wind = wind
+
+    @property
+    def coefficient(self):
+        """k = ½·ρ·Cd·A / m, de modo que a = -k·|v - w|·(v - w)"""
+        area = math.pi * (self.diameter / 2) * (self.diameter / 2)
+        return 0.5 * self.air_density * self.drag_coefficient * area / self.mass
+
+    def acceleration(self, x, y, vx, vy):
+        k = self.coefficient
+        rel_x = vx - self.wind
+        speed = np.sqrt(rel_x * rel_x + vy * vy)
+        return -k * speed * rel_x, -k * speed * vy
+
+
+class CombinedForces(ForceModel):
+    """Suma de varios modelos de fuerza"""
+
+    def __init__(self, models):
+        self.models = list(models)
+
+    def acceleration(self, x, y, vx, vy):
+        ax = 0.0
+        ay = 0.0
+        for model in self.models:
+            mx, my = model.acceleration(x, y, vx, vy)
+            ax = ax + mx
+            ay = ay + my
+        return ax, ay
+
+
+def derivative(model, state):
+    """Derivada del estado (x, y, vx, vy) -> (vx, vy, ax, ay)"""
+    ax, ay = model.acceleration(state[X], state[Y], state[VX], state[VY])
+    # Las aceleraciones constantes se expanden a la forma del lote
+    zeros = 0.0 * state[VX]
+    return np.array([state[VX], state[VY], ax + zeros, ay + zeros])
+
+
+# Tablero de Dormand–Prince 5(4): la solución de orden 5 avanza el estado y
+# la diferencia con la de orden 4 estima el error local del paso
+_A = (
+    (),
+    (1 / 5,),
+    (3 / 40, 9 / 40),
+    (44 / 45, -56 / 15, 32 / 9),
+    (19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729),
+    (9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656),
+)
+_B = (35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84)
+_E = (71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40)
+
+
+def rk_step(model, state, h, k1=None):
+    """Un paso de Dormand–Prince de tamaño h (escalar o un valor por disparo)
+
+    Devuelve (nuevo_estado, error_estimado, derivada_en_el_nuevo_estado); la
+    última se reutiliza como k1 del paso siguiente (FSAL).
+    """
+    if k1 is None:
+        k1 = derivative(model, state)
+    k = [k1]
+    for a in _A[1:]:
+        increment = sum(coefficient * ki for coefficient, ki in zip(a, k) if coefficient)
+        k.append(derivative(model, state + h * increment))
+    new_state = state + h * sum(b * ki for b, ki in zip(_B, k) if b)
+    k.append(derivative(model, new_state))
+    error = h * sum(e * ki for e, ki in zip(_E, k) if e)
+    return new_state, error, k[-1]
+
+
+def _error_norm(error, state, new_state, rtol, atol):
+    """Norma RMS del error escalado por la tolerancia (<= 1 se acepta el paso)"""
+    scale = atol + rtol * np.maximum(np.abs(state), np.abs(new_state))
+    return np.sqrt(np.mean((error / scale) ** 2, axis=0))
+
+
+def _step_factor(norm):
+    """Factor de cambio del paso a partir de la norma del error (orden 5)"""
+    with np.errstate(divide='ignore'):
+        factor = 0.9 * np.power(norm, -0.2)
+    return np.clip(factor, 0.2, 5.0)
+
+
+def _initial_step(model, state, rtol, atol):
+    """Estimación del primer paso (Hairer, Nørsett y Wanner)"""
+    scale = atol + rtol * np.abs(state)
+    f0 = derivative(model, state)
+    d0 = np.sqrt(np.mean((state / scale) ** 2, axis=0))
+    d1 = np.sqrt(np.mean((f0 / scale) ** 2, axis=0))
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6, 0.01 * d0 / np.maximum(d1, 1e-300))
+    return np.maximum(h0, 1e-6), f0
+
+
+AdaptiveTrajectory = namedtuple('AdaptiveTrajectory', [
+    'times', 'states', 'contact_time', 'contact_state', 'steps', 'rejected'
+])
+
+
+def integrate(model, state0, rtol=1e-9, atol=1e-9, max_time=600.0):
+    """Integra un disparo con paso adaptativo hasta que toca el suelo (y = 0)
+
+    El tamaño de cada paso se ajusta para que el error local estimado quede
+    dentro de rtol/atol, así que se usan pocos pasos largos donde la
+    trayectoria es suave. El contacto se ubica con precisión dentro del
+    último paso. Devuelve un AdaptiveTrajectory con los pasos aceptados
+    (times, states de forma (n, 4)), el instante y el estado del contacto y
+    los contadores de pasos aceptados y rechazados.
+    """
+    state = np.asarray(state0, dtype=np.float64)
+    times = [0.0]
+    states = [state]
+    if state[Y] <= 0 and state[VY] <= 0:
+        # Sale rasante o hacia abajo: toca el suelo en el instante inicial
+        return AdaptiveTrajectory(np.array(times), np.array(states), 0.0, state.copy(), 0, 0)
+
+    h, k1 = _initial_step(model, state, rtol, atol)
+    h = float(h)
+    t = 0.0
+    rejected = 0
+    while t < max_time:
+        new_state, error, k_next = rk_step(model, state, h, k1)
+        norm = float(_error_norm(error, state, new_state, rtol, atol))
+        if norm > 1.0:
+            h *= float(_step_factor(norm))
+            rejected += 1
+            continue
+
+        if new_state[Y] <= 0 and state[Y] <= 0:
+            # El primer paso saltó todo el vuelo: acortarlo hasta quedar en el aire
+            h /= 2
+            continue
+        if new_state[Y] <= 0:
+            # El contacto está dentro de este paso
+            base_time, base_state, base_k1 = t, state, k1
+            contact = float(find_ground_contact(
+                lambda s: rk_step(model, base_state, s - base_time, base_k1)[0][Y],
+                base_time, base_time + h))
+            contact_state = rk_step(model, base_state, contact - base_time, base_k1)[0]
+            contact_state[Y] = 0.0
+            times.append(contact)
+            states.append(contact_state)
+            return AdaptiveTrajectory(np.array(times), np.array(states), contact, contact_state,
+                                      len(times) - 1, rejected)
+
+        t += h
+        state, k1 = new_state, k_next
+        times.append(t)
+        states.append(state)
+        h *= float(_step_factor(norm))
+    raise RuntimeError(f"el disparo no tocó el suelo en {max_time} s")
+
+
+def sample(model, trajectory, sample_times):
+    """Evalúa una trayectoria adaptativa en instantes arbitrarios
+
+    Cada instante se obtiene con un paso parcial (de orden 5) desde el paso
+    aceptado anterior, todos en una sola evaluación vectorizada. Los
+    instantes posteriores al contacto se extrapolan desde el último paso.
+    Devuelve un arreglo (m, 4).
+    """
+    sample_times = np.asarray(sample_times, dtype=np.float64)
+    # Último estado conocido antes de cada instante
+    base = np.searchsorted(trajectory.times, sample_times, side='right') - 1
+    base = np.clip(base, 0, len(trajectory.times) - 1)
+    h = sample_times - trajectory.times[base]
+    states = rk_step(model, trajectory.states[base].T, h)[0]
+    return states.T
+
+
+def _bracket_roots(values_at, lower, upper, iterations=60, tolerance=1e-12):
+    """Falsa posición (Illinois) vectorizada para muchos intervalos a la vez
+
+    values_at(t) devuelve los valores de la función en los instantes t (uno
+    por intervalo); cada intervalo [lower, upper] debe contener un cambio de
+    signo con valor > 0 en lower y <= 0 en upper.
+    """
+    lower = np.array(lower, dtype=np.float64)
+    upper = np.array(upper, dtype=np.float64)
+    f_lower = values_at(lower)
+    f_upper = values_at(upper)
+    side = np.zeros(len(lower))
+    t = upper.copy()
+    for _ in range(iterations):
+        denominator = f_upper - f_lower
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t = np.where(denominator != 0, (lower * f_upper - upper * f_lower) / denominator, upper)
+        value = values_at(t)
+        if np.all((np.abs(value) <= tolerance) | (upper - lower <= tolerance)):
+            break
+        above = value > 0
+        f_upper = np.where(above & (side == 1), f_upper / 2, f_upper)
+        f_lower = np.where(~above & (side == -1), f_lower / 2, f_lower)
+        lower = np.where(above, t, lower)
+        f_lower = np.where(above, value, f_lower)
+        upper = np.where(above, upper, t)
+        f_upper = np.where(above, f_upper, value)
+        side = np.where(above, 1, -1)
+    return t
+
+
+BatchFlight = namedtuple('BatchFlight', [
+    'distance', 'max_height', 'flight_time', 'impact_vx', 'impact_vy', 'steps'
+])
+
+
+def integrate_batch(model, states0, rtol=1e-9, atol=1e-9, max_time=600.0):
+    """Versión vectorizada de integrate para muchos disparos a la vez
+
+    states0 tiene forma (4, n). Cada disparo conserva su propio tamaño de
+    paso adaptativo; en cada iteración se avanzan juntos todos los que
+    siguen en vuelo. Devuelve un BatchFlight con el alcance, la altura
+    máxima, el tiempo de vuelo, la velocidad de impacto y los pasos
+    aceptados de cada disparo.
+    """
+    state = np.array(states0, dtype=np.float64)
+    n = state.shape[1]
+    t = np.zeros(n)
+    steps = np.zeros(n, dtype=np.int64)
+    # La altura máxima es la inicial salvo que vy pase de positiva a negativa
+    max_height = state[Y].copy()
+    flying = ~((state[Y] <= 0) & (state[VY] <= 0))
+    contact_state = state.copy()
+
+    h, k1 = _initial_step(model, state, rtol, atol)
+    active = np.flatnonzero(flying)
+    while len(active):
+        if np.any(t[active] >= max_time):
+            raise RuntimeError(f"hay disparos que no tocaron el suelo en {max_time} s")
+        s = state[:, active]
+        new_state, error, k_next = rk_step(model, s, h[active], k1[:, active])
+        norm = _error_norm(error, s, new_state, rtol, atol)
+        factor = _step_factor(norm)
+        accepted = norm <= 1.0
+
+        # El primer paso saltó todo el vuelo: se repite con la mitad del paso
+        overshoot = accepted & (new_state[Y] <= 0) & (s[Y] <= 0)
+        factor = np.where(overshoot, 0.5, factor)
+        accepted &= ~overshoot
+
+        # Altura máxima: la velocidad vertical cambia de signo dentro del paso
+        rising = accepted & (s[VY] > 0) & (new_state[VY] <= 0)
+        if rising.any():
+            idx = active[rising]
+            base, base_k1, base_t = s[:, rising], k1[:, idx], t[idx]
+            apex = _bracket_roots(lambda tt: rk_step(model, base, tt - base_t, base_k1)[0][VY],
+                                  base_t, base_t + h[idx])
+            max_height[idx] = rk_step(model, base, apex - base_t, base_k1)[0][Y]
+
+        landed = accepted & (new_state[Y] <= 0)
+        if landed.any():
+            idx = active[landed]
+            base, base_k1, base_t = s[:, landed], k1[:, idx], t[idx]
+            contact = _bracket_roots(lambda tt: rk_step(model, base, tt - base_t, base_k1)[0][Y],
+                                     base_t, base_t + h[idx])
+            contact_state[:, idx] = rk_step(model, base, contact - base_t, base_k1)[0]
+            contact_state[Y, idx] = 0.0
+            t[idx] = contact
+            steps[idx] += 1
+            flying[idx] = False
+
+        moved = accepted & ~landed
+        idx = active[moved]
+        t[idx] += h[idx]
+        state[:, idx] = new_state[:, moved]
+        k1[:, idx] = k_next[:, moved]
+        steps[idx] += 1
+        h[active] *= factor
+        active = np.flatnonzero(flying)
+
+    return BatchFlight(
+        distance=contact_state[X],
+        max_height=max_height,
+        flight_time=t,
+        impact_vx=contact_state[VX],
+        impact_vy=contact_state[VY],
+        steps=steps,
+    )
+
+
+def advance_batch(model, states, h):
+    """Avanza un lote un paso fijo h de Dormand–Prince, deteniéndose en el suelo
+
+    Pensado para avanzar muchas flechas cuadro a cuadro: el paso es corto,
+    así que no se controla el error. Los disparos que cruzan el suelo dentro
+    del paso quedan en el punto exacto del contacto. Devuelve (nuevo_estado,
+    aterrizados, tiempo_avanzado), los dos últimos con un valor por disparo.
+    """
+    states = np.asarray(states, dtype=np.float64)
+    new_states, _, _ = rk_step(model, states, h)
+    elapsed = np.full(states.shape[1], float(h))
+    landed = (new_states[Y] <= 0) & ((states[Y] > 0) | (states[VY] <= 0))
+    if landed.any():
+        airborne = landed & (states[Y] > 0)
+        if airborne.any():
+            base = states[:, airborne]
+            contact = _bracket_roots(lambda tt: rk_step(model, base, tt)[0][Y],
+                                     np.zeros(base.shape[1]), np.full(base.shape[1], float(h)))
+            new_states[:, airborne] = rk_step(model, base, contact)[0]
+            elapsed[airborne] = contact
+        # Los que salen rasantes o hacia abajo no llegan a despegar
+        grounded = landed & ~airborne
+        new_states[:, grounded] = states[:, grounded]
+        elapsed[grounded] = 0.0
+        new_states[Y, landed] = 0.0
+    return new_states, landed, elapsed
@@ -0,0 +1,117 @@
+import json
+import sys
+from collections import namedtuple
+
+from physics import Physics
+from arrow import Arrow
+
+
+# Valores por defecto de la simulación interactiva
+DEFAULT_GRAVITY = 9.8
+DEFAULT_DT = 1 / 60
+
+ShotSpec = namedtuple('ShotSpec', ['angle', 'velocity', 'gravity', 'dt'])
+
+ShotResult = namedtuple('ShotResult', [
+    'angle', 'velocity', 'gravity', 'dt',
+    'landing_x', 'apex', 'analytic_apex', 'flight_time', 'steps',
+    'analytic_distance', 'error', 'relative_error'
+])
+
+
+def simulate_shot(spec, resolve_contact=True, drag=None):
+    """Simula un disparo paso a paso, igual que Simulation.update, sin pantalla
+
+    Devuelve un ShotResult con el punto de aterrizaje, la altura máxima y el
+    tiempo de vuelo obtenidos al avanzar la flecha de dt en dt, y el error
+    frente al alcance de referencia Physics.landing_distance (la fórmula
+    cerrada, o la integración adaptativa si hay rozamiento 'drag'). Con
+    resolve_contact=False el aterrizaje es el primer paso bajo el suelo.
+
+    'apex' es la mayor altura entre los pasos, que con dt grande puede
+    quedar muy por debajo de la real (o en 0 si el vuelo dura menos de un
+    paso); 'analytic_apex' es la altura máxima de referencia, calculada
+    igual que el alcance.
+    """
+    physics = Physics(gravity=spec.gravity, drag=drag)
+    arrow = Arrow(50, 20, physics, resolve_contact=resolve_contact)
+    arrow.shoot(spec.velocity, spec.angle, spec.dt)
+
+    apex = 0.0
+    steps = 0
+    while arrow.is_flying:
+        arrow.update(spec.dt)
+        steps += 1
+        if arrow.y > apex:
+            apex = arrow.y
+
+    analytic = physics.landing_distance(spec.velocity, spec.angle)
+    if drag is None:
+        analytic_apex = physics.max_height(spec.velocity, spec.angle)
+    else:
+        analytic_apex = float(physics.simulate_batch(spec.velocity, spec.angle).max_height[0])
+    error = arrow.x - analytic
+    return ShotResult(
+        angle=spec.angle, velocity=spec.velocity, gravity=spec.gravity, dt=spec.dt,
+        landing_x=arrow.x, apex=apex, analytic_apex=analytic_apex, flight_time=arrow.time, steps=steps,
+        analytic_distance=analytic, error=error,
+        relative_error=error / analytic if analytic else 0.0,
+    )
+
+
+def parse_shot_spec(line):
+    """Convierte una línea 'ángulo velocidad [gravedad [dt]]' en un ShotSpec
+
+    Los campos pueden separarse con espacios o comas. Devuelve None para
+    líneas vacías, comentarios (#) o una cabecera de texto.
+    """
+    line = line.split('#', 1)[0].strip()
+    if not line:
+        return None
+    fields = line.replace(',', ' ').split()
+    try:
+        values = [float(field) for field in fields]
+    except ValueError:
+        if fields[0].lower() in ('angle', 'angulo', 'ángulo'):
+            return None  # Cabecera CSV
+        raise ValueError(f"valores no numéricos: {line!r}")
+    if not 2 <= len(values) <= 4:
+        raise ValueError(f"se esperaban de 2 a 4 campos (ángulo, velocidad, gravedad, dt): {line!r}")
+    angle, velocity = values[0], values[1]
+    gravity = values[2] if len(values) > 2 else DEFAULT_GRAVITY
+    dt = values[3] if len(values) > 3 else DEFAULT_DT
+    if not 0 <= angle <= 90:
+        raise ValueError(f"el ángulo debe estar entre 0 y 90 grados: {line!r}")
+    if velocity <= 0 or gravity <= 0 or dt <= 0:
+        raise ValueError(f"la velocidad, la gravedad y dt deben ser positivos: {line!r}")
+    return ShotSpec(angle, velocity, gravity, dt)
+
+
+def run_batch(infile, outfile, output_format='csv', resolve_contact=True, drag=None):
+    """Lee especificaciones de disparos y escribe un resultado por disparo
+
+    Los resultados se escriben (y se vacía el buffer) a medida que se
+    calculan. Las líneas inválidas se informan por stderr y se omiten.
+    Devuelve el número de líneas inválidas.
+    """
+    if output_format == 'csv':
+        outfile.write(','.join(ShotResult._fields) + '\n')
+
+    invalid = 0
+    for line_number, line in enumerate(infile, 1):
+        try:
+            spec = parse_shot_spec(line)
+        except ValueError as exc:
+            print(f"línea {line_number}: {exc}", file=sys.stderr)
+            invalid += 1
+            continue
+        if spec is None:
+            continue
+
+        result = simulate_shot(spec, resolve_contact, drag)
+        if output_format == 'json':
+            outfile.write(json.dumps(result._asdict()) + '\n')
+        else:
+            outfile.write(','.join(repr(value) for value in result) + '\n')
+        outfile.flush()
+    return invalid
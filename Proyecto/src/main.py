@@ -1,17 +1,102 @@
-import pygame
+import argparse
 import sys
-from simulation import Simulation
-from renderer import Renderer
+import time
 
+_START = time.perf_counter()
 
-def main():
+from startup import StartupProfile, import_pygame, init_pygame
+
+
+def parse_args(argv=None):
+    """Interpreta los argumentos de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Simulación de tiro con arco - Física")
+    parser.add_argument('--batch', metavar='ARCHIVO', nargs='?', const='-',
+                        help="modo sin pantalla: lee disparos 'ángulo velocidad [gravedad [dt]]' "
+                             "de ARCHIVO (o de stdin con '-') y escribe los resultados en stdout")
+    parser.add_argument('--format', choices=('csv', 'json'), default='csv',
+                        help="formato de salida del modo --batch (por defecto csv)")
+    parser.add_argument('--no-contact-resolution', dest='resolve_contact', action='store_false',
+                        help="en --batch, no ajustar el aterrizaje al instante exacto del contacto")
+    parser.add_argument('--drag', action='store_true',
+                        help="activar el rozamiento del aire (flecha de 25 g; en modo interactivo, tecla D)")
+    parser.add_argument('--wind', type=float, default=None, metavar='M/S',
+                        help="viento horizontal constante (positivo a favor); implica --drag")
+    parser.add_argument('--fps', type=float, default=60,
+                        help="límite de cuadros por segundo del dibujo (0 = sin límite)")
+    parser.add_argument('--physics-rate', type=float, default=60,
+                        help="pasos de física por segundo simulado (por defecto 60)")
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help="escala de tiempo inicial: <1 cámara lenta, >1 avance rápido")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="actualizar solo las zonas de la pantalla que cambian (pantallas lentas, VNC)")
+    parser.add_argument('--lod-tolerance', type=float, default=0.5, metavar='PX',
+                        help="error máximo en píxeles al simplificar la trayectoria dibujada "
+                             "(por defecto 0.5; 0 = dibujar todos los puntos)")
+    parser.add_argument('--record', metavar='ARCHIVO', default=None,
+                        help="grabar los disparos y las entradas de la sesión en ARCHIVO (binario; "
+                             "se añade al final si ya existe). Se revisa con src/recorder.py")
+    parser.add_argument('--profile', metavar='ARCHIVO', default=None,
+                        help="medir cada etapa de los cuadros y guardar la traza en ARCHIVO al salir")
+    parser.add_argument('--profile-format', choices=('json', 'chrome'), default='json',
+                        help="formato de --profile: json (estadísticas y cuadros) o chrome "
+                             "(eventos para chrome://tracing o Perfetto)")
+    parser.add_argument('--startup-profile', action='store_true',
+                        help="mostrar en stderr cuánto tarda cada etapa del arranque hasta el primer cuadro")
+    return parser.parse_args(argv)
+
+
+def make_drag(args):
+    """Modelo de rozamiento pedido en la línea de comandos (o None)"""
+    if not args.drag and args.wind is None:
+        return None
+    from forces import QuadraticDrag
+
+    return QuadraticDrag(wind=args.wind or 0.0)
+
+
+def run_headless(args):
+    """Ejecuta el modo por lotes sin abrir ninguna ventana"""
+    from headless import run_batch
+
+    drag = make_drag(args)
+    if args.batch == '-':
+        invalid = run_batch(sys.stdin, sys.stdout, args.format, args.resolve_contact, drag)
+    else:
+        with open(args.batch, encoding='utf-8') as infile:
+            invalid = run_batch(infile, sys.stdout, args.format, args.resolve_contact, drag)
+    return 1 if invalid else 0
+
+
+def main(argv=None):
     """Función principal que inicia la simulación de tiro con arco"""
-    # Inicializar pygame
-    pygame.init()
+    args = parse_args(argv)
+    if args.batch is not None:
+        sys.exit(run_headless(args))
+
+    # pygame y la simulación se importan aquí: el modo por lotes no los necesita
+    # (headless solo usa la línea de tiempo de Arrow, que no importa pygame)
+    startup = StartupProfile(_START)
+    pygame = import_pygame()
+    from simulation import Simulation
+    from renderer import Renderer
+    from profiler import FrameProfiler
+    startup.mark('imports')
+
+    # Inicializar pygame (solo video y fuentes)
+    init_pygame()
+    startup.mark('init')
 
     # Crear instancias de las clases principales
-    simulation = Simulation()
-    renderer = Renderer()
+    profiler = FrameProfiler(enabled=args.profile is not None, output=args.profile,
+                             output_format=args.profile_format)
+    simulation = Simulation(fps=args.fps, physics_rate=args.physics_rate, time_scale=args.time_scale,
+                            drag=make_drag(args), profiler=profiler, record=args.record,
+                            lod_tolerance=args.lod_tolerance)
+    startup.mark('simulation')
+    renderer = Renderer(dirty_rects=args.dirty_rects)
+    startup.mark('renderer')
+    if args.startup_profile:
+        simulation.startup = startup
 
     # Ejecutar la simulación
     simulation.run(renderer)
@@ -22,4 +107,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,54 +1,278 @@
 import math
+from collections import namedtuple
+
+import numpy as np
+
+from cache import LRUCache
+
+
+# Resultado de una evaluación por lotes: cada campo es un arreglo de NumPy
+# con la forma resultante de combinar (broadcast) velocidades, ángulos y tiempos
+BatchTrajectory = namedtuple('BatchTrajectory', [
+    'x', 'y', 'vx', 'vy', 'max_distance', 'max_height', 'flight_time'
+])
+
+# Resultados en forma cerrada de un disparo (ver Physics.summary): alcance,
+# altura máxima, tiempo de vuelo y componentes de la velocidad inicial
+ShotSummary = namedtuple('ShotSummary', [
+    'distance', 'max_height', 'flight_time', 'vx', 'vy'
+])
+
+
+# Fórmulas compartidas entre la versión escalar y la vectorizada.
+# Reciben los senos/cosenos ya calculados para que ambas rutas hagan
+# exactamente las mismas operaciones y den resultados idénticos.
+# Los cuadrados se escriben como productos porque `x ** 2` de Python usa
+# pow() de la libm, que no siempre redondea igual que `x * x` de NumPy.
+
+def _horizontal_position(initial_velocity, cos_theta, time):
+    return initial_velocity * cos_theta * time
+
+
+def _vertical_position(initial_velocity, sin_theta, time, gravity):
+    return (initial_velocity * sin_theta * time) - (0.5 * gravity * (time * time))
+
+
+def _max_horizontal_distance(initial_velocity, sin_2theta, gravity):
+    return (initial_velocity * initial_velocity * sin_2theta) / gravity
+
+
+def _max_height(initial_velocity, sin_theta, gravity):
+    return (initial_velocity * initial_velocity * (sin_theta * sin_theta)) / (2 * gravity)
+
+
+def _flight_time(initial_velocity, sin_theta, gravity):
+    return (2 * initial_velocity * sin_theta) / gravity
+
+
+def _velocity_x(initial_velocity, cos_theta):
+    return initial_velocity * cos_theta
+
+
+def _velocity_y(initial_velocity, sin_theta, time, gravity):
+    return initial_velocity * sin_theta - gravity * time
+
+
+def find_ground_contact(height, t_before, t_after, tolerance=1e-12, max_iterations=60):
+    """Busca el instante en que height(t) cruza el suelo dentro de [t_before, t_after]
+
+    Pensado para modelos de fuerza sin solución cerrada: height(t_before) > 0 y
+    height(t_after) <= 0. Usa falsa posición con la modificación de Illinois,
+    que converge rápido sin perder el intervalo que encierra la raíz.
+    """
+    y_before = height(t_before)
+    y_after = height(t_after)
+    if y_after > 0:
+        raise ValueError("el intervalo no cruza el suelo")
+    if y_before <= 0:
+        return t_before
+
+    side = 0
+    t = t_after
+    for _ in range(max_iterations):
+        t = (t_before * y_after - t_after * y_before) / (y_after - y_before)
+        y = height(t)
+        if abs(y) <= tolerance or t_after - t_before <= tolerance:
+            break
+        if y > 0:
+            t_before, y_before = t, y
+            if side == 1:
+                y_after /= 2
+            side = 1
+        else:
+            t_after, y_after = t, y
+            if side == -1:
+                y_before /= 2
+            side = -1
+    return t
 
 
 class Physics:
     """Clase que contiene todas las fórmulas físicas para el tiro parabólico"""
 
-    def __init__(self, gravity=9.81):
-        """Inicializa la clase Physics con un valor predeterminado para la gravedad"""
+    def __init__(self, gravity=9.81, drag=None, cache_size=1024):
+        """Inicializa la clase Physics con un valor predeterminado para la gravedad
+
+        drag es un modelo de rozamiento (forces.QuadraticDrag) o None. Sin
+        rozamiento todo se calcula con las fórmulas cerradas; con él, las
+        trayectorias se integran numéricamente (ver simulate). cache_size
+        limita los resultados memorizados por summary y landing_distance.
+        """
         self.gravity = gravity
+        self.drag = drag
+        # Resultados memorizados por (v0, ángulo, gravedad); se vacía al
+        # cambiar la gravedad o el rozamiento
+        self.results = LRUCache(cache_size)
 
     def set_gravity(self, gravity):
         """Permite cambiar el valor de la gravedad"""
         self.gravity = gravity
+        self.results.clear()
+
+    def set_drag(self, drag):
+        """Activa un modelo de rozamiento del aire (None lo desactiva)"""
+        self.drag = drag
+        self.results.clear()
+
+    def summary(self, initial_velocity, angle):
+        """Alcance, altura máxima, tiempo de vuelo y velocidad inicial (vx, vy) sin rozamiento
+
+        Devuelve un ShotSummary calculado con las fórmulas cerradas y
+        memorizado por (v0, ángulo, gravedad), así que repetir la consulta
+        en cada cuadro no vuelve a evaluar senos ni cosenos.
+        """
+        key = (initial_velocity, angle, self.gravity)
+        return self.results.get_or_create(key, lambda: self._summary(initial_velocity, angle))
+
+    def _summary(self, initial_velocity, angle):
+        """Calcula el ShotSummary de summary (sin memorizar)"""
+        sin_theta = math.sin(math.radians(angle))
+        cos_theta = math.cos(math.radians(angle))
+        return ShotSummary(
+            distance=_max_horizontal_distance(initial_velocity, math.sin(math.radians(2 * angle)), self.gravity),
+            max_height=_max_height(initial_velocity, sin_theta, self.gravity),
+            flight_time=_flight_time(initial_velocity, sin_theta, self.gravity),
+            vx=_velocity_x(initial_velocity, cos_theta),
+            vy=_velocity_y(initial_velocity, sin_theta, 0.0, self.gravity),
+        )
+
+    def cache_stats(self):
+        """Aciertos, fallos y tamaño de la memoria de resultados (ver LRUCache.stats)"""
+        return self.results.stats()
+
+    def force_model(self):
+        """Modelo de fuerzas completo: gravedad más el rozamiento, si lo hay"""
+        from forces import Gravity, CombinedForces
+
+        if self.drag is None:
+            return Gravity(self.gravity)
+        return CombinedForces([Gravity(self.gravity), self.drag])
+
+    def initial_state(self, initial_velocity, angle):
+        """Estado (x, y, vx, vy) del lanzamiento desde el origen"""
+        return np.array([0.0, 0.0,
+                         self.current_velocity_x(initial_velocity, angle),
+                         self.current_velocity_y(initial_velocity, angle, 0.0)])
+
+    def simulate(self, initial_velocity, angle, rtol=1e-9, atol=1e-9):
+        """Integra el disparo con paso adaptativo (forces.integrate) hasta el suelo
+
+        Sirve con o sin rozamiento, pero sin él las fórmulas cerradas son
+        exactas y mucho más rápidas.
+        """
+        from forces import integrate
+
+        return integrate(self.force_model(), self.initial_state(initial_velocity, angle), rtol, atol)
+
+    def simulate_batch(self, initial_velocities, angles, rtol=1e-9, atol=1e-9):
+        """Versión vectorizada de simulate para muchos disparos (forces.integrate_batch)"""
+        from forces import integrate_batch
+
+        v0, angle = np.broadcast_arrays(np.asarray(initial_velocities, dtype=np.float64),
+                                        np.asarray(angles, dtype=np.float64))
+        shot = self.batch(v0.ravel(), angle.ravel())
+        zeros = np.zeros(shot.vx.shape)
+        return integrate_batch(self.force_model(), np.array([zeros, zeros, shot.vx, shot.vy]), rtol, atol)
+
+    def states_at(self, initial_velocity, angle, times, trajectory=None):
+        """Estados (x, y, vx, vy) del disparo en los instantes dados, como arreglo (4, n)
+
+        Sin 'trajectory' (la integración de simulate) se usan las fórmulas
+        cerradas; con ella, pasos parciales desde la integración adaptativa.
+        """
+        if trajectory is None:
+            shot = self.batch(initial_velocity, angle, times)
+            return np.array([shot.x, shot.y, shot.vx, shot.vy])
+        from forces import sample
+
+        return sample(self.force_model(), trajectory, times).T
+
+    def landing_distance(self, initial_velocity, angle):
+        """Alcance real del disparo: fórmula cerrada sin rozamiento, integración con él
+
+        Ambos resultados se memorizan, como en summary.
+        """
+        if self.drag is None:
+            return self.summary(initial_velocity, angle).distance
+        key = (initial_velocity, angle, self.gravity, 'drag')
+        return self.results.get_or_create(
+            key, lambda: float(self.simulate(initial_velocity, angle).contact_state[0]))
 
     def horizontal_position(self, initial_velocity, angle, time):
         """Calcula la posición horizontal en función del tiempo
         x(t) = v0x * t = v0 * cos(θ) * t
         """
-        return initial_velocity * math.cos(math.radians(angle)) * time
+        return _horizontal_position(initial_velocity, math.cos(math.radians(angle)), time)
 
     def vertical_position(self, initial_velocity, angle, time):
         """Calcula la posición vertical en función del tiempo
         y(t) = v0y * t - (1/2)g * t^2 = v0 * sin(θ) * t - (1/2)g * t^2
         """
-        return (initial_velocity * math.sin(math.radians(angle)) * time) - \
-            (0.5 * self.gravity * time ** 2)
+        return _vertical_position(initial_velocity, math.sin(math.radians(angle)), time, self.gravity)
 
     def max_horizontal_distance(self, initial_velocity, angle):
         """Calcula el alcance horizontal máximo
         R = (v0^2 * sin(2θ)) / g
         """
-        return (initial_velocity ** 2 * math.sin(math.radians(2 * angle))) / self.gravity
+        return _max_horizontal_distance(initial_velocity, math.sin(math.radians(2 * angle)), self.gravity)
 
     def max_height(self, initial_velocity, angle):
         """Calcula la altura máxima
         H = (v0^2 * sin^2(θ)) / (2g)
         """
-        return (initial_velocity ** 2 * math.sin(math.radians(angle)) ** 2) / (2 * self.gravity)
+        return _max_height(initial_velocity, math.sin(math.radians(angle)), self.gravity)
 
     def flight_time(self, initial_velocity, angle):
         """Calcula el tiempo de vuelo
         T = (2 * v0 * sin(θ)) / g
         """
-        return (2 * initial_velocity * math.sin(math.radians(angle))) / self.gravity
+        return _flight_time(initial_velocity, math.sin(math.radians(angle)), self.gravity)
+
+    def ground_contact_time(self, initial_velocity, angle):
+        """Instante exacto en que la flecha vuelve al suelo (y = 0)
+
+        Sin rozamiento coincide con el tiempo de vuelo en forma cerrada.
+        """
+        if self.drag is not None:
+            return self.simulate(initial_velocity, angle).contact_time
+        return max(self.flight_time(initial_velocity, angle), 0.0)
 
     def current_velocity_x(self, initial_velocity, angle):
         """Calcula la componente horizontal de la velocidad (constante)"""
-        return initial_velocity * math.cos(math.radians(angle))
+        return _velocity_x(initial_velocity, math.cos(math.radians(angle)))
 
     def current_velocity_y(self, initial_velocity, angle, time):
         """Calcula la componente vertical de la velocidad en un tiempo dado
         vy(t) = v0y - g*t = v0*sin(θ) - g*t
         """
-        return initial_velocity * math.sin(math.radians(angle)) - self.gravity * time
\ No newline at end of file
+        return _velocity_y(initial_velocity, math.sin(math.radians(angle)), time, self.gravity)
+
+    def batch(self, initial_velocities, angles, times=0.0):
+        """Evalúa muchos disparos a la vez con NumPy (fórmulas sin rozamiento)
+
+        Las velocidades, ángulos y tiempos pueden ser escalares o arreglos
+        compatibles por broadcast. Los senos y cosenos se calculan una sola
+        vez por llamada. Devuelve un BatchTrajectory con posiciones y
+        velocidades en los tiempos dados, además del alcance, la altura
+        máxima y el tiempo de vuelo de cada disparo.
+        """
+        v0 = np.asarray(initial_velocities, dtype=np.float64)
+        angle = np.asarray(angles, dtype=np.float64)
+        t = np.asarray(times, dtype=np.float64)
+        g = self.gravity
+        shape = np.broadcast_shapes(v0.shape, angle.shape, t.shape)
+
+        sin_theta = np.sin(np.radians(angle))
+        cos_theta = np.cos(np.radians(angle))
+        sin_2theta = np.sin(np.radians(2 * angle))
+
+        return BatchTrajectory(
+            x=_horizontal_position(v0, cos_theta, t),
+            y=_vertical_position(v0, sin_theta, t, g),
+            # vx no depende del tiempo, pero se expande a la forma común
+            vx=np.broadcast_to(_velocity_x(v0, cos_theta), shape),
+            vy=_velocity_y(v0, sin_theta, t, g),
+            max_distance=_max_horizontal_distance(v0, sin_2theta, g),
+            max_height=_max_height(v0, sin_theta, g),
+            flight_time=_flight_time(v0, sin_theta, g),
+        )
@@ -0,0 +1,134 @@
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+
+class FrameProfiler:
+    """Mide cuánto tarda cada etapa de los cuadros del bucle principal
+
+    Cada cuadro empieza con begin_frame() y cada etapa termina con
+    lap(nombre): su duración es el tiempo transcurrido desde la marca
+    anterior, así que basta una llamada por etapa. Desactivado, begin_frame y
+    lap retornan de inmediato (una comprobación de atributo por llamada).
+
+    Para los percentiles se guardan las últimas 'window' duraciones de cada
+    etapa; para exportar, los últimos 'trace_frames' cuadros completos, como
+    JSON con estadísticas o como traza de Chrome (chrome://tracing o
+    Perfetto).
+    """
+
+    def __init__(self, enabled=False, window=300, trace_frames=3600, output=None, output_format='json'):
+        """Crea el perfilador; con 'output', finish() escribe ahí la traza en 'output_format'"""
+        self.enabled = enabled
+        self.window = window
+        self.output = output
+        self.output_format = output_format
+        self.samples = {}  # Etapa -> últimas duraciones (s), en orden de aparición
+        self.frames = deque(maxlen=trace_frames)  # (inicio, [(etapa, inicio, duración)])
+        self.frame_count = 0
+        self.origin = time.perf_counter()
+        self._frame = None
+        self._last = 0.0
+
+    def begin_frame(self):
+        """Marca el comienzo de un cuadro (cierra el anterior)"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._close_frame(now)
+        self._frame = (now, [])
+        self._last = now
+
+    def lap(self, name):
+        """Termina la etapa 'name': dura desde la marca anterior hasta ahora"""
+        if not self.enabled or self._frame is None:
+            return
+        now = time.perf_counter()
+        self._frame[1].append((name, self._last, now - self._last))
+        self._record(name, now - self._last)
+        self._last = now
+
+    def _close_frame(self, now):
+        """Guarda el cuadro en curso y su duración total como la etapa 'frame'"""
+        if self._frame is None:
+            return
+        self.frames.append(self._frame)
+        self._record('frame', now - self._frame[0])
+        self.frame_count += 1
+        self._frame = None
+
+    def _record(self, name, duration):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self.window)
+        samples.append(duration)
+
+    def stage_names(self):
+        """Etapas medidas en orden de aparición, con el cuadro completo al final"""
+        names = [name for name in self.samples if name != 'frame']
+        if 'frame' in self.samples:
+            names.append('frame')
+        return names
+
+    def percentiles(self, quantiles=(50, 95, 99)):
+        """Percentiles (en ms) de las últimas duraciones de cada etapa: {etapa: (p50, p95, p99)}"""
+        return {name: tuple(np.percentile(np.fromiter(self.samples[name], float), quantiles) * 1000)
+                for name in self.stage_names()}
+
+    def stats(self):
+        """Estadísticas en ms de cada etapa sobre la ventana actual"""
+        result = {}
+        for name in self.stage_names():
+            values = np.fromiter(self.samples[name], float) * 1000
+            p50, p95, p99 = np.percentile(values, (50, 95, 99))
+            result[name] = {
+                'count': len(values),
+                'mean_ms': float(values.mean()),
+                'p50_ms': float(p50),
+                'p95_ms': float(p95),
+                'p99_ms': float(p99),
+                'max_ms': float(values.max()),
+            }
+        return result
+
+    def to_json(self):
+        """Estadísticas y cuadros guardados, como diccionario serializable"""
+        return {
+            'window': self.window,
+            'stages': self.stats(),
+            'frames': [{'start_ms': (start - self.origin) * 1000,
+                        'stages': [[name, duration * 1000] for name, _, duration in stages]}
+                       for start, stages in self.frames],
+        }
+
+    def to_chrome_trace(self):
+        """Cuadros guardados en el formato de eventos de Chrome (tiempos en µs)"""
+        events = []
+        for start, stages in self.frames:
+            end = stages[-1][1] + stages[-1][2] if stages else start
+            events.append({'name': 'frame', 'ph': 'X', 'pid': 1, 'tid': 1,
+                           'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6})
+            for name, stage_start, duration in stages:
+                events.append({'name': name, 'ph': 'X', 'pid': 1, 'tid': 1,
+                               'ts': (stage_start - self.origin) * 1e6, 'dur': duration * 1e6})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export(self, path, output_format='json'):
+        """Escribe la traza en 'path' como 'json' (estadísticas) o 'chrome' (eventos)"""
+        if output_format == 'chrome':
+            data = self.to_chrome_trace()
+        elif output_format == 'json':
+            data = self.to_json()
+        else:
+            raise ValueError(f"formato de traza desconocido: {output_format}")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def finish(self):
+        """Cierra el último cuadro y, si se pidió un archivo de salida, exporta la traza"""
+        if self.enabled:
+            self._close_frame(time.perf_counter())
+        if self.output is not None:
+            self.export(self.output, self.output_format)
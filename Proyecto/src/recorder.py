@@ -0,0 +1,371 @@
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from physics import Physics
+from arrow import Arrow
+from forces import QuadraticDrag
+
+
+# Formato del registro: una cabecera y registros de tamaño fijo (64 bytes),
+# todos little-endian. Cada registro lleva su tipo, el número de disparo, el
+# tiempo desde el inicio de la sesión y seis valores cuyo significado depende
+# del tipo (ver FIELDS).
+MAGIC = b'ARCOSHOT'
+VERSION = 1
+HEADER = struct.Struct('<8sII48x')
+RECORD = struct.Struct('<B3xId6d')
+RECORD_DTYPE = np.dtype([
+    ('kind', '<u1'), ('pad', 'V3'), ('shot', '<u4'), ('time', '<f8'), ('values', '<f8', (6,))
+])
+
+# Tipos de registro
+SESSION, SHOT, DRAG, FRAME, LANDING, EVENT, VOLLEY = range(7)
+
+FIELDS = {
+    SESSION: ('wall_time', 'physics_rate', 'gravity', 'drag', 'unused', 'unused'),
+    SHOT: ('angle', 'velocity', 'gravity', 'dt', 'drag', 'resolve_contact'),
+    DRAG: ('mass', 'diameter', 'drag_coefficient', 'air_density', 'wind', 'unused'),
+    FRAME: ('step', 'arrow_time', 'x', 'y', 'rotation', 'unused'),
+    LANDING: ('x', 'y', 'flight_time', 'steps', 'max_height', 'unused'),
+    EVENT: ('type', 'key', 'mod', 'x', 'y', 'unicode'),
+    VOLLEY: ('count', 'velocity', 'angle', 'velocity_spread', 'angle_spread', 'seed'),
+}
+
+assert HEADER.size == RECORD.size == RECORD_DTYPE.itemsize
+
+# Eventos de entrada que se graban (los movimientos del ratón no)
+RECORDED_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.QUIT)
+
+
+class ShotRecorder:
+    """Graba cada disparo de una sesión en un registro binario de tamaño fijo
+
+    Se guardan los parámetros del lanzamiento (con la gravedad, dt y el
+    rozamiento), el estado de la flecha en cada paso de física, el aterrizaje
+    y los eventos de entrada. Los registros se añaden al final del archivo,
+    así que varias sesiones pueden compartir un mismo registro.
+    """
+
+    def __init__(self, path, physics, physics_rate):
+        """Abre (o crea) el registro en 'path' y escribe el inicio de sesión"""
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists:
+            ShotLog.check_header(path)
+        self.file = open(path, 'ab')
+        if not exists:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.start = time.perf_counter()
+        self.shot_id = 0
+        self.apex = 0.0
+        self.steps = 0
+        self.records = 0
+        drag = physics.drag
+        self._write(SESSION, time.time(), physics_rate, physics.gravity, float(drag is not None))
+
+    def _write(self, kind, *values):
+        values = values + (0.0,) * (6 - len(values))
+        self.file.write(RECORD.pack(kind, self.shot_id, time.perf_counter() - self.start, *values))
+        self.records += 1
+
+    def event(self, event):
+        """Graba un evento de teclado, ratón o cierre (los demás se ignoran)"""
+        if event.type not in RECORDED_EVENTS:
+            return
+        key = getattr(event, 'key', 0)
+        mod = getattr(event, 'mod', 0)
+        x, y = getattr(event, 'pos', (0, 0))
+        text = getattr(event, 'unicode', '')
+        self._write(EVENT, event.type, key, mod, x, y, ord(text[0]) if text else 0)
+
+    def shot(self, arrow, dt):
+        """Graba el lanzamiento de 'arrow' (llamar justo después de Arrow.shoot)"""
+        self.shot_id += 1
+        self.apex = 0.0
+        self.steps = 0
+        physics = arrow.physics
+        drag = physics.drag
+        self._write(SHOT, arrow.angle, arrow.initial_velocity, physics.gravity, dt,
+                    float(drag is not None), float(arrow.resolve_contact))
+        if drag is not None:
+            self._write(DRAG, drag.mass, drag.diameter, drag.drag_coefficient, drag.air_density, drag.wind)
+
+    def frame(self, arrow):
+        """Graba el estado de la flecha tras un paso de física; al tocar el suelo, también el aterrizaje"""
+        self.steps += 1
+        self.apex = max(self.apex, arrow.y)
+        self._write(FRAME, self.steps, arrow.time, arrow.x, arrow.y, arrow.rotation)
+        if not arrow.is_flying:
+            self._write(LANDING, arrow.x, arrow.y, arrow.time, self.steps, self.apex)
+
+    def volley(self, count, velocity, angle, velocity_spread, angle_spread, seed):
+        """Graba una descarga de flechas (reproducible con la misma semilla)"""
+        self._write(VOLLEY, count, velocity, angle, velocity_spread, angle_spread, seed)
+
+    def close(self):
+        """Cierra el registro"""
+        self.file.close()
+
+
+class ShotLog:
+    """Registro grabado por ShotRecorder, abierto mapeado en memoria
+
+    Los registros se leen como un arreglo estructurado de NumPy sin cargar
+    el archivo en RAM: solo se traen del disco las páginas que se consultan.
+    """
+
+    def __init__(self, path):
+        """Abre el registro en 'path' (ValueError si no tiene el formato esperado)"""
+        self.path = path
+        self.check_header(path)
+        count = (os.path.getsize(path) - HEADER.size) // RECORD.size
+        if count:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self._indices = {}
+
+    @staticmethod
+    def check_header(path):
+        """Comprueba la cabecera de un registro existente"""
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise ValueError(f"{path}: registro incompleto")
+        magic, version, record_size = HEADER.unpack(header)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"{path}: no es un registro de disparos")
+        if version != VERSION:
+            raise ValueError(f"{path}: versión de registro no soportada ({version})")
+
+    def __len__(self):
+        return len(self.records)
+
+    def indices(self, kind):
+        """Posiciones de los registros de un tipo (una pasada por la columna de tipos, luego en memoria)"""
+        indices = self._indices.get(kind)
+        if indices is None:
+            indices = self._indices[kind] = np.flatnonzero(self.records['kind'] == kind)
+        return indices
+
+    def sessions(self):
+        """Rangos [inicio, fin) de los registros de cada sesión"""
+        starts = self.indices(SESSION)
+        return list(zip(starts, list(starts[1:]) + [len(self.records)]))
+
+    def record(self, index):
+        """Registro 'index' como diccionario con los nombres de sus valores"""
+        record = self.records[index]
+        kind = int(record['kind'])
+        result = {'kind': kind, 'shot': int(record['shot']), 'time': float(record['time'])}
+        result.update((name, float(value)) for name, value in zip(FIELDS[kind], record['values'])
+                      if name != 'unused')
+        return result
+
+    def shots(self, start=0, stop=None):
+        """Disparos grabados entre los registros [start, stop): diccionarios SHOT con su aterrizaje y rozamiento"""
+        stop = len(self.records) if stop is None else stop
+        shots = []
+        sessions = self.indices(SESSION)
+        for index in self.indices(SHOT):
+            if not start <= index < stop:
+                continue
+            shot = self.record(index)
+            shot['index'] = int(index)
+            shot['session'] = int(np.searchsorted(sessions, index)) - 1
+            shot['drag'] = self.drag_model(index) if shot['drag'] else None
+            shot['landing'] = self.landing(index)
+            shots.append(shot)
+        return shots
+
+    def shot_end(self, shot_index):
+        """Posición del siguiente SHOT o SESSION (donde terminan los registros del disparo)"""
+        ends = []
+        for kind in (SHOT, SESSION):
+            following = self.indices(kind)
+            position = np.searchsorted(following, shot_index, side='right')
+            if position < len(following):
+                ends.append(int(following[position]))
+        return min(ends, default=len(self.records))
+
+    def drag_model(self, shot_index):
+        """Modelo de rozamiento del disparo (el registro DRAG que sigue a su SHOT)"""
+        record = self.record(shot_index + 1)
+        if record['kind'] != DRAG:
+            raise ValueError(f"disparo en el registro {shot_index} sin datos de rozamiento")
+        return QuadraticDrag(record['mass'], record['diameter'], record['drag_coefficient'],
+                             record['air_density'], record['wind'])
+
+    def frames(self, shot_index):
+        """Estados grabados (step, arrow_time, x, y, rotation) del disparo como arreglo (n, 5)
+
+        Solo se leen los registros entre el disparo y el siguiente, donde
+        sus pasos están seguidos salvo por los eventos intercalados.
+        """
+        block = self.records[shot_index + 1:self.shot_end(shot_index)]
+        return np.array(block['values'][block['kind'] == FRAME][:, :5])
+
+    def landing(self, shot_index):
+        """Registro LANDING del disparo, o None si la sesión terminó con la flecha en vuelo"""
+        landings = self.indices(LANDING)
+        position = np.searchsorted(landings, shot_index)
+        if position < len(landings) and landings[position] < self.shot_end(shot_index):
+            return self.record(landings[position])
+        return None
+
+    def events(self, start=0, stop=None):
+        """Eventos de entrada grabados entre los registros [start, stop)"""
+        stop = len(self.records) if stop is None else stop
+        return [self.record(index) for index in self.indices(EVENT) if start <= index < stop]
+
+
+def resimulate(shot):
+    """Vuelve a simular un disparo grabado solo con sus parámetros de lanzamiento
+
+    Devuelve los estados (step, arrow_time, x, y, rotation) de cada paso,
+    como ShotLog.frames. La simulación es determinista: con el mismo
+    código, los valores coinciden bit a bit con los grabados.
+    """
+    physics = Physics(gravity=shot['gravity'], drag=shot['drag'])
+    arrow = Arrow(50, 20, physics, resolve_contact=bool(shot['resolve_contact']))
+    arrow.shoot(shot['velocity'], shot['angle'], shot['dt'])
+    rows = []
+    while arrow.is_flying:
+        arrow.update(shot['dt'])
+        rows.append((len(rows) + 1, arrow.time, arrow.x, arrow.y, arrow.rotation))
+    return np.array(rows).reshape(-1, 5)
+
+
+def verify(log, start=0, stop=None):
+    """Compara cada disparo grabado con su re-simulación
+
+    Devuelve una lista de (disparo, pasos grabados, máxima diferencia); la
+    diferencia es infinita si el número de pasos no coincide (salvo un
+    disparo interrumpido, que se compara hasta donde llegó).
+    """
+    report = []
+    for shot in log.shots(start, stop):
+        recorded = log.frames(shot['index'])
+        replayed = resimulate(shot)
+        if shot['landing'] is not None and len(recorded) != len(replayed):
+            difference = math.inf
+        else:
+            n = len(recorded)
+            difference = float(np.max(np.abs(recorded - replayed[:n]), initial=0.0)) if n <= len(replayed) \
+                else math.inf
+        report.append((shot['shot'], len(recorded), difference))
+    return report
+
+
+def play(log, session=None, speed=1.0):
+    """Reproduce en una ventana los disparos grabados con sus estados grabados
+
+    Cada paso se muestra durante dt/speed; los intervalos entre disparos se
+    omiten. Escape o cerrar la ventana termina la reproducción.
+    """
+    from camera import Camera
+    from renderer import Renderer
+    from startup import init_pygame
+
+    init_pygame()
+    renderer = Renderer()
+    clock = pygame.time.Clock()
+    sessions = log.sessions()
+    start, stop = sessions[session] if session is not None else (0, len(log.records))
+    camera = Camera(*renderer.screen.get_size())
+
+    for shot in log.shots(start, stop):
+        camera.reset()
+        frames = log.frames(shot['index'])
+        arrow = Arrow(50, 20, Physics(gravity=shot['gravity']))
+        arrow.is_flying = True
+        arrow.apex_step = int(np.argmax(frames[:, 3])) + 1 if len(frames) else 0
+        for step, arrow_time, x, y, rotation in frames:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    pygame.quit()
+                    return
+            arrow.prev_x, arrow.prev_y, arrow.prev_rotation = x, y, rotation
+            arrow.x, arrow.y, arrow.rotation, arrow.time = x, y, rotation, arrow_time
+            arrow.trajectory.append(x, y)
+            arrow.is_flying = step < len(frames)
+            camera.track(x, y)
+
+            renderer.draw_background(camera.scale, camera.offset_x, camera.ground_y, 50)
+            label = renderer.render_text(
+                renderer.font,
+                f"Disparo {shot['shot']}: {shot['angle']:g}°, {shot['velocity']:g} m/s, g = {shot['gravity']:g}"
+                f"  t = {arrow_time:.2f} s  x = {x:.2f} m", (0, 0, 0))
+            renderer.screen.blit(label, (15, 15))
+            arrow.draw(renderer.screen, camera.offset_x, 0, camera.scale, camera.ground_y)
+            renderer.present()
+            clock.tick(speed / shot['dt'])
+    pygame.quit()
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos: listar, verificar o reproducir un registro"""
+    parser = argparse.ArgumentParser(description="Revisión y reproducción de registros de disparos")
+    parser.add_argument('log', help="registro grabado con main.py --record")
+    parser.add_argument('--session', type=int, default=None,
+                        help="solo la sesión N (0 = la primera; negativos desde el final)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--verify', action='store_true',
+                      help="re-simular cada disparo desde sus parámetros y compararlo con lo grabado")
+    mode.add_argument('--play', action='store_true', help="reproducir los disparos en una ventana")
+    mode.add_argument('--events', action='store_true', help="listar los eventos de entrada grabados")
+    parser.add_argument('--speed', type=float, default=1.0, help="velocidad de --play (2 = el doble)")
+    args = parser.parse_args(argv)
+
+    try:
+        log = ShotLog(args.log)
+    except (OSError, ValueError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    sessions = log.sessions()
+    if args.session is not None:
+        try:
+            start, stop = sessions[args.session]
+        except IndexError:
+            print(f"el registro tiene {len(sessions)} sesiones", file=sys.stderr)
+            return 2
+    else:
+        start, stop = 0, len(log)
+
+    if args.play:
+        play(log, args.session, args.speed)
+        return 0
+
+    if args.events:
+        for event in log.events(start, stop):
+            print(f"{event['time']:10.3f}  tipo {event['type']:.0f}  tecla {event['key']:.0f}  "
+                  f"mod {event['mod']:.0f}  pos ({event['x']:.0f}, {event['y']:.0f})")
+        return 0
+
+    if args.verify:
+        failures = 0
+        for shot_id, steps, difference in verify(log, start, stop):
+            status = "ok" if difference == 0 else f"diferencia {difference:g}"
+            failures += difference != 0
+            print(f"disparo {shot_id}: {steps} pasos, {status}")
+        print(f"{failures} disparos no coinciden")
+        return 1 if failures else 0
+
+    print("sesion,disparo,tiempo,angulo,velocidad,gravedad,dt,rozamiento,alcance,tiempo_vuelo,pasos,altura_max")
+    for shot in log.shots(start, stop):
+        landing = shot['landing'] or {}
+        print(','.join(str(value) for value in (
+            shot['session'], shot['shot'], round(shot['time'], 3), shot['angle'], shot['velocity'], shot['gravity'], shot['dt'],
+            int(shot['drag'] is not None), landing.get('x', ''), landing.get('flight_time', ''),
+            int(landing['steps']) if landing else '', landing.get('max_height', ''))))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,36 @@
 import pygame
 import math
+from background import BackgroundLayer
+from cache import TextCache
+from camera import nice_step, tick_range
+from dirty import DirtyRegions
+from fonts import LazyFont
+
+
+def format_step(dt):
+    """Texto de un paso de tiempo: como fracción 1/N si N es entero (1/60), si no en decimal"""
+    rate = 1 / dt
+    if rate > 1 and abs(rate - round(rate)) < 1e-9:
+        return f"1/{round(rate)}"
+    return f"{dt:.4g}"
 
 
 class Renderer:
     """Clase para manejar la visualización de la simulación"""
 
-    def __init__(self):
-        """Inicializa el renderizador y configura la pantalla"""
+    # Fuentes del registro compartido, creadas al usarse por primera vez
+    font = LazyFont('arial', 16)
+    title_font = LazyFont('arial', 20, bold=True)
+    formula_font = LazyFont('arial', 14)  # Fuente para fórmulas
+    label_font = LazyFont('arial', 12)  # Etiquetas de la cuadrícula
+
+    def __init__(self, dirty_rects=False):
+        """Inicializa el renderizador y configura la pantalla
+
+        Con dirty_rects solo se envían a la ventana las zonas que cambiaron en
+        cada cuadro (útil en pantallas sin aceleración, como VNC o una
+        Raspberry Pi); si no, cada cuadro es un flip completo.
+        """
         self.screen_width = 1200
         self.screen_height = 600
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
@@ -19,436 +43,433 @@ class Renderer:
         self.text_color = (0, 0, 0)  # Negro
         self.formula_color = (10, 10, 80)  # Azul oscuro para fórmulas
         self.grid_color = (180, 180, 180)  # Gris para la cuadrícula
+        # Separación mínima en píxeles entre líneas de la cuadrícula y entre
+        # marcas de las reglas; en metros depende del zoom
+        self.grid_spacing = 50
+        self.tick_spacing = 10
+
+        # Capa cacheada con el contenido estático del fondo
+        self.background = BackgroundLayer(self)
+
+        # Caché LRU de textos renderizados, compartida por todos los paneles
+        self.text_cache = TextCache(maxsize=512)
+
+        # Panel de fórmulas pre-renderizado (se regenera solo si cambian sus datos)
+        self.formulas_rect = pygame.Rect(220, 10, 950, 240)
+        self.formulas_surface = None
+        self.formulas_key = None
+        self.formulas_renders = 0
+
+        # Panel del perfilador de cuadros (tecla F3), regenerado cada
+        # profile_refresh cuadros medidos
+        self.profile_surface = None
+        self.profile_frame = None
+        self.profile_refresh = 30
+
+        # Zonas modificadas por cuadro (modo de actualización parcial)
+        self.dirty = DirtyRegions(self.screen, enabled=dirty_rects)
+
+    def render_text(self, font, text, color):
+        """Renderiza un texto con antialiasing usando la caché de superficies"""
+        return self.text_cache.render(font, text, color)
+
+    def draw_background(self, scale, camera_offset_x, ground_y, height_ruler_x, show_grid=True):
+        """Dibuja el fondo estático completo con un único blit de la capa cacheada"""
+        rebuilds = self.background.rebuilds
+        layer = self.background.get(scale, camera_offset_x, ground_y, height_ruler_x, show_grid)
+        self.screen.blit(layer, (0, 0))
+        if self.background.rebuilds != rebuilds:
+            # Cambió la vista: todo el cuadro es distinto
+            self.dirty.invalidate()
+
+    def present(self):
+        """Muestra el cuadro dibujado (por zonas modificadas o completo)"""
+        self.dirty.present()
+
+    def clear_screen(self, surface=None):
+        """Limpia la pantalla con el color de fondo"""
+        if surface is None:
+            surface = self.screen
+        surface.fill(self.bg_color)
 
-        # Fuente
-        self.font = pygame.font.SysFont('arial', 16)
-        self.title_font = pygame.font.SysFont('arial', 20, bold=True)
-        self.formula_font = pygame.font.SysFont('arial', 14)  # Fuente para fórmulas
+    def draw_grid(self, scale, camera_offset_x, ground_y, surface=None):
+        """Dibuja una cuadrícula de fondo para ayudar a visualizar distancias
 
-    def clear_screen(self):
-        """Limpia la pantalla con el color de fondo"""
-        self.screen.fill(self.bg_color)
+        Solo se recorren las líneas visibles y su espaciado crece con el zoom
+        (al menos grid_spacing píxeles), así que el costo no depende de la
+        extensión del mundo ni de la escala.
+        """
+        if surface is None:
+            surface = self.screen
 
-    def draw_grid(self, scale, camera_offset_x, ground_y):
-        """Dibuja una cuadrícula de fondo para ayudar a visualizar distancias"""
         # Definir color blanco para las líneas de la cuadrícula
         grid_color = (255, 255, 255)
 
-        # Calcular el máximo valor X necesario para cubrir toda la pantalla
-        max_x = int((self.screen_width - camera_offset_x) / scale) + 100  # Añadir margen
-
-        # Dibujar líneas verticales cada 50 metros para todo el ancho visible
-        for x in range(50, max_x + 50, 50):
+        # Metros entre líneas (50 m con la escala 1) y rango de x visible
+        step = nice_step(self.grid_spacing / scale)
+        x_min = (0 - camera_offset_x) / scale
+        x_max = (self.screen_width - 1 - camera_offset_x) / scale
+        bottom = min(ground_y, self.screen_height)
+        if bottom <= 0:
+            return
+
+        # Líneas verticales a partir del origen (la primera, la del arco, no se marca)
+        for k in tick_range(max(x_min, step), x_max, step):
+            x = k * step
             # Calcular posición con compensación de cámara
             screen_x = int(x * scale + camera_offset_x)  # Convertir a entero para evitar imprecisiones
+            pygame.draw.line(surface, grid_color,
+                             (screen_x, 0),
+                             (screen_x, bottom), 1)
+
+            # Añadir etiquetas en la parte inferior
+            label = self.render_text(self.label_font, f"{x:g}m", (255, 255, 255))
+            surface.blit(label, (screen_x - 15, ground_y - 20))
+
+    def draw_ground(self, ground_y, scale, camera_offset_x=50, surface=None):
+        """Dibuja el suelo con textura mejorada y marcas de medición
+
+        Las marcas están en metros (cada 10, 50 y 100 m con la escala 1, más
+        separadas al alejar la vista) y solo se dibujan las visibles.
+        """
+        if surface is None:
+            surface = self.screen
+        if ground_y >= self.screen_height:
+            return
 
-            # Si está dentro de la pantalla
-            if 0 <= screen_x < self.screen_width:
-                pygame.draw.line(self.screen, grid_color,
-                                 (screen_x, 0),
-                                 (screen_x, ground_y), 1)
-
-                # Añadir etiquetas en la parte inferior
-                font = pygame.font.SysFont('Arial', 12)
-                label = font.render(f"{x}m", True, (255, 255, 255))
-                self.screen.blit(label, (screen_x - 15, ground_y - 20))
-
-    def draw_ground(self, ground_y, scale):
-        """Dibuja el suelo con textura mejorada y marcas de medición"""
         # Dibujar el suelo base
-        pygame.draw.rect(self.screen, self.ground_color,
+        pygame.draw.rect(surface, self.ground_color,
                          (0, ground_y, self.screen_width, self.screen_height - ground_y))
 
-        # Añadir marcas de distancia en el suelo (cada 10 metros)
-        for i in range(0, self.screen_width, 10):
+        # Añadir marcas de distancia en el suelo (cada 10 metros con la escala 1)
+        step = nice_step(self.tick_spacing / scale)
+        x_min = (0 - camera_offset_x) / scale
+        x_max = (self.screen_width - 1 - camera_offset_x) / scale
+        for k in tick_range(x_min, x_max, step):
+            i = int(k * step * scale + camera_offset_x)
             # Cada 10 metros una línea corta
             line_height = 5
             color = (45, 150, 45)  # Verde claro
 
             # Cada 50 metros una línea más larga
-            if i % 50 == 0:
+            if k % 5 == 0:
                 line_height = 15
                 color = (25, 100, 25)  # Verde más oscuro
 
                 # ELIMINADA la parte que generaba las etiquetas
 
             # Cada 100 metros una línea aún más grande
-            if i % 100 == 0:
+            if k % 10 == 0:
                 line_height = 25
                 color = (20, 80, 20)  # Verde más oscuro
 
-            pygame.draw.line(self.screen, color,
+            pygame.draw.line(surface, color,
                              (i, ground_y),
                              (i, ground_y + line_height), 1)
 
     def draw_info_panel(self, angle, velocity, gravity, is_flying, max_distance, estimated_distance, min_expected, max_expected):
-        """Dibuja el panel de información con los parámetros actuales"""
+        """Dibuja el panel de información con los parámetros actuales y devuelve la zona dibujada"""
         # Panel ampliado para incluir la predicción y rango
         panel_rect = pygame.Rect(10, 10, 200, 240)
         pygame.draw.rect(self.screen, self.panel_color, panel_rect)
         pygame.draw.rect(self.screen, (100, 100, 100), panel_rect, 2)
 
         # Título del panel
-        title = self.title_font.render("Parámetros", True, self.text_color)
+        title = self.render_text(self.title_font, "Parámetros", self.text_color)
         self.screen.blit(title, (15, 15))
 
         # Etiquetas
-        angle_label = self.font.render("Ángulo:", True, self.text_color)
+        angle_label = self.render_text(self.font, "Ángulo:", self.text_color)
         self.screen.blit(angle_label, (15, 50))
 
-        velocity_label = self.font.render("Velocidad:", True, self.text_color)
+        velocity_label = self.render_text(self.font, "Velocidad:", self.text_color)
         self.screen.blit(velocity_label, (15, 80))
 
-        gravity_label = self.font.render(f"Gravedad: {gravity} m/s²", True, self.text_color)
+        gravity_label = self.render_text(self.font, f"Gravedad: {gravity} m/s²", self.text_color)
         self.screen.blit(gravity_label, (15, 110))
 
         status = "En vuelo" if is_flying else "Listo"
-        status_label = self.font.render(f"Estado: {status}", True, self.text_color)
+        status_label = self.render_text(self.font, f"Estado: {status}", self.text_color)
         self.screen.blit(status_label, (15, 140))
 
         # Mostrar predicción con rango
-        prediction_label = self.font.render(f"Predicción: {estimated_distance:.2f} m", True, (0, 0, 255))
+        prediction_label = self.render_text(self.font, f"Predicción: {estimated_distance:.2f} m", (0, 0, 255))
         self.screen.blit(prediction_label, (15, 170))
 
         # Nuevo - Mostrar rango de error esperado
-        range_label = self.font.render(f"Rango: [{min_expected:.2f}-{max_expected:.2f}]", True, (0, 100, 0))
+        range_label = self.render_text(self.font, f"Rango: [{min_expected:.2f}-{max_expected:.2f}]", (0, 100, 0))
         self.screen.blit(range_label, (15, 200))
 
         # Mostrar distancia real alcanzada
-        distance_label = self.font.render(f"Dist. máx: {max_distance:.2f} m", True, (255, 0, 0))
-        self.screen.blit(distance_label, (15, 230))
+        distance_label = self.render_text(self.font, f"Dist. máx: {max_distance:.2f} m", (255, 0, 0))
+        distance_rect = self.screen.blit(distance_label, (15, 230))
 
         # Indicaciones de control
-        controls = self.font.render("↑/↓: Ángulo | +/-: Velocidad | Espacio: Disparar", True, self.text_color)
+        controls = self.render_text(self.font, "↑/↓: Ángulo | +/-: Velocidad | Espacio: Disparar", self.text_color)
         self.screen.blit(controls, (250, 15))
+        # El texto puede sobresalir del borde inferior del panel
+        return panel_rect.union(distance_rect)
+
+    def draw_formulas_panel(self, angle, velocity, gravity, is_flying, max_distance, summary, dt=1 / 60):
+        """Dibuja panel con fórmulas físicas y resultados calculados
+
+        summary es el physics.ShotSummary del disparo (Physics.summary), de
+        donde salen los resultados mostrados; dt es el paso de física, que
+        se cita en la explicación del margen de error. El panel se renderiza en una
+        Surface propia y solo se vuelve a generar cuando cambian el ángulo, la
+        velocidad o la gravedad. Devuelve la zona del panel (sin las líneas de
+        explicación, que no cambian).
+        """
+        key = (angle, velocity, gravity)
+        if key != self.formulas_key:
+            self.render_formulas_panel(angle, velocity, gravity, summary)
+            self.formulas_key = key
+            self.formulas_renders += 1
+        self.screen.blit(self.formulas_surface, self.formulas_rect.topleft)
+
+        # Explicación sobre margen de error (queda debajo del panel, sobre el
+        # fondo, así que se dibuja directamente con textos cacheados)
+        y = 50 + 7 * 30 + 10  # Debajo de las siete filas de fórmulas
+        explain = self.render_text(self.formula_font, "La diferencia entre predicción y distancia real se debe a:",
+                                   (100, 0, 0))
+        self.screen.blit(explain, (230, y))
+        y += 25
 
-    def draw_formulas_panel(self, angle, velocity, gravity, is_flying, max_distance):
-        """Dibuja panel con fórmulas físicas y resultados calculados"""
+        reasons = [
+            f"• Discretización del tiempo (Δt = {format_step(dt)} s)",
+            "• Acumulación de errores de redondeo",
+            "• Limitaciones en la representación gráfica"
+        ]
+
+        for reason in reasons:
+            self.screen.blit(self.render_text(self.formula_font, reason, (100, 0, 0)), (240, y))
+            y += 20
+        return self.formulas_rect
+
+    def render_formulas_panel(self, angle, velocity, gravity, summary):
+        """Genera la Surface del panel de fórmulas para los valores dados"""
         # Ubicar el panel a la derecha del panel de parámetros - EXTENDIDO
-        panel_rect = pygame.Rect(220, 10, 950, 240)
-        pygame.draw.rect(self.screen, self.panel_color, panel_rect)
-        pygame.draw.rect(self.screen, (100, 100, 100), panel_rect, 2)
+        panel_rect = self.formulas_rect
+        if self.formulas_surface is None:
+            self.formulas_surface = pygame.Surface(panel_rect.size)
+            if pygame.display.get_surface() is not None:
+                self.formulas_surface = self.formulas_surface.convert()
+        surface = self.formulas_surface
+        # Las posiciones se expresan en coordenadas de pantalla y se
+        # trasladan al origen del panel al dibujar
+        origin = panel_rect.topleft
+
+        pygame.draw.rect(surface, self.panel_color, surface.get_rect())
+        pygame.draw.rect(surface, (100, 100, 100), surface.get_rect(), 2)
 
         # Título del panel
-        title = self.title_font.render("Fórmulas Físicas", True, self.text_color)
-        self.screen.blit(title, (230, 15))
+        title = self.render_text(self.title_font, "Fórmulas Físicas", self.text_color)
+        surface.blit(title, (230 - origin[0], 15 - origin[1]))
 
-        # Convertir valores para fórmulas
+        # Convertir valores para fórmulas (los senos y cosenos solo se muestran)
         v0 = velocity
         theta = angle
         g = gravity
         sin_theta = round(math.sin(math.radians(theta)), 3)
         cos_theta = round(math.cos(math.radians(theta)), 3)
-        sin_2theta = round(math.sin(math.radians(2 * theta)), 3)
 
-        # Calcular resultados
-        vel_x = round(v0 * cos_theta, 3)
-        vel_y = round(v0 * sin_theta, 3)
-        tiempo_vuelo = round((2 * v0 * sin_theta) / g, 3)
-        alcance = round((v0 ** 2 * sin_2theta) / g, 3)
-        altura_max = round((v0 ** 2 * sin_theta ** 2) / (2 * g), 3)
+        # Resultados calculados por Physics, los mismos que usa la estimación
+        vel_x = round(summary.vx, 3)
+        vel_y = round(summary.vy, 3)
+        tiempo_vuelo = round(summary.flight_time, 3)
+        alcance = round(summary.distance, 3)
+        altura_max = round(summary.max_height, 3)
 
         # Colores para variables y conclusiones
         variable_color = (0, 128, 0)  # Verde para variables
         formula_color = self.formula_color
         conclusion_color = (0, 0, 139)  # Azul rey para conclusiones
 
+        # Cada fila: fórmula simbólica, sustitución por fragmentos y conclusión
+        rows = [
+            # 1. DESCOMPOSICIÓN DE VELOCIDAD INICIAL - Fundamental
+            ("Velocidad horizontal: v_x = v0·cos(θ)",
+             [("v_x = ", formula_color), (f"{v0}", variable_color), ("·", formula_color),
+              (f"{cos_theta}", variable_color), (" = ", formula_color), (f"{vel_x}", variable_color),
+              (" m/s", formula_color)],
+             "Componente constante durante todo el movimiento"),
+            ("Velocidad vertical: v_y = v0·sin(θ)",
+             [("v_y = ", formula_color), (f"{v0}", variable_color), ("·", formula_color),
+              (f"{sin_theta}", variable_color), (" = ", formula_color), (f"{vel_y}", variable_color),
+              (" m/s", formula_color)],
+             "Disminuye con el tiempo debido a la gravedad"),
+            # 2. ECUACIONES DE MOVIMIENTO - Usando las componentes de velocidad
+            ("Posición x(t): x = v_x·t = v0·cos(θ)·t",
+             [("x = ", formula_color), (f"{vel_x}", variable_color), ("·t = ", formula_color),
+              (f"{v0}", variable_color), ("·", formula_color), (f"{cos_theta}", variable_color),
+              ("·t", formula_color)],
+             "Movimiento horizontal uniforme"),
+            ("Posición y(t): y = v_y·t - ½g·t² = v0·sin(θ)·t - ½g·t²",
+             [("y = ", formula_color), (f"{vel_y}", variable_color), ("·t - 0.5·", formula_color),
+              (f"{g}", variable_color), ("·t²", formula_color)],
+             "Caída libre afectada por la gravedad"),
+            # 3. TIEMPO DE VUELO - A partir de y(t) cuando y=0
+            ("Tiempo vuelo T = (2·v_y)/g = (2·v0·sin(θ))/g",
+             [("T = (2·", formula_color), (f"{vel_y}", variable_color), (")/", formula_color),
+              (f"{g}", variable_color), (" = ", formula_color), (f"{tiempo_vuelo}", variable_color),
+              (" s", formula_color)],
+             f"Tiempo total en el aire: {tiempo_vuelo} s"),
+            # 4. ALCANCE HORIZONTAL - Usando x(T)
+            ("Alcance R = v_x·T = (v0²·sin(2θ))/g",
+             [("R = ", formula_color), (f"{vel_x}", variable_color), ("·", formula_color),
+              (f"{tiempo_vuelo}", variable_color), (" = ", formula_color), (f"{alcance}", variable_color),
+              (" m", formula_color)],
+             f"Distancia horizontal máxima: {alcance} m"),
+            # 5. ALTURA MÁXIMA - Cuando v_y = 0
+            ("Altura máx. H = v_y²/(2g) = (v0²·sin²(θ))/(2g)",
+             [("H = ", formula_color), (f"{vel_y}", variable_color), ("²/(2·", formula_color),
+              (f"{g}", variable_color), (") = ", formula_color), (f"{altura_max}", variable_color),
+              (" m", formula_color)],
+             f"Punto más alto de la trayectoria: {altura_max} m"),
+        ]
+
         # Posición y espaciado
         y = 50
         spacing = 30
         column_width = 260  # Ancho de columna
 
-        # 1. DESCOMPOSICIÓN DE VELOCIDAD INICIAL - Fundamental
-        # Velocidad horizontal
-        formula_symbolic = self.formula_font.render("Velocidad horizontal: v_x = v0·cos(θ)", True, formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("v_x = ", True, formula_color)
-        formula2 = self.formula_font.render(f"{v0}", True, variable_color)
-        formula3 = self.formula_font.render("·", True, formula_color)
-        formula4 = self.formula_font.render(f"{cos_theta}", True, variable_color)
-        formula5 = self.formula_font.render(" = ", True, formula_color)
-        formula6 = self.formula_font.render(f"{vel_x}", True, variable_color)
-        formula7 = self.formula_font.render(" m/s", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-        x_pos += formula5.get_width()
-        self.screen.blit(formula6, (x_pos, y))
-        x_pos += formula6.get_width()
-        self.screen.blit(formula7, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Componente constante durante todo el movimiento", True,
-                                              conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        # Velocidad vertical
-        formula_symbolic = self.formula_font.render("Velocidad vertical: v_y = v0·sin(θ)", True, formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("v_y = ", True, formula_color)
-        formula2 = self.formula_font.render(f"{v0}", True, variable_color)
-        formula3 = self.formula_font.render("·", True, formula_color)
-        formula4 = self.formula_font.render(f"{sin_theta}", True, variable_color)
-        formula5 = self.formula_font.render(" = ", True, formula_color)
-        formula6 = self.formula_font.render(f"{vel_y}", True, variable_color)
-        formula7 = self.formula_font.render(" m/s", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-        x_pos += formula5.get_width()
-        self.screen.blit(formula6, (x_pos, y))
-        x_pos += formula6.get_width()
-        self.screen.blit(formula7, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Disminuye con el tiempo debido a la gravedad", True, conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        # 2. ECUACIONES DE MOVIMIENTO - Usando las componentes de velocidad
-        formula_symbolic = self.formula_font.render("Posición x(t): x = v_x·t = v0·cos(θ)·t", True, formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("x = ", True, formula_color)
-        formula2 = self.formula_font.render(f"{vel_x}", True, variable_color)
-        formula3 = self.formula_font.render("·t = ", True, formula_color)
-        formula4 = self.formula_font.render(f"{v0}", True, variable_color)
-        formula5 = self.formula_font.render("·", True, formula_color)
-        formula6 = self.formula_font.render(f"{cos_theta}", True, variable_color)
-        formula7 = self.formula_font.render("·t", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-        x_pos += formula5.get_width()
-        self.screen.blit(formula6, (x_pos, y))
-        x_pos += formula6.get_width()
-        self.screen.blit(formula7, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Movimiento horizontal uniforme", True, conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        formula_symbolic = self.formula_font.render("Posición y(t): y = v_y·t - ½g·t² = v0·sin(θ)·t - ½g·t²", True,
-                                                    formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("y = ", True, formula_color)
-        formula2 = self.formula_font.render(f"{vel_y}", True, variable_color)
-        formula3 = self.formula_font.render("·t - 0.5·", True, formula_color)
-        formula4 = self.formula_font.render(f"{g}", True, variable_color)
-        formula5 = self.formula_font.render("·t²", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Caída libre afectada por la gravedad", True, conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        # 3. TIEMPO DE VUELO - A partir de y(t) cuando y=0
-        formula_symbolic = self.formula_font.render("Tiempo vuelo T = (2·v_y)/g = (2·v0·sin(θ))/g", True, formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("T = (2·", True, formula_color)
-        formula2 = self.formula_font.render(f"{vel_y}", True, variable_color)
-        formula3 = self.formula_font.render(")/", True, formula_color)
-        formula4 = self.formula_font.render(f"{g}", True, variable_color)
-        formula5 = self.formula_font.render(" = ", True, formula_color)
-        formula6 = self.formula_font.render(f"{tiempo_vuelo}", True, variable_color)
-        formula7 = self.formula_font.render(" s", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-        x_pos += formula5.get_width()
-        self.screen.blit(formula6, (x_pos, y))
-        x_pos += formula6.get_width()
-        self.screen.blit(formula7, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Tiempo total en el aire: {tiempo_vuelo} s", True, conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        # 4. ALCANCE HORIZONTAL - Usando x(T)
-        formula_symbolic = self.formula_font.render("Alcance R = v_x·T = (v0²·sin(2θ))/g", True, formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("R = ", True, formula_color)
-        formula2 = self.formula_font.render(f"{vel_x}", True, variable_color)
-        formula3 = self.formula_font.render("·", True, formula_color)
-        formula4 = self.formula_font.render(f"{tiempo_vuelo}", True, variable_color)
-        formula5 = self.formula_font.render(" = ", True, formula_color)
-        formula6 = self.formula_font.render(f"{alcance}", True, variable_color)
-        formula7 = self.formula_font.render(" m", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-        x_pos += formula5.get_width()
-        self.screen.blit(formula6, (x_pos, y))
-        x_pos += formula6.get_width()
-        self.screen.blit(formula7, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Distancia horizontal máxima: {alcance} m", True, conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        # 5. ALTURA MÁXIMA - Cuando v_y = 0
-        formula_symbolic = self.formula_font.render("Altura máx. H = v_y²/(2g) = (v0²·sin²(θ))/(2g)", True,
-                                                    formula_color)
-        self.screen.blit(formula_symbolic, (230, y))
-
-        formula1 = self.formula_font.render("H = ", True, formula_color)
-        formula2 = self.formula_font.render(f"{vel_y}", True, variable_color)
-        formula3 = self.formula_font.render("²/(2·", True, formula_color)
-        formula4 = self.formula_font.render(f"{g}", True, variable_color)
-        formula5 = self.formula_font.render(") = ", True, formula_color)
-        formula6 = self.formula_font.render(f"{altura_max}", True, variable_color)
-        formula7 = self.formula_font.render(" m", True, formula_color)
-
-        x_pos = 230 + column_width
-        self.screen.blit(formula1, (x_pos, y))
-        x_pos += formula1.get_width()
-        self.screen.blit(formula2, (x_pos, y))
-        x_pos += formula2.get_width()
-        self.screen.blit(formula3, (x_pos, y))
-        x_pos += formula3.get_width()
-        self.screen.blit(formula4, (x_pos, y))
-        x_pos += formula4.get_width()
-        self.screen.blit(formula5, (x_pos, y))
-        x_pos += formula5.get_width()
-        self.screen.blit(formula6, (x_pos, y))
-        x_pos += formula6.get_width()
-        self.screen.blit(formula7, (x_pos, y))
-
-        conclusion = self.formula_font.render(f"Punto más alto de la trayectoria: {altura_max} m", True,
-                                              conclusion_color)
-        self.screen.blit(conclusion, (230 + 2 * column_width, y))
-        y += spacing
-
-        # Explicación sobre margen de error
-        y += 10
-        explain = self.formula_font.render("La diferencia entre predicción y distancia real se debe a:", True,
-                                           (100, 0, 0))
-        self.screen.blit(explain, (230, y))
-        y += 25
-
-        reasons = [
-            "• Discretización del tiempo (Δt = 1/60 s)",
-            "• Acumulación de errores de redondeo",
-            "• Limitaciones en la representación gráfica"
-        ]
+        for symbolic, fragments, conclusion in rows:
+            formula_symbolic = self.render_text(self.formula_font, symbolic, formula_color)
+            surface.blit(formula_symbolic, (230 - origin[0], y - origin[1]))
+
+            x_pos = 230 + column_width
+            for text, color in fragments:
+                fragment = self.render_text(self.formula_font, text, color)
+                surface.blit(fragment, (x_pos - origin[0], y - origin[1]))
+                x_pos += fragment.get_width()
+
+            conclusion = self.render_text(self.formula_font, conclusion, conclusion_color)
+            surface.blit(conclusion, (230 + 2 * column_width - origin[0], y - origin[1]))
+            y += spacing
+
+    def draw_target(self, distance, scale, camera_offset_x, ground_y):
+        """Dibuja una bandera en el objetivo de la puntería y devuelve la zona dibujada (None si no se ve)"""
+        x = int(distance * scale + camera_offset_x)
+        if x < -14 or x >= self.screen_width or ground_y - 30 >= self.screen_height or ground_y < 0:
+            return None
+        pole = pygame.draw.line(self.screen, (80, 80, 80), (x, ground_y), (x, ground_y - 30), 2)
+        flag = pygame.draw.polygon(self.screen, (200, 0, 0),
+                                   [(x, ground_y - 30), (x + 14, ground_y - 25), (x, ground_y - 20)])
+        return pole.union(flag)
+
+    def draw_profile_overlay(self, profiler):
+        """Dibuja los percentiles p50/p95/p99 (ms) de cada etapa del cuadro
+
+        Los valores cambian continuamente, así que el panel solo se vuelve a
+        generar cada profile_refresh cuadros y sus textos no pasan por la
+        caché. Devuelve la zona dibujada.
+        """
+        if (self.profile_surface is None or self.profile_frame is None
+                or profiler.frame_count - self.profile_frame >= self.profile_refresh):
+            self.render_profile_overlay(profiler.percentiles())
+            self.profile_frame = profiler.frame_count
+        rect = self.profile_surface.get_rect(topright=(self.screen_width - 10, 260))
+        return self.screen.blit(self.profile_surface, rect)
+
+    def render_profile_overlay(self, percentiles):
+        """Genera la Surface del panel del perfilador"""
+        columns = (10, 150, 210, 270)
+        row_height = 18
+        surface = pygame.Surface((330, 34 + row_height * max(len(percentiles), 1)))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(self.panel_color)
+        pygame.draw.rect(surface, (100, 100, 100), surface.get_rect(), 1)
+
+        for x, text in zip(columns, ("Etapa (ms)", "p50", "p95", "p99")):
+            surface.blit(self.formula_font.render(text, True, self.formula_color), (x, 8))
+        y = 8 + row_height + 4
+        for name, values in percentiles.items():
+            surface.blit(self.formula_font.render(name, True, self.text_color), (columns[0], y))
+            for x, value in zip(columns[1:], values):
+                surface.blit(self.formula_font.render(f"{value:6.2f}", True, self.text_color), (x, y))
+            y += row_height
+        self.profile_surface = surface
+
+    def draw_distance_ruler(self, y_pos, scale, camera_offset_x, surface=None):
+        """Dibuja una regla en la parte inferior para mostrar la distancia
+
+        Como la cuadrícula, solo recorre las marcas visibles (desde el origen)
+        y las espacia según el zoom.
+        """
+        if surface is None:
+            surface = self.screen
 
-        for reason in reasons:
-            self.screen.blit(self.formula_font.render(reason, True, (100, 0, 0)), (240, y))
-            y += 20
-
-    def draw_distance_ruler(self, y_pos, scale, camera_offset_x):
-        """Dibuja una regla en la parte inferior para mostrar la distancia"""
         ruler_height = 20
         tick_height = 10
-        offset = 50  # Desplazamiento de 50m
 
         # Dibujar la línea base de la regla
-        pygame.draw.rect(self.screen, (50, 50, 50),
+        pygame.draw.rect(surface, (50, 50, 50),
                          (0, y_pos, self.screen_width, ruler_height))
 
-        # Dibujar las marcas de la regla
-        for i in range(0, 1001, 10):  # Marcas cada 10 metros, hasta 1000m
+        # Dibujar las marcas de la regla (cada 10 metros con la escala 1)
+        step = nice_step(self.tick_spacing / scale)
+        x_min = (0 - camera_offset_x) / scale
+        x_max = (self.screen_width - 1 - camera_offset_x) / scale
+        for k in tick_range(max(x_min, 0), x_max, step):
             # Calcular posición con compensación de cámara
-            x_pos = i * scale + camera_offset_x
+            x_pos = k * step * scale + camera_offset_x
+
+            # Marca principal cada 10 marcas (100 metros con la escala 1)
+            if k % 10 == 0:
+                pygame.draw.line(surface, (255, 255, 255),
+                                 (x_pos, y_pos),
+                                 (x_pos, y_pos + tick_height * 2), 2)
+                # Se elimina la etiqueta de distancia
+            # Marca secundaria cada 5 marcas
+            elif k % 5 == 0:
+                pygame.draw.line(surface, (255, 255, 255),
+                                 (x_pos, y_pos),
+                                 (x_pos, y_pos + int(tick_height * 1.5)), 1)
+            # Marcas pequeñas
+            else:
+                pygame.draw.line(surface, (200, 200, 200),
+                                 (x_pos, y_pos),
+                                 (x_pos, y_pos + tick_height), 1)
+
+    def draw_height_ruler(self, x_pos, scale, ground_y, surface=None):
+        """Dibuja una regla vertical para mostrar la altura
+
+        La regla queda fija en la pantalla y marca las alturas visibles, con
+        marcas cada 10 metros y etiquetas cada 50 con la escala 1.
+        """
+        if surface is None:
+            surface = self.screen
 
-            # Si está dentro de la pantalla
-            if 0 <= x_pos < self.screen_width:
-                # Marca principal cada 100 metros
-                if i % 100 == 0:
-                    pygame.draw.line(self.screen, (255, 255, 255),
-                                     (x_pos, y_pos),
-                                     (x_pos, y_pos + tick_height * 2), 2)
-                    # Se elimina la etiqueta de distancia
-                # Marca secundaria cada 50 metros
-                elif i % 50 == 0:
-                    pygame.draw.line(self.screen, (255, 255, 255),
-                                     (x_pos, y_pos),
-                                     (x_pos, y_pos + int(tick_height * 1.5)), 1)
-                # Marcas pequeñas cada 10 metros
-                else:
-                    pygame.draw.line(self.screen, (200, 200, 200),
-                                     (x_pos, y_pos),
-                                     (x_pos, y_pos + tick_height), 1)
-
-
-    def draw_height_ruler(self, x_pos, scale, ground_y):
-        """Dibuja una regla vertical para mostrar la altura"""
         ruler_width = 20
         tick_width = 10
 
         # Dibujar la línea base de la regla
-        pygame.draw.rect(self.screen, (50, 50, 50),
-                         (x_pos, 0, ruler_width, ground_y))
-
-        # Dibujar las marcas de la regla cada 10 metros
-        for i in range(0, ground_y, 10):
+        bottom = min(ground_y, self.screen_height)
+        if bottom <= 0:
+            return
+        pygame.draw.rect(surface, (50, 50, 50),
+                         (x_pos, 0, ruler_width, bottom))
+
+        # Dibujar las marcas de la regla (de la altura visible más baja a la más alta)
+        step = nice_step(self.tick_spacing / scale)
+        lowest = max(0, (ground_y - self.screen_height) / scale)
+        for k in tick_range(lowest, ground_y / scale, step):
+            y = ground_y - k * step * scale
             # Si está dentro de la pantalla
-            if i < ground_y:
-                # Marca principal cada 50 metros
-                if i % 50 == 0:
-                    pygame.draw.line(self.screen, (255, 255, 255),
-                                     (x_pos, ground_y - i),
-                                     (x_pos + tick_width * 2, ground_y - i), 2)
-
-                    # Etiqueta de altura
-                    height_text = self.font.render(f"{i}m", True, (255, 255, 255))
-                    self.screen.blit(height_text, (x_pos + tick_width * 2 + 5, ground_y - i - 10))
-                else:
-                    # Marcas intermedias
-                    pygame.draw.line(self.screen, (200, 200, 200),
-                                     (x_pos, ground_y - i),
-                                     (x_pos + tick_width, ground_y - i), 1)
\ No newline at end of file
+            if y <= 0:
+                continue
+            # Marca principal cada 5 marcas (50 metros con la escala 1)
+            if k % 5 == 0:
+                pygame.draw.line(surface, (255, 255, 255),
+                                 (x_pos, y),
+                                 (x_pos + tick_width * 2, y), 2)
+
+                # Etiqueta de altura
+                height_text = self.render_text(self.font, f"{k * step:g}m", (255, 255, 255))
+                surface.blit(height_text, (x_pos + tick_width * 2 + 5, y - 10))
+            else:
+                # Marcas intermedias
+                pygame.draw.line(surface, (200, 200, 200),
+                                 (x_pos, y),
+                                 (x_pos + tick_width, y), 1)
@@ -1,33 +1,86 @@
+import math
+import random
+import numpy as np
 import pygame
 import sys
 from physics import Physics
 from bow import Bow
 from arrow import Arrow
-import pygame_textinput
+from volley import Volley
+from camera import Camera
+from fonts import LazyFont
+from forces import QuadraticDrag
+from aiming import AimSolver
+from profiler import FrameProfiler
+from recorder import ShotRecorder
+from text_input import LazyTextInput
+from startup import init_pygame
 
 
 class Simulation:
     """Clase principal que maneja la simulación y controles"""
 
-    def __init__(self):
-        """Inicializa la simulación y sus componentes"""
-        pygame.init()
+    # Fuente de los campos de entrada, creada al usarse por primera vez
+    input_font = LazyFont('arial', 20)
+
+    def __init__(self, fps=60, physics_rate=60, time_scale=1.0, drag=None, profiler=None, record=None,
+                 lod_tolerance=0.5):
+        """Inicializa la simulación y sus componentes
+
+        fps limita la frecuencia de dibujo (0 = sin límite), physics_rate fija
+        los pasos de física por segundo simulado y time_scale acelera (>1) o
+        ralentiza (<1) el tiempo simulado sin cambiar el paso de física. drag
+        es el modelo de rozamiento inicial (None = sin rozamiento); la tecla D
+        lo activa y desactiva. profiler es un FrameProfiler que mide las
+        etapas de cada cuadro (por defecto uno desactivado; la tecla F3 lo
+        activa y muestra sus percentiles). Con record (ruta de archivo) se
+        graban los disparos y las entradas de la sesión (ver recorder.py).
+        lod_tolerance es el error máximo, en píxeles, al simplificar la
+        trayectoria dibujada (0 = dibujar todos los puntos).
+        """
+        init_pygame()
         self.clock = pygame.time.Clock()
         self.running = True
-        self.fps = 60
-        self.dt = 1 / self.fps
+        self.fps = fps
+        self.physics_rate = physics_rate
+        self.dt = 1 / physics_rate
+        self.time_scale = time_scale
+        self.lod_tolerance = lod_tolerance
+
+        # Bucle de paso fijo: tiempo simulado pendiente de consumir
+        self.accumulator = 0.0
+        self.max_frame_time = 0.25  # Evita la "espiral de la muerte" tras una pausa larga
+        self.min_time_scale = 0.125
+        self.max_time_scale = 16.0
+
+        # Las teclas mantenidas se aplican a ritmo fijo (real), no una vez por cuadro
+        self.input_rate = 60
+        self.input_accumulator = 0.0
 
         # Configuración física
-        self.physics = Physics(gravity=9.8)
+        self.physics = Physics(gravity=9.8, drag=drag)
+        self.drag_model = drag if drag is not None else QuadraticDrag()
+        # Puntería inversa: clic en la escena para apuntar a esa distancia
+        self.aim = AimSolver(self.physics)
+        self.aim.prepare()
+        self.target_distance = None
+        self.pending_aim = None  # (distancia, tiro alto) a la espera de la tabla de puntería
 
         # Configuración de la simulación
-        self.ground_y = 500
-        self.bow = Bow(50, 20)
-        self.arrow = Arrow(50, 20, self.physics)
-        # Ajustado para que el arco esté en (0,0) en la cuadrícula
-        self.camera_offset_x = 50
-        self.camera_offset_y = 0
-        self.scale = 1.0
+        # Para la sensibilidad reducida
+        self.angle_sensitivity = 0.5  # Grados por pulsación
+        self.velocity_sensitivity = 0.2  # Unidades por pulsación
+        self.bow = Bow(50, 20, angle_step=self.angle_sensitivity)
+        self.arrow = Arrow(50, 20, self.physics, lod_tolerance=self.lod_tolerance)
+        # Lluvia de flechas: muchas flechas simultáneas en arreglos de NumPy
+        self.volley = Volley(self.physics)
+        self.volley_size = 2000  # Flechas por descarga (tecla V)
+        self.volley_spread = (0.1, 5.0)  # Variación relativa de la velocidad y en grados del ángulo
+        # Cámara con zoom y desplazamiento; la vista inicial deja el arco en
+        # (0,0) de la cuadrícula y el suelo en la fila 500
+        self.camera = Camera(scale=1.0, offset_x=50, ground_y=500)
+        self.zoom_step = 1.25  # Factor de zoom por paso de la rueda del ratón
+        self.panning = False  # Arrastrando la escena con el botón derecho o central
 
         # Estado de la simulación
         self.show_trajectory = True
@@ -40,16 +93,17 @@ class Simulation:
         self.max_angle = 90
         self.min_angle = 0
 
-        # Configuración de entrada de texto
-        self.angle_input = pygame_textinput.TextInputVisualizer(
+        # Configuración de entrada de texto (una sola fuente compartida); los
+        # widgets se crean la primera vez que se edita cada campo
+        self.angle_input = LazyTextInput(
+            lambda: self.input_font,
             font_color=(0, 0, 0),
-            cursor_color=(0, 0, 0),
-            font_object=pygame.font.SysFont('arial', 20)
+            cursor_color=(0, 0, 0)
         )
-        self.velocity_input = pygame_textinput.TextInputVisualizer(
+        self.velocity_input = LazyTextInput(
+            lambda: self.input_font,
             font_color=(0, 0, 0),
-            cursor_color=(0, 0, 0),
-            font_object=pygame.font.SysFont('arial', 20)
+            cursor_color=(0, 0, 0)
         )
 
         # Ajustar valores iniciales
@@ -58,25 +112,38 @@ class Simulation:
 
         # Distancia máxima registrada y estimación teórica
         self.max_distance = 0
-        self.estimated_distance = self.physics.max_horizontal_distance(
-            self.bow.draw_strength, self.bow.angle)
-        # Calcular los márgenes de error (±2%)
-        self.error_margin = 0.02 * self.estimated_distance
-        self.min_expected = self.estimated_distance * (1 - 0.02)
-        self.max_expected = self.estimated_distance * (1 + 0.02)
+        # Estimación y márgenes de error (±2%)
+        self.refresh_estimate()
         self.last_arrow_x = 0
 
-        # Para la sensibilidad reducida
-        self.angle_sensitivity = 0.5  # Grados por pulsación
-        self.velocity_sensitivity = 0.2  # Unidades por pulsación
-
         # Posición de la regla de altura
         self.height_ruler_x = 50
 
+        # Pide un cuadro completo en el modo de zonas modificadas
+        self.full_redraw = True
+
+        # Perfilador de cuadros; sin panel ni archivo de salida no mide nada
+        self.profiler = profiler if profiler is not None else FrameProfiler()
+        self.show_profiler = False
+        # Marcas del arranque (main.py --startup-profile); se informan tras el primer cuadro
+        self.startup = None
+
+        # Grabación de los disparos de la sesión
+        self.recorder = ShotRecorder(record, self.physics, physics_rate) if record else None
+
     def handle_events(self):
         """Procesa los eventos de entrada del usuario"""
         events = pygame.event.get()
 
+        # Cualquier evento (salvo mover el ratón) puede cambiar media pantalla:
+        # el próximo cuadro se muestra completo
+        if any(event.type != pygame.MOUSEMOTION for event in events):
+            self.full_redraw = True
+
+        if self.recorder is not None:
+            for event in events:
+                self.recorder.event(event)
+
         for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
@@ -85,11 +152,23 @@ class Simulation:
                 if self.active_input is None:  # Si no hay campo de texto activo
                     if event.key == pygame.K_SPACE:
                         if not self.arrow.is_flying:
-                            self.arrow = Arrow(50, 20, self.physics)
-                            self.arrow.shoot(self.bow.draw_strength, self.bow.angle)
+                            self.arrow = Arrow(50, 20, self.physics, lod_tolerance=self.lod_tolerance)
+                            self.arrow.shoot(self.bow.draw_strength, self.bow.angle, self.dt)
+                            if self.recorder is not None:
+                                self.recorder.shot(self.arrow, self.dt)
+                    elif event.key == pygame.K_v:
+                        # Descarga de flechas alrededor del ángulo y la velocidad actuales
+                        # La semilla se graba para poder repetir la descarga
+                        seed = random.getrandbits(32)
+                        self.volley.launch_spread(self.volley_size, self.bow.draw_strength, self.bow.angle,
+                                                  *self.volley_spread, rng=np.random.default_rng(seed))
+                        if self.recorder is not None:
+                            self.recorder.volley(self.volley_size, self.bow.draw_strength, self.bow.angle,
+                                                 *self.volley_spread, seed)
                     elif event.key == pygame.K_r:
-                        self.arrow = Arrow(50, 20, self.physics)
-                        # No resetear camera_offset_x para mantener el origen fijo
+                        self.arrow = Arrow(50, 20, self.physics, lod_tolerance=self.lod_tolerance)
+                        self.volley.clear()
+                        # No reiniciar la cámara para mantener la vista elegida
                         self.max_distance = 0
                     elif event.key == pygame.K_g:
                         current_gravity = self.physics.gravity
@@ -100,17 +179,45 @@ class Simulation:
                         else:
                             self.physics.set_gravity(9.8)  # Volver a Tierra
                         # Actualizar la estimación con la nueva gravedad
-                        self.estimated_distance = self.physics.max_horizontal_distance(
-                            self.bow.draw_strength, self.bow.angle)
+                        self.refresh_estimate()
+                        self.aim.prepare()
+                    elif event.key == pygame.K_d:
+                        # Activar o desactivar el rozamiento del aire
+                        if self.physics.drag is None:
+                            self.physics.set_drag(self.drag_model)
+                        else:
+                            self.physics.set_drag(None)
+                        self.refresh_estimate()
+                        self.aim.prepare()
+                    elif event.key == pygame.K_LEFTBRACKET:
+                        # Cámara lenta
+                        self.set_time_scale(self.time_scale / 2)
+                    elif event.key == pygame.K_RIGHTBRACKET:
+                        # Avance rápido
+                        self.set_time_scale(self.time_scale * 2)
+                    elif event.key == pygame.K_F3:
+                        # Panel del perfilador; se mide mientras esté visible o
+                        # si se pidió exportar la traza
+                        self.show_profiler = not self.show_profiler
+                        self.profiler.enabled = self.show_profiler or self.profiler.output is not None
+                    elif event.key == pygame.K_f:
+                        # Seguir (o dejar de seguir) la flecha en vuelo
+                        self.camera.follow = not self.camera.follow
+                    elif event.key == pygame.K_c:
+                        # Volver a la vista inicial, siguiendo la flecha
+                        self.camera.reset()
+                        self.camera.follow = True
+                    elif event.key == pygame.K_PAGEUP:
+                        self.camera.zoom(self.zoom_step)
+                    elif event.key == pygame.K_PAGEDOWN:
+                        self.camera.zoom(1 / self.zoom_step)
                 elif event.key == pygame.K_RETURN:
                     # Confirmar la edición
                     if self.active_input == "angle":
                         try:
                             angle = float(self.angle_input.value)
                             self.bow.set_angle(angle)
-                            # Actualizar la estimación
-                            self.estimated_distance = self.physics.max_horizontal_distance(
-                                self.bow.draw_strength, self.bow.angle)
+                            self.refresh_estimate()
                         except ValueError:
                             # Restaurar valor anterior si es inválido
                             self.angle_input.value = str(round(self.bow.angle, 1))
@@ -118,9 +225,7 @@ class Simulation:
                         try:
                             velocity = float(self.velocity_input.value)
                             self.bow.set_strength(velocity)
-                            # Actualizar la estimación
-                            self.estimated_distance = self.physics.max_horizontal_distance(
-                                self.bow.draw_strength, self.bow.angle)
+                            self.refresh_estimate()
                         except ValueError:
                             # Restaurar valor anterior si es inválido
                             self.velocity_input.value = str(round(self.bow.draw_strength, 1))
@@ -133,7 +238,22 @@ class Simulation:
                         self.velocity_input.value = str(round(self.bow.draw_strength, 1))
                     self.active_input = None
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
+            elif event.type == pygame.MOUSEWHEEL:
+                # Zoom alrededor del cursor
+                self.camera.zoom(self.zoom_step ** event.y, pygame.mouse.get_pos())
+
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3):
+                # Arrastrar la escena; la cámara deja de seguir la flecha
+                self.panning = True
+                self.camera.follow = False
+
+            elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+                self.panning = False
+
+            elif event.type == pygame.MOUSEMOTION and self.panning:
+                self.camera.pan(*event.rel)
+
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                 # Verificar si se hizo clic en los campos de entrada
                 angle_rect = pygame.Rect(120, 20, 60, 30)
                 velocity_rect = pygame.Rect(120, 60, 60, 30)
@@ -144,6 +264,12 @@ class Simulation:
                     self.active_input = "velocity"
                 else:
                     self.active_input = None
+                    # Clic en la escena (debajo de los paneles): apuntar a esa distancia,
+                    # con Mayúsculas se elige el tiro alto
+                    if event.pos[1] > 250:
+                        distance = self.camera.to_world(*event.pos)[0]
+                        high = bool(pygame.key.get_mods() & pygame.KMOD_SHIFT)
+                        self.aim_at(max(distance, 0.0), high)
 
         # Actualizar campos de texto activos
         if self.active_input == "angle":
@@ -151,6 +277,12 @@ class Simulation:
         elif self.active_input == "velocity":
             self.velocity_input.update(events)
 
+        # Apuntar en cuanto la tabla de puntería esté lista
+        if self.pending_aim is not None and self.aim.prepare():
+            self.aim_at(*self.pending_aim)
+
+    def apply_held_keys(self):
+        """Aplica los ajustes de las teclas mantenidas (un paso de entrada)"""
         # Controles cuando no hay campos de texto activos
         if self.active_input is None:
             keys = pygame.key.get_pressed()
@@ -158,35 +290,64 @@ class Simulation:
             if keys[pygame.K_UP]:
                 self.bow.adjust_angle(self.angle_sensitivity)
                 self.angle_input.value = str(round(self.bow.angle, 1))
-                # Actualizar la estimación de distancia
-                self.estimated_distance = self.physics.max_horizontal_distance(
-                    self.bow.draw_strength, self.bow.angle)
-                # Recalcular los márgenes
-                self.update_error_margins()
+                self.refresh_estimate()
             if keys[pygame.K_DOWN]:
                 self.bow.adjust_angle(-self.angle_sensitivity)
                 self.angle_input.value = str(round(self.bow.angle, 1))
-                # Actualizar la estimación de distancia
-                self.estimated_distance = self.physics.max_horizontal_distance(
-                    self.bow.draw_strength, self.bow.angle)
-                # Recalcular los márgenes
-                self.update_error_margins()
+                self.refresh_estimate()
             if keys[pygame.K_PLUS] or keys[pygame.K_KP_PLUS]:
                 self.bow.adjust_strength(self.velocity_sensitivity)
                 self.velocity_input.value = str(round(self.bow.draw_strength, 1))
-                # Actualizar la estimación de distancia
-                self.estimated_distance = self.physics.max_horizontal_distance(
-                    self.bow.draw_strength, self.bow.angle)
-                # Recalcular los márgenes
-                self.update_error_margins()
+                self.refresh_estimate()
             if keys[pygame.K_MINUS] or keys[pygame.K_KP_MINUS]:
                 self.bow.adjust_strength(-self.velocity_sensitivity)
                 self.velocity_input.value = str(round(self.bow.draw_strength, 1))
-                # Actualizar la estimación de distancia
-                self.estimated_distance = self.physics.max_horizontal_distance(
-                    self.bow.draw_strength, self.bow.angle)
-                # Recalcular los márgenes
-                self.update_error_margins()
+                self.refresh_estimate()
+
+    def set_time_scale(self, time_scale):
+        """Cambia la escala de tiempo (cámara lenta / avance rápido) dentro de los límites"""
+        self.time_scale = max(self.min_time_scale, min(self.max_time_scale, time_scale))
+
+    def aim_at(self, distance, high=False):
+        """Ajusta el arco para que la flecha caiga a 'distance' metros
+
+        Con la velocidad actual se usa el ángulo del tiro bajo (o del alto);
+        si no alcanza, se sube la velocidad a la mínima necesaria, siempre que
+        no supere el máximo permitido.
+
+        Con rozamiento se responde solo con la tabla de puntería (sin refinar
+        con el alcance integrado, que tarda decenas de milisegundos); si la
+        tabla aún se está calculando, se apunta cuando esté lista.
+        """
+        self.target_distance = distance
+        if not self.aim.prepare():
+            self.pending_aim = (distance, high)
+            return
+        self.pending_aim = None
+        angles = self.aim.angles(distance, self.bow.draw_strength, refine=False)
+        if angles is not None:
+            self.bow.set_angle(angles[1] if high else angles[0])
+        else:
+            solution = self.aim.minimum_velocity(distance, refine=False)
+            if solution is None or solution[0] > self.max_velocity:
+                return
+            # Redondear hacia arriba a décimas y apuntar con esa velocidad
+            self.bow.set_strength(math.ceil(solution[0] * 10) / 10)
+            angles = self.aim.angles(distance, self.bow.draw_strength, refine=False)
+            self.bow.set_angle(angles[0] if angles is not None else solution[1])
+
+        self.angle_input.value = str(round(self.bow.angle, 1))
+        self.velocity_input.value = str(round(self.bow.draw_strength, 1))
+        self.refresh_estimate()
+
+    def refresh_estimate(self):
+        """Recalcula la distancia estimada y sus márgenes para el arco actual
+
+        Physics memoriza los resultados, así que mantener una tecla pulsada
+        sobre valores ya visitados no repite los cálculos.
+        """
+        self.estimated_distance = self.physics.landing_distance(self.bow.draw_strength, self.bow.angle)
+        self.update_error_margins()
 
     def update_error_margins(self):
         """Actualiza los márgenes de error basados en la estimación actual"""
@@ -196,7 +357,11 @@ class Simulation:
 
     def update(self):
         """Actualiza el estado de la simulación"""
+        was_flying = self.arrow.is_flying
         self.arrow.update(self.dt)
+        if was_flying and self.recorder is not None:
+            self.recorder.frame(self.arrow)
+        self.volley.step(self.dt)
 
         # Actualizar distancia máxima sin modificar la cámara
         if self.arrow.is_flying:
@@ -204,57 +369,139 @@ class Simulation:
             if self.last_arrow_x > self.max_distance:
                 self.max_distance = self.last_arrow_x
 
+    def advance(self, frame_time):
+        """Consume el tiempo real de un cuadro en pasos de física de tamaño fijo
+
+        Devuelve la fracción (0-1) del siguiente paso ya transcurrida, que se
+        usa para interpolar el dibujo entre los dos últimos estados.
+        """
+        frame_time = min(frame_time, self.max_frame_time)
+
+        # Teclas mantenidas a ritmo constante, independiente de los FPS
+        self.input_accumulator += frame_time
+        input_step = 1 / self.input_rate
+        while self.input_accumulator >= input_step:
+            self.apply_held_keys()
+            self.input_accumulator -= input_step
+
+        # Física a paso fijo; la escala de tiempo solo cambia cuántos pasos se dan
+        self.accumulator += frame_time * self.time_scale
+        while self.accumulator >= self.dt:
+            self.update()
+            self.accumulator -= self.dt
+        return self.accumulator / self.dt
+
     def run(self, renderer):
         """Ejecuta el bucle principal de la simulación"""
+        # La ventana ya existe: pasar las imágenes al formato de la pantalla
+        self.bow.convert()
+        camera = self.camera
+        camera.resize(*renderer.screen.get_size())
+
         while self.running:
+            # Tiempo real desde el cuadro anterior (limitado a self.fps si no es 0)
+            profiler = self.profiler
+            profiler.begin_frame()
+            frame_time = self.clock.tick(self.fps) / 1000
+            profiler.lap('clock.tick')
             self.handle_events()
-            self.update()
-
-            # Dibujar todos los elementos
-            renderer.clear_screen()
-
-            # Dibujar cuadrícula si está habilitada
-            if self.show_grid:
-                renderer.draw_grid(self.scale, self.camera_offset_x, self.ground_y)
-
-            # Dibujar regla de altura
-            renderer.draw_height_ruler(self.height_ruler_x, self.scale, self.ground_y)
-
-            renderer.draw_info_panel(self.bow.angle, self.bow.draw_strength,
-                                     self.physics.gravity, self.arrow.is_flying,
-                                     self.max_distance, self.estimated_distance,
-                                     self.min_expected, self.max_expected)
-            renderer.draw_formulas_panel(self.bow.angle, self.bow.draw_strength,
-                                         self.physics.gravity, self.arrow.is_flying,
-                                         self.max_distance)
-            renderer.draw_distance_ruler(self.ground_y + 30, self.scale, self.camera_offset_x)
-            renderer.draw_ground(self.ground_y, self.scale)
-            self.bow.draw(renderer.screen, self.ground_y)
-            self.arrow.draw(renderer.screen, self.camera_offset_x, self.camera_offset_y,
-                            self.scale, self.ground_y)
+            profiler.lap('handle_events')
+            alpha = self.advance(frame_time)
+            if self.arrow.is_flying:
+                camera.track(self.arrow.x, self.arrow.y)
+            profiler.lap('update')
+
+            # Dibujar el fondo estático (cielo, cuadrícula, reglas y suelo)
+            # desde la capa cacheada; solo se redibuja si cambia la vista
+            renderer.draw_background(camera.scale, camera.offset_x, camera.ground_y,
+                                     self.height_ruler_x, self.show_grid)
+            profiler.lap('draw_background')
+
+            dirty = renderer.dirty
+            if self.full_redraw:
+                dirty.invalidate()
+                self.full_redraw = False
+
+            info_key = (self.bow.angle, self.bow.draw_strength, self.physics.gravity, self.arrow.is_flying,
+                        self.max_distance, self.estimated_distance, self.min_expected, self.max_expected)
+            dirty.mark_changed('info', info_key, renderer.draw_info_panel(*info_key))
+            profiler.lap('draw_info_panel')
+            dirty.mark_changed('formulas', (self.bow.angle, self.bow.draw_strength, self.physics.gravity),
+                               renderer.draw_formulas_panel(self.bow.angle, self.bow.draw_strength,
+                                                            self.physics.gravity, self.arrow.is_flying,
+                                                            self.max_distance,
+                                                            self.physics.summary(self.bow.draw_strength,
+                                                                                 self.bow.angle),
+                                                            self.dt))
+            profiler.lap('draw_formulas_panel')
+            if self.target_distance is not None:
+                dirty.mark(renderer.draw_target(self.target_distance, camera.scale, camera.offset_x,
+                                                camera.ground_y))
+                profiler.lap('draw_target')
+            dirty.mark(self.bow.draw(renderer.screen, camera.ground_y, camera.offset_x))
+            profiler.lap('Bow.draw')
+            dirty.mark(self.arrow.draw(renderer.screen, camera.offset_x, 0, camera.scale, camera.ground_y, alpha))
+            profiler.lap('Arrow.draw')
+            dirty.mark(self.volley.draw(renderer.screen, camera.offset_x, camera.scale, camera.ground_y,
+                                        alpha, self.dt))
+            profiler.lap('Volley.draw')
+
+            # Indicar la escala de tiempo cuando no es tiempo real
+            if self.time_scale != 1:
+                scale_text = renderer.render_text(renderer.font, f"Tiempo ×{self.time_scale:g}  ([ / ])",
+                                                  (100, 0, 0))
+                renderer.screen.blit(scale_text, (15, 255))
+
+            if self.physics.drag is not None:
+                drag_text = renderer.render_text(renderer.font,
+                                                 f"Rozamiento del aire, viento {self.physics.drag.wind:g} m/s  (D)",
+                                                 (100, 0, 0))
+                renderer.screen.blit(drag_text, (15, 275))
+
+            # Indicar el zoom y si la cámara sigue la flecha cuando no es la vista inicial
+            if camera.key != camera.home or not camera.follow:
+                follow = "sigue la flecha" if camera.follow else "fija"
+                view_text = renderer.render_text(renderer.font,
+                                                 f"Zoom ×{camera.scale:.3g}, cámara {follow}  (rueda, F, C)",
+                                                 (100, 0, 0))
+                renderer.screen.blit(view_text, (15, 295))
 
             # Dibujar campos de entrada de texto
             if self.active_input == "angle":
                 angle_surface = self.angle_input.surface
-                renderer.screen.blit(angle_surface, (120, 20))
+                dirty.mark(renderer.screen.blit(angle_surface, (120, 20)))
                 pygame.draw.rect(renderer.screen, (0, 0, 255), (120, 20, 60, 30), 2)
             else:
-                angle_text = pygame.font.SysFont('arial', 20).render(str(round(self.bow.angle, 1)), True, (0, 0, 0))
-                renderer.screen.blit(angle_text, (120, 20))
+                angle_text = renderer.render_text(self.input_font, str(round(self.bow.angle, 1)), (0, 0, 0))
+                dirty.mark(renderer.screen.blit(angle_text, (120, 20)))
                 pygame.draw.rect(renderer.screen, (200, 200, 200), (120, 20, 60, 30), 1)
 
             if self.active_input == "velocity":
                 velocity_surface = self.velocity_input.surface
-                renderer.screen.blit(velocity_surface, (120, 60))
+                dirty.mark(renderer.screen.blit(velocity_surface, (120, 60)))
                 pygame.draw.rect(renderer.screen, (0, 0, 255), (120, 60, 60, 30), 2)
             else:
-                velocity_text = pygame.font.SysFont('arial', 20).render(str(round(self.bow.draw_strength, 1)), True,
-                                                                        (0, 0, 0))
-                renderer.screen.blit(velocity_text, (120, 60))
+                velocity_text = renderer.render_text(self.input_font, str(round(self.bow.draw_strength, 1)),
+                                                     (0, 0, 0))
+                dirty.mark(renderer.screen.blit(velocity_text, (120, 60)))
                 pygame.draw.rect(renderer.screen, (200, 200, 200), (120, 60, 60, 30), 1)
 
-            pygame.display.flip()
-            self.clock.tick(self.fps)
-
+            # Los campos de entrada cambian con el cursor y con las teclas mantenidas
+            dirty.mark([pygame.Rect(120, 20, 60, 30), pygame.Rect(120, 60, 60, 30)])
+            profiler.lap('inputs')
+
+            if self.show_profiler:
+                dirty.mark(renderer.draw_profile_overlay(profiler))
+                profiler.lap('draw_profile_overlay')
+            renderer.present()
+            profiler.lap('display.flip')
+            if self.startup is not None:
+                self.startup.mark('first_frame')
+                self.startup.report()
+                self.startup = None
+
+        if self.recorder is not None:
+            self.recorder.close()
+        self.profiler.finish()
         pygame.quit()
         sys.exit()
\ No newline at end of file
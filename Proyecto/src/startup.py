@@ -0,0 +1,67 @@
+import sys
+import time
+
+
+def import_pygame():
+    """Importa pygame sin que pygame.pkgdata importe pkg_resources
+
+    pkgdata lo usa solo para localizar la fuente por defecto y, si no está
+    disponible, recurre a rutas de archivo; importarlo cuesta más de 100 ms.
+    pkg_resources se bloquea solo durante el import de pygame: después el
+    resto del proceso puede importarlo con normalidad. Si ya estaba
+    importado, no se toca.
+    """
+    blocked = 'pkg_resources' not in sys.modules
+    if blocked:
+        sys.modules['pkg_resources'] = None
+    try:
+        import pygame
+    finally:
+        if blocked and sys.modules.get('pkg_resources', False) is None:
+            del sys.modules['pkg_resources']
+    return pygame
+
+
+def init_pygame():
+    """Inicializa solo los subsistemas que usa la simulación: video (y eventos) y fuentes
+
+    A diferencia de pygame.init(), no abre el audio ni los joysticks. Se
+    puede llamar varias veces.
+    """
+    import pygame
+
+    if not pygame.display.get_init():
+        pygame.display.init()
+    if not pygame.font.get_init():
+        pygame.font.init()
+
+
+class StartupProfile:
+    """Marcas de tiempo del arranque, hasta el primer cuadro en pantalla
+
+    Cada marca registra el tiempo transcurrido desde la anterior; 'start' es
+    el instante de referencia (perf_counter) de la primera.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+        self.marks = []
+
+    def mark(self, name):
+        """Cierra la etapa 'name' del arranque"""
+        now = time.perf_counter()
+        self.marks.append((name, now - self._last))
+        self._last = now
+
+    def total(self):
+        return self._last - self.start
+
+    def report(self, stream=None):
+        """Escribe la duración de cada etapa y el total en ms (por defecto en stderr)"""
+        stream = stream if stream is not None else sys.stderr
+        stream.write("Arranque (ms):\n")
+        for name, duration in self.marks:
+            stream.write(f"  {name:<14} {duration * 1000:8.1f}\n")
+        stream.write(f"  {'total':<14} {self.total() * 1000:8.1f}\n")
+        stream.flush()
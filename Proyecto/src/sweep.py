@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from physics import Physics
+from arrow import Arrow, TL_X, TL_Y
+
+
+# Columnas que se escriben por cada disparo del barrido (todas float64)
+COLUMNS = [
+    'gravity', 'angle', 'velocity',
+    'stepped_distance', 'analytic_distance', 'error', 'relative_error',
+    'stepped_height', 'analytic_height',
+    'stepped_time', 'analytic_time', 'steps',
+]
+
+MANIFEST = 'manifest.json'
+
+
+class GridMismatchError(ValueError):
+    """El directorio de resultados contiene un barrido con otra cuadrícula"""
+
+
+def parse_range(text):
+    """Convierte 'inicio:fin:paso' (fin incluido) o 'a,b,c' en un arreglo de valores"""
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        if step <= 0 or stop < start:
+            raise ValueError(f"rango inválido: {text!r}")
+        count = int(round((stop - start) / step)) + 1
+        # Redondear evita valores como 0.30000000000000004
+        return np.round(start + np.arange(count) * step, 10)
+    return np.array([float(part) for part in text.split(',')])
+
+
+def make_chunks(grid, chunk_size):
+    """Divide la cuadrícula en bloques de 'chunk_size' ángulos por gravedad"""
+    chunks = []
+    for gravity in grid['gravities']:
+        for start in range(0, len(grid['angles']), chunk_size):
+            chunks.append((len(chunks), gravity, start, min(start + chunk_size, len(grid['angles']))))
+    return chunks
+
+
+def run_chunk(task):
+    """Calcula un bloque del barrido (se ejecuta en un proceso del pool)
+
+    Para cada disparo compara el modelo discreto de Arrow (la línea de tiempo
+    que Arrow.update recorre paso a paso con el mismo dt) con las fórmulas
+    cerradas de Physics, evaluadas por lotes.
+    """
+    (chunk_id, gravity, start, stop), angles, velocities, dt, resolve_contact = task
+    physics = Physics(gravity=gravity)
+    arrow = Arrow(50, 20, physics, resolve_contact=resolve_contact)
+
+    block_angles = np.repeat(angles[start:stop], len(velocities))
+    block_velocities = np.tile(velocities, stop - start)
+    count = len(block_angles)
+
+    stepped_distance = np.empty(count)
+    stepped_height = np.empty(count)
+    stepped_time = np.empty(count)
+    steps = np.empty(count)
+    for i in range(count):
+        arrow.shoot(block_velocities[i], block_angles[i], dt)
+        timeline = arrow.timeline
+        stepped_distance[i] = timeline[-1, TL_X]
+        # La primera fila es el lanzamiento (y = 0), así que el máximo es >= 0
+        stepped_height[i] = timeline[:, TL_Y].max()
+        stepped_time[i] = arrow.landing_time
+        steps[i] = len(timeline) - 1
+
+    analytic = physics.batch(block_velocities, block_angles)
+    error = stepped_distance - analytic.max_distance
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_error = np.where(analytic.max_distance != 0, error / analytic.max_distance, np.nan)
+
+    result = {
+        'gravity': np.full(count, gravity),
+        'angle': block_angles,
+        'velocity': block_velocities,
+        'stepped_distance': stepped_distance,
+        'analytic_distance': analytic.max_distance,
+        'error': error,
+        'relative_error': relative_error,
+        'stepped_height': stepped_height,
+        'analytic_height': analytic.max_height,
+        'stepped_time': stepped_time,
+        'analytic_time': analytic.flight_time,
+        'steps': steps,
+    }
+    return chunk_id, result
+
+
+class SweepStore:
+    """Almacén columnar en disco: un archivo binario float64 por columna
+
+    manifest.json guarda la cuadrícula, los bloques terminados y el número de
+    filas escritas. Al reanudar, las columnas se truncan a ese número para
+    descartar un bloque que quedó a medias.
+    """
+
+    def __init__(self, directory, grid, fresh=False):
+        """Abre (o crea) el almacén; falla si existe con otra cuadrícula
+
+        Con fresh se descartan los resultados que hubiera en el directorio.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        self.manifest = {'grid': grid, 'columns': COLUMNS, 'rows': 0, 'done': []}
+
+        if fresh and os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest['grid'] != grid:
+                raise GridMismatchError(f"{directory} contiene un barrido con otra cuadrícula; use otro directorio")
+            self.manifest = manifest
+
+        # Descartar filas escritas después del último manifiesto guardado
+        for name in COLUMNS:
+            path = self.column_path(name)
+            with open(path, 'ab') as f:
+                f.truncate(self.manifest['rows'] * 8)
+
+    @property
+    def done(self):
+        return set(self.manifest['done'])
+
+    def column_path(self, name):
+        return os.path.join(self.directory, name + '.f64')
+
+    def append(self, chunk_id, result):
+        """Agrega las filas de un bloque y lo marca como terminado"""
+        for name in COLUMNS:
+            with open(self.column_path(name), 'ab') as f:
+                result[name].astype('<f8').tofile(f)
+        self.manifest['rows'] += len(result['angle'])
+        self.manifest['done'].append(chunk_id)
+        # Escritura atómica del manifiesto
+        temp_path = self.manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(temp_path, self.manifest_path)
+
+    def load(self, name):
+        """Devuelve una columna como arreglo mapeado en memoria (sin cargarla)"""
+        return np.memmap(self.column_path(name), dtype='<f8', mode='r', shape=(self.manifest['rows'],))
+
+
+def run_sweep(directory, angles, velocities, gravities, dt=1 / 60, workers=None, chunk_size=10,
+              resolve_contact=False, progress=None, fresh=False):
+    """Ejecuta (o reanuda) un barrido y devuelve el almacén con los resultados
+
+    Por defecto el aterrizaje es el primer paso bajo el suelo, como en el
+    modelo discreto sin ajustar: con resolve_contact el último paso cae en el
+    instante exacto del contacto y el error de alcance es nulo por
+    construcción, así que solo quedan los errores de altura y de tiempo.
+    """
+    grid = {
+        'angles': [float(a) for a in angles],
+        'velocities': [float(v) for v in velocities],
+        'gravities': [float(g) for g in gravities],
+        'dt': dt,
+        'chunk_size': chunk_size,
+        'resolve_contact': resolve_contact,
+    }
+    store = SweepStore(directory, grid, fresh)
+    done = store.done
+    chunks = make_chunks(grid, chunk_size)
+    pending = [chunk for chunk in chunks if chunk[0] not in done]
+
+    angles = np.array(grid['angles'])
+    velocities = np.array(grid['velocities'])
+    tasks = [(chunk, angles, velocities, dt, resolve_contact) for chunk in pending]
+
+    with Pool(workers) as pool:
+        for completed, (chunk_id, result) in enumerate(pool.imap_unordered(run_chunk, tasks), 1):
+            store.append(chunk_id, result)
+            if progress:
+                progress(len(chunks) - len(pending) + completed, len(chunks))
+    return store
+
+
+def summarize(store, outfile=sys.stdout):
+    """Imprime la distribución del error de discretización por gravedad
+
+    Además del error de alcance se muestran los de altura máxima y tiempo de
+    vuelo, que siguen midiendo el paso de tiempo aunque el contacto se ajuste.
+    """
+    gravity = store.load('gravity')
+    error = store.load('error')
+    relative = store.load('relative_error')
+    height_error = np.abs(store.load('stepped_height') - store.load('analytic_height'))
+    time_error = np.abs(store.load('stepped_time') - store.load('analytic_time'))
+
+    outfile.write(f"{'gravedad':>9} {'disparos':>9} {'|err| p50':>10} {'p95':>10} {'p99':>10} "
+                  f"{'máx':>10} {'rel p50':>10} {'rel p99':>10} {'alt p99':>10} {'tiempo p99':>10}\n")
+    for g in np.unique(gravity):
+        mask = gravity == g
+        abs_error = np.abs(error[mask])
+        abs_relative = np.abs(relative[mask])
+        p50, p95, p99 = np.percentile(abs_error, [50, 95, 99])
+        r50, r99 = np.nanpercentile(abs_relative, [50, 99])
+        h99 = np.percentile(height_error[mask], 99)
+        t99 = np.percentile(time_error[mask], 99)
+        outfile.write(f"{g:>9.2f} {mask.sum():>9d} {p50:>10.4f} {p95:>10.4f} {p99:>10.4f} "
+                      f"{abs_error.max():>10.4f} {r50:>10.2e} {r99:>10.2e} {h99:>10.4f} {t99:>10.4f}\n")
+
+
+def main(argv=None):
+    """Punto de entrada de línea de comandos del barrido"""
+    parser = argparse.ArgumentParser(
+        description="Barrido de ángulo × velocidad × gravedad comparando el modelo discreto con el analítico")
+    parser.add_argument('--out', required=True, help="directorio de resultados (se reanuda si ya existe)")
+    parser.add_argument('--angles', default='0:90:0.1', help="ángulos 'inicio:fin:paso' o lista (grados)")
+    parser.add_argument('--velocities', default='10:100:1', help="velocidades 'inicio:fin:paso' o lista (m/s)")
+    parser.add_argument('--gravities', default='9.8,1.62,3.7', help="gravedades 'inicio:fin:paso' o lista")
+    parser.add_argument('--dt', type=float, default=1 / 60, help="paso de tiempo del modelo discreto")
+    parser.add_argument('--workers', type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--chunk-size', type=int, default=10, help="ángulos por bloque de trabajo")
+    parser.add_argument('--resolve-contact', action='store_true',
+                        help="ajustar el aterrizaje al instante exacto del contacto (el error de alcance "
+                             "pasa a ser nulo; por defecto se mide en el primer paso bajo el suelo)")
+    parser.add_argument('--fresh', action='store_true',
+                        help="descartar los resultados que haya en --out en lugar de reanudarlos")
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for name in ('angles', 'velocities', 'gravities'):
+        try:
+            grid[name] = parse_range(getattr(args, name))
+        except ValueError as error:
+            parser.error(f"--{name}: {error}")
+
+    started = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} bloques", end='', file=sys.stderr, flush=True)
+
+    try:
+        store = run_sweep(args.out, grid['angles'], grid['velocities'], grid['gravities'], args.dt,
+                          args.workers, args.chunk_size, args.resolve_contact, progress, args.fresh)
+    except GridMismatchError as error:
+        print(f"error: {error} (o --fresh para empezar de nuevo)", file=sys.stderr)
+        sys.exit(2)
+    print(f"\n{store.manifest['rows']} disparos en {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    summarize(store)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+class LazyTextInput:
+    """Campo de texto que crea el widget de pygame_textinput solo cuando se edita
+
+    Hasta entonces guarda el valor como texto, de modo que el arranque no
+    importa pygame_textinput ni crea sus superficies; la mayoría de las
+    sesiones nunca escriben en los campos.
+    """
+
+    def __init__(self, get_font, **options):
+        """get_font() devuelve la fuente del widget; options se pasan a TextInputVisualizer"""
+        self.get_font = get_font
+        self.options = options
+        self.widget = None
+        self._value = ''
+
+    @property
+    def value(self):
+        return self.widget.value if self.widget is not None else self._value
+
+    @value.setter
+    def value(self, value):
+        if self.widget is not None:
+            self.widget.value = value
+        else:
+            self._value = value
+
+    def activate(self):
+        """Devuelve el widget, creándolo la primera vez"""
+        if self.widget is None:
+            import pygame_textinput
+
+            self.widget = pygame_textinput.TextInputVisualizer(font_object=self.get_font(), **self.options)
+            self.widget.value = self._value
+        return self.widget
+
+    @property
+    def surface(self):
+        return self.activate().surface
+
+    def update(self, events):
+        """Procesa los eventos de teclado del campo activo"""
+        return self.activate().update(events)
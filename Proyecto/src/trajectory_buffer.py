@@ -0,0 +1,142 @@
+import numpy as np
+
+from decimation import ScreenDecimator, douglas_peucker
+
+
+class TrajectoryBuffer:
+    """Buffer circular de capacidad fija para los puntos de una trayectoria
+
+    Cada punto se escribe dos veces (en i y en i + capacidad) para que la
+    ventana de los últimos puntos sea siempre un bloque contiguo del arreglo:
+    points() devuelve una vista sin copiar ni reordenar, aunque el buffer
+    haya dado la vuelta.
+
+    También mantiene una copia de los puntos ya convertidos a pantalla, con
+    la misma disposición, para convertir solo los puntos nuevos en cada cuadro,
+    y su versión simplificada para dibujar (ver ScreenDecimator).
+    """
+
+    def __init__(self, capacity):
+        """Reserva el espacio para 'capacity' puntos (x, y)"""
+        if capacity < 1:
+            raise ValueError("La capacidad del buffer debe ser al menos 1")
+        self.capacity = capacity
+        self._data = np.empty((2 * capacity, 2))
+        self._start = 0
+        self._count = 0
+        self.total = 0  # Puntos agregados desde el último clear()
+
+        # Caché de coordenadas de pantalla
+        self._screen = np.empty((2 * capacity, 2))
+        self._screen_key = None
+        self._screen_total = 0  # Puntos convertidos hasta ahora
+
+        # Polilínea simplificada en pantalla (nivel de detalle del dibujo)
+        self._decimator = ScreenDecimator()
+        self._decimated_key = None
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        """Vacía el buffer sin liberar memoria"""
+        self._start = 0
+        self._count = 0
+        self.total = 0
+        self._screen_total = 0
+        self._decimator.reset()
+
+    def append(self, x, y):
+        """Agrega un punto; si el buffer está lleno se descarta el más antiguo"""
+        if self._count < self.capacity:
+            slot = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._data[slot] = (x, y)
+        self._data[slot + self.capacity] = (x, y)
+        self.total += 1
+
+    @property
+    def first_index(self):
+        """Índice (desde el último clear) del punto más antiguo que se conserva"""
+        return self.total - self._count
+
+    def points(self):
+        """Devuelve una vista (n, 2) de los puntos, del más antiguo al más nuevo"""
+        return self._data[self._start:self._start + self._count]
+
+    def screen_points(self, scale, camera_offset_x, ground_y):
+        """Devuelve una vista (n, 2) de los puntos en coordenadas de pantalla
+
+        Solo se convierten los puntos agregados desde la última llamada. La
+        caché completa se recalcula únicamente si cambia la escala, el
+        desplazamiento de la cámara o la línea del suelo.
+        """
+        key = (scale, camera_offset_x, ground_y)
+        if key != self._screen_key:
+            self._screen_key = key
+            self._screen_total = self.first_index
+
+        # Los puntos que ya salieron del buffer no hace falta convertirlos
+        pending = self.total - max(self._screen_total, self.first_index)
+        if pending > 0:
+            # El punto número n (desde clear) vive en la posición n % capacidad
+            slots = np.arange(self.total - pending, self.total) % self.capacity
+            world = self._data[slots]
+            converted = np.empty_like(world)
+            converted[:, 0] = world[:, 0] * scale + camera_offset_x
+            converted[:, 1] = ground_y - world[:, 1] * scale  # Invertir coordenada Y
+            self._screen[slots] = converted
+            self._screen[slots + self.capacity] = converted
+        self._screen_total = self.total
+
+        return self._screen[self._start:self._start + self._count]
+
+    @property
+    def decimated_anchor(self):
+        """Número del último vértice fijo de la trayectoria simplificada
+
+        Los vértices posteriores se recalculan con cada punto nuevo, así que
+        el trazo puede cambiar en cualquier parte del tramo que empieza ahí.
+        """
+        return self._decimator.anchor
+
+    def decimated_points(self, scale, tolerance, breaks=()):
+        """Devuelve los vértices (m, 3) de la trayectoria simplificada a escala de pantalla
+
+        Cada fila es (número de punto desde clear, x·scale, -y·scale), con las
+        coordenadas ajustadas al píxel: para pasarlas a pantalla basta sumar
+        el desplazamiento de la cámara en píxeles enteros. Como no dependen
+        de ese desplazamiento, mover la cámara no obliga a simplificar de
+        nuevo. Los puntos de 'breaks' (números) siempre son vértices. Solo se
+        procesan los puntos nuevos, salvo que cambien la escala, la
+        tolerancia o los cortes.
+        """
+        points = self.points()
+        decimator = self._decimator
+        key = (scale, tolerance, tuple(breaks))
+        new = self.total - decimator.total
+        if key != self._decimated_key or new < 0 or new > len(points):
+            self._decimated_key = key
+            decimator.reset()
+            decimator.tolerance = tolerance
+            # Numerar desde el punto más antiguo que se conserva
+            decimator.total = self.first_index
+            new = len(points)
+        if new:
+            decimator.extend(points[len(points) - new:] * (scale, -scale), breaks)
+        # Los vértices de puntos que ya salieron del buffer no se vuelven a usar
+        decimator.discard(self.first_index)
+        vertices = decimator.vertices(self.first_index)
+        if len(vertices) and vertices[0, 0] > self.first_index:
+            # El vértice anterior ya salió del buffer: simplificar de nuevo el
+            # primer tramo desde el punto más antiguo que se conserva
+            gap = int(vertices[0, 0]) - self.first_index
+            head = np.empty((gap + 1, 3))
+            head[:, 0] = self.first_index + np.arange(gap + 1)
+            head[:, 1:] = np.rint(points[:gap + 1] * (scale, -scale))
+            kept = douglas_peucker(head[:, 1:], decimator.tolerance)
+            vertices = np.concatenate((head[kept[:-1]], vertices))
+        return vertices
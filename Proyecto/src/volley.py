@@ -0,0 +1,220 @@
+import numpy as np
+import pygame
+from arrow_atlas import get_atlas
+from forces import Gravity, CombinedForces, advance_batch
+
+
+class Volley:
+    """Motor de muchas flechas simultáneas (lluvia de flechas)
+
+    El estado de cada flecha vive en arreglos contiguos de NumPy (estructura de
+    arreglos) y todas avanzan con una sola operación vectorizada por paso. Las
+    flechas vivas ocupan siempre las primeras 'count' posiciones; las que
+    aterrizan se retiran compactando los arreglos.
+    """
+
+    # Arreglos por flecha: posición, velocidad, tiempo de vuelo y parámetros
+    # de lanzamiento (componentes iniciales, gravedad, instante de contacto y
+    # si se lanzó con rozamiento del aire)
+    FIELDS = ('x', 'y', 'vx', 'vy', 'time', 'vy0', 'gravity', 'contact_time', 'drag')
+
+    def __init__(self, physics, capacity=16384):
+        """Reserva espacio para 'capacity' flechas (crece si hace falta)"""
+        self.physics = physics
+        self.count = 0
+        self.landed = 0  # Flechas retiradas desde el último clear()
+        self.drag_model = None  # Rozamiento de las flechas lanzadas con él
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Crea (o agranda) los arreglos conservando las flechas vivas"""
+        for name in self.FIELDS:
+            array = np.zeros(capacity)
+            if hasattr(self, name):
+                array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        """Elimina todas las flechas"""
+        self.count = 0
+        self.landed = 0
+
+    def launch(self, velocities, angles):
+        """Lanza flechas desde el origen con las velocidades y ángulos dados
+
+        Se aplican la gravedad y el rozamiento actuales, que quedan fijos
+        para esas flechas (si se lanza con otro rozamiento, todas las flechas
+        con rozamiento pasan a usar el último).
+        """
+        velocities, angles = np.broadcast_arrays(np.asarray(velocities, dtype=np.float64),
+                                                 np.asarray(angles, dtype=np.float64))
+        velocities = velocities.ravel()
+        angles = angles.ravel()
+        n = len(velocities)
+        if self.count + n > self.capacity:
+            self._allocate(max(self.capacity * 2, self.count + n))
+
+        shot = self.physics.batch(velocities, angles)
+        new = slice(self.count, self.count + n)
+        self.x[new] = 0.0
+        self.y[new] = 0.0
+        self.vx[new] = shot.vx
+        self.vy[new] = shot.vy
+        self.vy0[new] = shot.vy
+        self.time[new] = 0.0
+        self.gravity[new] = self.physics.gravity
+        self.contact_time[new] = np.maximum(shot.flight_time, 0.0)
+        self.drag[new] = 0.0
+        if self.physics.drag is not None:
+            # Sin solución cerrada: se integran paso a paso y aterrizan al tocar el suelo
+            self.drag_model = self.physics.drag
+            self.drag[new] = 1.0
+            self.contact_time[new] = np.inf
+        self.count += n
+
+    def launch_spread(self, n, velocity, angle, velocity_spread=0.1, angle_spread=5.0, rng=None):
+        """Lanza n flechas alrededor de una velocidad y un ángulo
+
+        velocity_spread es la variación relativa (±) de la velocidad y
+        angle_spread la variación en grados (±) del ángulo.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        velocities = velocity * (1 + rng.uniform(-velocity_spread, velocity_spread, n))
+        angles = np.clip(angle + rng.uniform(-angle_spread, angle_spread, n), 0, 90)
+        self.launch(velocities, angles)
+
+    def step(self, dt):
+        """Avanza todas las flechas un paso y retira las que tocaron el suelo
+
+        Las posiciones se evalúan en forma cerrada a partir de los parámetros
+        de lanzamiento, así que no se acumula error con los pasos; las flechas
+        que aterrizan quedan en el punto exacto del contacto. Las flechas con
+        rozamiento avanzan con un paso de Runge–Kutta vectorizado. Devuelve las
+        coordenadas x de aterrizaje de las flechas retiradas en este paso.
+        """
+        n = self.count
+        if n == 0:
+            return self.x[:0].copy()
+
+        # Flechas con rozamiento: se avanzan desde su estado actual
+        dragged = np.flatnonzero(self.drag[:n]) if self.drag_model is not None else []
+        if len(dragged):
+            states = np.array([self.x[dragged], self.y[dragged], self.vx[dragged], self.vy[dragged]])
+            dragged_landed = np.zeros(len(dragged), dtype=bool)
+            elapsed = np.zeros(len(dragged))
+            # Un modelo de fuerzas por cada gravedad presente (suelen ser una o dos)
+            for gravity in np.unique(self.gravity[dragged]):
+                group = self.gravity[dragged] == gravity
+                model = CombinedForces([Gravity(gravity), self.drag_model])
+                states[:, group], dragged_landed[group], elapsed[group] = advance_batch(
+                    model, states[:, group], dt)
+            dragged_time = self.time[dragged] + elapsed
+
+        t = self.time[:n]
+        t += dt
+        np.minimum(t, self.contact_time[:n], out=t)
+
+        g = self.gravity[:n]
+        vy0 = self.vy0[:n]
+        np.multiply(self.vx[:n], t, out=self.x[:n])
+        self.y[:n] = vy0 * t - 0.5 * g * (t * t)
+        self.vy[:n] = vy0 - g * t
+
+        landed = t >= self.contact_time[:n]
+        if len(dragged):
+            self.x[dragged], self.y[dragged], self.vx[dragged], self.vy[dragged] = states
+            self.time[dragged] = dragged_time
+            landed[dragged] = dragged_landed
+        if not landed.any():
+            return self.x[:0].copy()
+
+        self.y[:n][landed] = 0.0
+        landing_x = self.x[:n][landed].copy()
+
+        # Compactar: las flechas vivas pasan al principio de los arreglos
+        keep = np.flatnonzero(~landed)
+        for name in self.FIELDS:
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.count = len(keep)
+        self.landed += len(landing_x)
+        return landing_x
+
+    def screen_positions(self, camera_offset_x, scale, ground_y, alpha=0.0, dt=0.0):
+        """Devuelve (sx, sy) en pantalla, interpolando alpha·dt hacia el siguiente paso"""
+        n = self.count
+        t = self.time[:n]
+        if alpha and dt:
+            t = np.minimum(t + alpha * dt, self.contact_time[:n])
+            x = self.vx[:n] * t
+            y = self.vy0[:n] * t - 0.5 * self.gravity[:n] * (t * t)
+            if self.drag_model is not None:
+                # Con rozamiento se extrapola con la velocidad actual
+                dragged = self.drag[:n] != 0
+                x = np.where(dragged, self.x[:n] + self.vx[:n] * (alpha * dt), x)
+                y = np.where(dragged, np.maximum(self.y[:n] + self.vy[:n] * (alpha * dt), 0.0), y)
+        else:
+            x = self.x[:n]
+            y = self.y[:n]
+        return x * scale + camera_offset_x, ground_y - y * scale
+
+    def screen_headings(self, alpha=0.0, dt=0.0):
+        """Devuelve el rumbo de pantalla (grados) de cada flecha, interpolado como screen_positions"""
+        n = self.count
+        t = self.time[:n]
+        if alpha and dt:
+            t = np.minimum(t + alpha * dt, self.contact_time[:n])
+        vy = self.vy0[:n] - self.gravity[:n] * t
+        if self.drag_model is not None:
+            vy = np.where(self.drag[:n] != 0, self.vy[:n], vy)
+        # Y de pygame aumenta hacia abajo: el rumbo en pantalla cambia de signo
+        return -np.degrees(np.arctan2(vy, self.vx[:n]))
+
+    def draw(self, screen, camera_offset_x, scale, ground_y, alpha=0.0, dt=0.0, color=(60, 30, 10),
+             sprite_limit=4000):
+        """Dibuja las flechas visibles
+
+        Hasta 'sprite_limit' flechas visibles se dibujan con el sprite del
+        atlas en una sola llamada a Surface.blits; con más, cada flecha es un
+        punto de 2×2 píxeles escrito directamente en la Surface. Devuelve el
+        rectángulo que contiene las flechas dibujadas (o None).
+        """
+        if self.count == 0:
+            return None
+        sx, sy = self.screen_positions(camera_offset_x, scale, ground_y, alpha, dt)
+        width, height = screen.get_size()
+        margin = get_atlas().half
+        near = (sx >= -margin) & (sx < width + margin) & (sy >= -margin) & (sy < height + margin)
+        if not near.any():
+            return None
+        if np.count_nonzero(near) <= sprite_limit:
+            headings = self.screen_headings(alpha, dt)
+            sx = sx[near]
+            sy = sy[near]
+            get_atlas().blit_many(screen, sx, sy, headings[near])
+            left, top = int(sx.min()) - margin, int(sy.min()) - margin
+            return pygame.Rect(left, top, int(sx.max()) + margin + 2 - left, int(sy.max()) + margin + 2 - top)
+
+        sx = sx.astype(np.intp)
+        sy = sy.astype(np.intp)
+        visible = (sx >= 0) & (sx < width - 1) & (sy >= 0) & (sy < height - 1)
+        sx = sx[visible]
+        sy = sy[visible]
+        if len(sx) == 0:
+            return None
+
+        pixels = pygame.surfarray.pixels2d(screen)
+        try:
+            mapped = screen.map_rgb(color)
+            pixels[sx, sy] = mapped
+            pixels[sx + 1, sy] = mapped
+            pixels[sx, sy + 1] = mapped
+            pixels[sx + 1, sy + 1] = mapped
+        finally:
+            del pixels  # Libera el bloqueo de la Surface
+        left, top = int(sx.min()), int(sy.min())
+        return pygame.Rect(left, top, int(sx.max()) + 2 - left, int(sy.max()) + 2 - top)
@@ -0,0 +1,83 @@
+"""La salida del modo por lotes y del barrido debe poder leerse tal cual desde stdout
+
+Se ejecuta con: python -m unittest discover tests
+"""
+import csv
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+MAIN = os.path.join(SRC_DIR, 'main.py')
+SHOTS = "45 50\n30 20 1.62\n60 35 9.8 0.5\n"
+
+
+def run(args, stdin=None):
+    """Ejecuta un script de src con el aviso de pygame visible y devuelve el resultado"""
+    env = dict(os.environ)
+    env.pop('PYGAME_HIDE_SUPPORT_PROMPT', None)  # Que el aviso de pygame se vea si se importa
+    return subprocess.run([sys.executable, *args], input=stdin, cwd=SRC_DIR,
+                          capture_output=True, text=True, env=env)
+
+
+def run_batch(*options):
+    """Ejecuta main.py --batch con los disparos de prueba y devuelve su stdout"""
+    result = run([MAIN, '--batch', *options], SHOTS)
+    result.check_returncode()
+    return result.stdout
+
+
+class BatchOutputTest(unittest.TestCase):
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(run_batch('--format', 'csv'))))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(float(rows[0]['angle']), 45.0)
+        self.assertGreater(float(rows[0]['landing_x']), 0.0)
+
+    def test_ndjson(self):
+        results = [json.loads(line) for line in run_batch('--format', 'json').splitlines()]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1]['gravity'], 1.62)
+
+    def test_batch_and_sweep_do_not_import_pygame(self):
+        result = run(['-c', "import sys, headless, sweep; print('pygame' in sys.modules)"])
+        self.assertEqual(result.stdout.strip(), 'False')
+
+
+class SweepOutputTest(unittest.TestCase):
+
+    def sweep(self, directory, angles='10:80:10'):
+        return run(['sweep.py', '--out', directory, '--angles', angles, '--velocities', '20,50',
+                    '--gravities', '9.8', '--workers', '1'])
+
+    def test_summary(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = self.sweep(directory)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        header, row = result.stdout.splitlines()
+        self.assertEqual(header.split()[:2], ['gravedad', 'disparos'])
+        self.assertEqual(row.split()[:2], ['9.80', '16'])
+
+    def test_grid_mismatch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.sweep(directory).check_returncode()
+            result = self.sweep(directory, '10:80:5')
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('o --fresh', result.stderr)
+        self.assertNotIn('Traceback', result.stderr)
+
+    def test_invalid_range(self):
+        with tempfile.TemporaryDirectory() as directory:
+            result = self.sweep(directory, '10:5:1')
+        self.assertEqual(result.returncode, 2)
+        self.assertIn('--angles', result.stderr)
+        self.assertNotIn('o --fresh', result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()